@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+GITHUB_OUTPUT write benchmark.
+
+Compares appending each output with its own open/write/close (the previous
+behaviour) against buffering all outputs in an OutputSink and flushing them
+with a single write.
+
+Usage:
+    python3 benchmarks/bench_output.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.output import OutputSink  # noqa: E402
+
+OUTPUT_COUNTS = (10, 100, 1000)
+REPEAT = 20
+
+
+def write_per_key(path: str, outputs) -> None:
+    for key, value in outputs:
+        with open(path, 'a') as f:
+            f.write(f"{key}={value}\n")
+
+
+def write_buffered(path: str, outputs) -> None:
+    sink = OutputSink(path)
+    for key, value in outputs:
+        sink.add(key, value)
+    sink.flush()
+
+
+def best_time(func, path: str, outputs) -> float:
+    best = float('inf')
+    for _ in range(REPEAT):
+        open(path, 'w').close()
+        start = time.perf_counter()
+        func(path, outputs)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> int:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'github_output')
+        print(f"{'outputs':>8}  {'per-key (ms)':>12}  {'buffered (ms)':>13}  {'speedup':>7}")
+        for count in OUTPUT_COUNTS:
+            outputs = [(f"output_{i}", f"value-{i}") for i in range(1, count + 1)]
+            per_key = best_time(write_per_key, path, outputs)
+            buffered = best_time(write_buffered, path, outputs)
+            print(f"{count:>8}  {per_key * 1e3:>12.3f}  {buffered * 1e3:>13.3f}  {per_key / buffered:>6.1f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Parser scaling benchmark.
+
+Parses condition strings of growing size (up to several MB) and reports the
+cost per input byte. A linear parser keeps ns/byte roughly flat; the script
+exits non-zero if the largest input costs more than MAX_SLOWDOWN times the
+smallest per byte.
+
+Usage:
+    python3 benchmarks/bench_parser.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.parser import ConditionParser  # noqa: E402
+
+SIZES = (64 * 1024, 256 * 1024, 1024 * 1024, 4 * 1024 * 1024)
+MAX_SLOWDOWN = 3.0
+REPEAT = 3
+
+
+def build_input(size: int) -> str:
+    """Build a mix of IN lists, logical operators and groups of about *size* bytes."""
+    chunk = (
+        'SERVICE IN game,batch,api,web,worker && ENV == prod, '
+        'NOT (BRANCH STARTS_WITH release/ || TAG MATCHES ^v[0-9]+$), '
+        'REGION IN us-east-1,eu-west-1,ap-northeast-2, '
+    )
+    return chunk * (size // len(chunk) + 1)
+
+
+def best_time(text: str) -> float:
+    best = float('inf')
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        ConditionParser.parse(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> int:
+    print(f"{'bytes':>10}  {'conditions':>10}  {'seconds':>9}  {'ns/byte':>8}")
+    per_byte = []
+    for size in SIZES:
+        text = build_input(size)
+        elapsed = best_time(text)
+        count = len(ConditionParser.parse(text))
+        per_byte.append(elapsed * 1e9 / len(text))
+        print(f"{len(text):>10}  {count:>10}  {elapsed:>9.4f}  {per_byte[-1]:>8.1f}")
+
+    slowdown = per_byte[-1] / per_byte[0]
+    print(f"\nPer-byte slowdown from smallest to largest input: {slowdown:.2f}x")
+    if slowdown > MAX_SLOWDOWN:
+        print(f"FAIL: parser scaling is worse than linear (>{MAX_SLOWDOWN}x)")
+        return 1
+    print("OK: parser scales linearly")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Startup-time benchmark.
+
+Measures what a single action run pays before and around evaluating its
+conditions:
+
+- ``python -X importtime -c "import src.evaluator"``: total import time and
+  the slowest modules, with and without precompiled bytecode (a fresh
+  container without it compiles every source module on each start)
+- cold-start wall time of ``entrypoint.py`` for a small set of conditions,
+  next to a bare ``python -c pass``
+
+It fails if importing the evaluator, or running conditions that do not need
+them, loads any of the modules that are meant to be imported lazily: a
+comparison-only run must not load the operator evaluators either, and a run
+with plain IN / CONTAINS conditions must not load anything else.
+
+Usage:
+    python3 benchmarks/bench_startup.py
+"""
+
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+RUNS = 20
+TOP_MODULES = 8
+
+# Modules that a plain comparison-only run must not import
+LAZY_MODULES = (
+    'dataclasses', 'uuid', 'asyncio', 'numpy', 'pickle',
+    'src.operators', 'src.codegen', 'src.rules', 'src.server', 'src.batch', 'src.parallel', 'src.timing', 'src.files',
+    'src.engine', 'src.diskcache', 'src.api', 'src.keywords', 'src.version',
+)
+
+# Modules that a run with only IN / CONTAINS leaf operators must not import
+OPERATOR_LAZY_MODULES = tuple(name for name in LAZY_MODULES if name != 'src.operators')
+
+RUN_ENV = {
+    'INPUT_CONDITIONS': 'SERVICE == game, ENVIRONMENT == prod && VERSION >= 2',
+    'INPUT_TRUE_VALUES': 'deploy, release',
+    'INPUT_FALSE_VALUES': 'skip, hold',
+    'SERVICE': 'game',
+    'ENVIRONMENT': 'prod',
+    'VERSION': '3',
+}
+
+OPERATOR_RUN_ENV = dict(
+    RUN_ENV,
+    INPUT_CONDITIONS='SERVICE IN game,batch, BRANCH CONTAINS release && ENVIRONMENT == prod',
+    BRANCH='release/1.2',
+)
+
+
+def make_tree(directory: str, precompile: bool) -> str:
+    """Copy the action into *directory*, optionally with precompiled bytecode."""
+    shutil.copytree(os.path.join(ROOT, 'src'), os.path.join(directory, 'src'),
+                    ignore=shutil.ignore_patterns('__pycache__'))
+    shutil.copy(os.path.join(ROOT, 'entrypoint.py'), directory)
+    if precompile:
+        subprocess.run([sys.executable, '-m', 'compileall', '-q', 'src'], cwd=directory, check=True)
+    return directory
+
+
+def python_env(**extra) -> dict:
+    env = {k: v for k, v in os.environ.items() if not k.startswith('INPUT_')}
+    env['PYTHONDONTWRITEBYTECODE'] = '1'
+    env.update(extra)
+    return env
+
+
+def import_times(args, cwd: str, env) -> dict:
+    """Run python with -X importtime and return {module: (self_us, cumulative_us)}."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime'] + args,
+        cwd=cwd, env=env, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def median_wall_time(args, cwd: str, env) -> float:
+    samples = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + args, cwd=cwd, env=env, stdout=subprocess.DEVNULL, check=True)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def report_imports(label: str, cwd: str) -> dict:
+    # Best of a few runs to keep disk cache effects out of the numbers
+    times = min(
+        (import_times(['-c', 'import src.evaluator'], cwd, python_env()) for _ in range(5)),
+        key=lambda t: t['src.evaluator'][1],
+    )
+    total = times['src.evaluator'][1]
+    print(f"import src.evaluator ({label}): {total / 1e3:.1f} ms")
+    slowest = sorted(times.items(), key=lambda item: item[1][0], reverse=True)[:TOP_MODULES]
+    for name, (self_us, cumulative_us) in slowest:
+        print(f"  {name:<28} self {self_us / 1e3:6.2f} ms  cumulative {cumulative_us / 1e3:6.2f} ms")
+    return times
+
+
+def main() -> int:
+    with tempfile.TemporaryDirectory() as tmp:
+        cold = make_tree(os.path.join(tmp, 'cold'), precompile=False)
+        warm = make_tree(os.path.join(tmp, 'warm'), precompile=True)
+        output = os.path.join(tmp, 'github_output')
+        open(output, 'w').close()
+        run_env = python_env(GITHUB_OUTPUT=output, **RUN_ENV)
+
+        report_imports('no bytecode', cold)
+        loaded = report_imports('precompiled', warm)
+        loaded.update(import_times(['entrypoint.py'], warm, run_env))
+        operator_loaded = import_times(['entrypoint.py'], warm, python_env(GITHUB_OUTPUT=output, **OPERATOR_RUN_ENV))
+
+        bare = median_wall_time(['-c', 'pass'], warm, python_env())
+        cold_run = median_wall_time(['entrypoint.py'], cold, run_env)
+        warm_run = median_wall_time(['entrypoint.py'], warm, run_env)
+        print(f"\nWall time, median of {RUNS} runs:")
+        print(f"  python -c pass                 {bare * 1e3:7.1f} ms")
+        print(f"  entrypoint.py (no bytecode)    {cold_run * 1e3:7.1f} ms  (+{(cold_run - bare) * 1e3:.1f} ms)")
+        print(f"  entrypoint.py (precompiled)    {warm_run * 1e3:7.1f} ms  (+{(warm_run - bare) * 1e3:.1f} ms)")
+
+    eager = [name for name in LAZY_MODULES if name in loaded]
+    eager += [f"{name} (IN / CONTAINS run)" for name in OPERATOR_LAZY_MODULES if name in operator_loaded]
+    if eager:
+        print(f"\nFAIL: imported at startup although not needed: {', '.join(eager)}")
+        return 1
+    print("\nOK: no lazily loaded module was imported")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
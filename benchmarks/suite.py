@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark suite for the parser, compiler, operators and evaluator.
+
+Every case is timed at several input sizes and reported in nanoseconds per
+call (median of several rounds). Results can be saved as a JSON baseline and
+later runs compared against it; cases slower than the baseline by more than
+the threshold are measured once more, and those still slower make the run
+fail (except the UNGATED ones, which are only flagged).
+
+Usage:
+    python3 benchmarks/suite.py                          # run and compare with the baseline
+    python3 benchmarks/suite.py --save                   # run and store a new baseline
+    python3 benchmarks/suite.py --filter operators.      # only cases whose name contains this
+    python3 benchmarks/suite.py --threshold 0.1 --quick
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from typing import Callable, Collection, Dict, Iterator, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.api import evaluate  # noqa: E402
+from src.codegen import CodeGenerator  # noqa: E402
+from src.compiler import ConditionCompiler, _Parser, tokenize  # noqa: E402
+from src.context import EvaluationContext  # noqa: E402
+from src.engine import RuleEngine  # noqa: E402
+from src.evaluator import TernaryOperator  # noqa: E402
+from src.log import get_logger  # noqa: E402
+from src.parser import ConditionParser  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(ROOT, 'benchmarks', 'baseline.json')
+DEFAULT_THRESHOLD = 0.25
+ROUNDS = 9
+
+# Reported but never counted as regressions: a complete run writes its
+# outputs, swaps os.environ and redirects stdout, so it varies too much
+# between runs to fail on
+UNGATED = ('evaluator.run[',)
+
+SIZES = (1, 10, 100)
+LIST_SIZES = (10, 100, 1000)
+RULE_SIZES = (100, 1000, 10000)
+
+VARIABLES = {
+    'SERVICE': 'game', 'ENVIRONMENT': 'prod', 'BRANCH': 'release/1.2.3', 'VERSION': '42',
+    'MESSAGE': 'fix(parser): handle nested groups in long conditions', 'TAG': '',
+}
+
+Case = Tuple[str, int, Callable[[], object]]
+
+
+def _compile_uncached(condition: str):
+    return ConditionCompiler.compile.__wrapped__(condition)
+
+
+def _conditions(count: int) -> str:
+    """A realistic mix of *count* comma-separated conditions."""
+    templates = (
+        'SERVICE == game',
+        'ENVIRONMENT IN dev,qa,stage,prod',
+        'BRANCH STARTS_WITH release/ && NOT (TAG NOT_EMPTY)',
+        'MESSAGE MATCHES ^(feat|fix)\\(.+\\): || VERSION >= 40',
+    )
+    return ', '.join(templates[i % len(templates)] for i in range(count))
+
+
+def _chain(terms: int) -> str:
+    """One condition of *terms* operands joined by && and ||."""
+    parts = [f"SERVICE == s{i}" if i % 2 else f"ENVIRONMENT IN e{i},prod" for i in range(terms)]
+    return ' || '.join(' && '.join(parts[i:i + 2]) for i in range(0, terms, 2))
+
+
+def parser_cases() -> Iterator[Case]:
+    for size in SIZES:
+        text = _conditions(size)
+        yield 'parser.split_ranges', size, lambda text=text: ConditionParser.split_ranges(text)
+        yield 'parser.parse', size, lambda text=text: ConditionParser.parse(text)
+    for size in SIZES:
+        condition = _chain(size)
+        yield 'compiler.tokenize', size, lambda c=condition: tokenize(c)
+        yield 'compiler.parse_tree', size, lambda c=condition: _Parser(c).parse()
+        yield 'compiler.compile_uncached', size, lambda c=condition: _compile_uncached(c)
+        yield 'compiler.compile_cached', size, lambda c=condition: ConditionCompiler.compile(c)
+
+
+def operator_cases() -> Iterator[Case]:
+    op = TernaryOperator(VARIABLES)
+    context = EvaluationContext(VARIABLES)
+
+    def leaf(condition: str):
+        node = op.compile_condition(condition)
+        return lambda: op.evaluate_node(node, context)
+
+    for size in LIST_SIZES:
+        values = ','.join(f"value{i}" for i in range(size - 1)) + ',game'
+        yield 'operators.in', size, leaf(f"SERVICE IN {values}")
+    for size in LIST_SIZES:
+        keywords = ','.join(f"keyword{i}" for i in range(size))
+        yield 'operators.contains_any', size, leaf(f"MESSAGE CONTAINS_ANY {keywords}")
+    for size in LIST_SIZES:
+        prefixes = ','.join(f"prefix{i}/" for i in range(size - 1)) + ',release/'
+        yield 'operators.starts_with_any', size, leaf(f"BRANCH STARTS_WITH_ANY {prefixes}")
+    for size in LIST_SIZES:
+        patterns = ','.join(f"^prefix{i}/[0-9]+$" for i in range(size - 1)) + ',^release/'
+        yield 'operators.matches_any', size, leaf(f"BRANCH MATCHES_ANY {patterns}")
+    for size in LIST_SIZES:
+        context_long = EvaluationContext(dict(VARIABLES, MESSAGE='x' * size + ' needle'))
+        node = op.compile_condition('MESSAGE CONTAINS needle')
+        yield 'operators.contains', size, lambda n=node, c=context_long: op.evaluate_node(n, c)
+        node = op.compile_condition('MESSAGE MATCHES needle$')
+        yield 'operators.matches', size, lambda n=node, c=context_long: op.evaluate_node(n, c)
+    yield 'operators.comparison_string', 1, leaf('SERVICE == game')
+    yield 'operators.comparison_numeric', 1, leaf('VERSION >= 40')
+    yield 'operators.starts_with', 1, leaf('BRANCH STARTS_WITH release/')
+    yield 'operators.ends_with', 1, leaf('BRANCH ENDS_WITH .3')
+    yield 'operators.empty', 1, leaf('TAG EMPTY')
+
+
+def evaluator_cases() -> Iterator[Case]:
+    op = TernaryOperator(VARIABLES)
+    for size in SIZES:
+        condition = _chain(size)
+        node = op.compile_condition(condition)
+        function = CodeGenerator.compile(condition)
+        yield 'evaluator.evaluate_condition', size, lambda c=condition: op.evaluate_condition(c, EvaluationContext(VARIABLES))
+        yield 'evaluator.tree_walk', size, lambda n=node: op.evaluate_node(n, EvaluationContext(VARIABLES))
+        yield 'evaluator.codegen', size, lambda f=function: f(EvaluationContext(VARIABLES).get)
+
+    for size in (1, 10):
+        yield 'evaluator.run', size, _run_case(size)
+        yield 'api.evaluate', size, lambda c=_conditions(size): evaluate(c, VARIABLES)
+
+
+def _run_case(count: int) -> Callable[[], object]:
+    """A complete evaluate_conditions() run with *count* conditions and outputs."""
+    env = {
+        'INPUT_CONDITIONS': _conditions(count),
+        'INPUT_TRUE_VALUES': ','.join(f"t{i}" for i in range(count)),
+        'INPUT_FALSE_VALUES': ','.join(f"f{i}" for i in range(count)),
+        'GITHUB_OUTPUT': os.devnull,
+    }
+
+    def run():
+        saved = {key: os.environ.get(key) for key in env}
+        os.environ.update(env)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                TernaryOperator(VARIABLES).evaluate_conditions()
+        finally:
+            for key, value in saved.items():
+                if value is None:
+                    os.environ.pop(key, None)
+                else:
+                    os.environ[key] = value
+    return run
+
+
+def logging_cases() -> Iterator[Case]:
+    """Cost of a debug call with debug mode off, lazy arguments vs a pre-formatted f-string."""
+    log = get_logger(False)
+    values = tuple(f"value{i}" for i in range(100))
+    yield 'logging.debug_off_lazy', 1, lambda: log.debug("Checking if %s='%s' IN [%s]", 'SERVICE', 'game', values)
+    yield 'logging.debug_off_fstring', 1, lambda: log.debug(f"Checking if SERVICE='game' IN [{', '.join(values)}]")
+
+
+def _rules(count: int):
+    """*count* rules: five per service, keyed on SERVICE and ENVIRONMENT, plus ten without equality tests."""
+    rules = [f"VERSION >= {i} || TAG NOT_EMPTY" for i in range(10)]
+    for i in range(count - len(rules)):
+        rules.append(f"SERVICE == s{i // 5} && ENVIRONMENT IN e{i % 5},stage && BRANCH STARTS_WITH release/")
+    return rules
+
+
+def engine_cases() -> Iterator[Case]:
+    """Indexed rule engine against evaluating every rule, at growing rule counts."""
+    variables = dict(VARIABLES, SERVICE='s7', ENVIRONMENT='e0')
+    op = TernaryOperator(variables)
+
+    def evaluate_every_rule(nodes):
+        context = EvaluationContext(variables)
+        return [op.evaluate_node(node, context) for node in nodes]
+
+    for size in RULE_SIZES:
+        engine = RuleEngine(_rules(size))
+        yield 'engine.indexed', size, lambda e=engine: e.matching(variables)
+        yield 'engine.linear', size, lambda n=engine.nodes: evaluate_every_rule(n)
+
+
+CASE_GROUPS = (parser_cases, operator_cases, evaluator_cases, logging_cases, engine_cases)
+
+
+def _calls_per_batch(func: Callable[[], object], min_time: float) -> int:
+    """Number of calls of *func* that take at least *min_time* seconds."""
+    number = 1
+    while True:
+        start = time.perf_counter_ns()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter_ns() - start
+        if elapsed >= min_time * 1e9:
+            return number
+        number *= 2 if elapsed < min_time * 1e8 else 1 + int(min_time * 1e9 / max(elapsed, 1))
+
+
+def _time_batch(func: Callable[[], object], number: int) -> float:
+    """Time per call in nanoseconds over one batch of *number* calls, with the garbage collector off as in timeit."""
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = time.perf_counter_ns()
+        for _ in range(number):
+            func()
+        return (time.perf_counter_ns() - start) / number
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def _reference_workload() -> int:
+    total = 0
+    for i in range(1000):
+        total += len(str(i)) * (i & 7)
+    return total
+
+
+def measure(func: Callable[[], object], min_time: float, reference_number: int) -> Tuple[float, float]:
+    """Return the median ns per call of *func* and the median of its ratio to the reference workload.
+
+    Each of ROUNDS rounds times one batch of the reference workload right
+    before one batch of *func*, so the ratio stays comparable when the
+    machine's speed drifts during or between runs (CPU frequency scaling,
+    noisy neighbours on CI). Medians, unlike minimums, are not moved by a
+    single lucky or unlucky batch.
+    """
+    number = _calls_per_batch(func, min_time)
+    values, ratios = [], []
+    for _ in range(ROUNDS):
+        reference = _time_batch(_reference_workload, reference_number)
+        value = _time_batch(func, number)
+        values.append(value)
+        ratios.append(value / reference)
+    return statistics.median(values), statistics.median(ratios)
+
+
+def run_cases(pattern: str, min_time: float, keys: Optional[Collection[str]] = None) -> Dict[str, Tuple[float, float]]:
+    """Return {case: (ns per call, ns per call relative to the reference workload)}.
+
+    Only cases whose name contains *pattern* and, if given, is in *keys* are run.
+    """
+    reference_number = _calls_per_batch(_reference_workload, min_time)
+    results = {}
+    for group in CASE_GROUPS:
+        for name, size, func in group():
+            key = f"{name}[{size}]"
+            if pattern in key and (keys is None or key in keys):
+                results[key] = measure(func, min_time, reference_number)
+    return results
+
+
+def slower_cases(results: Dict[str, Tuple[float, float]], baseline: Dict[str, dict], threshold: float) -> List[str]:
+    """Return the gated cases slower than the baseline by more than *threshold*."""
+    return [
+        key for key, (_, relative) in results.items()
+        if key in baseline and not key.startswith(UNGATED) and relative / baseline[key]['relative'] - 1 > threshold
+    ]
+
+
+def compare(results: Dict[str, Tuple[float, float]], baseline: Dict[str, dict], threshold: float) -> int:
+    """Print the report and return the number of regressions.
+
+    Changes are computed on the reference-relative figures, so a uniformly
+    slower or faster machine is not reported as a regression. UNGATED cases
+    are flagged but not counted.
+    """
+    regressions = 0
+    print(f"{'case':<40} {'ns/op':>12} {'baseline':>12} {'change':>8}")
+    for key, (value, relative) in results.items():
+        base = baseline.get(key)
+        if base is None:
+            print(f"{key:<40} {value:>12,.0f} {'-':>12} {'new':>8}")
+            continue
+        change = relative / base['relative'] - 1
+        base = base['ns']
+        flag = ''
+        if change > threshold and key.startswith(UNGATED):
+            flag = '  slower (not gated)'
+        elif change > threshold:
+            flag = '  REGRESSION'
+            regressions += 1
+        print(f"{key:<40} {value:>12,.0f} {base:>12,.0f} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='baseline JSON file')
+    parser.add_argument('--save', action='store_true', help='store the results as the new baseline')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='relative slowdown reported as a regression (default: %(default)s)')
+    parser.add_argument('--filter', default='', help='only run cases whose name contains this text')
+    parser.add_argument('--quick', action='store_true', help='shorter timing batches, noisier results')
+    args = parser.parse_args()
+
+    min_time = 0.01 if args.quick else 0.05
+    results = run_cases(args.filter, min_time)
+
+    if args.save:
+        data = {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'results': {
+                key: {'ns': round(value, 1), 'relative': round(relative, 5)}
+                for key, (value, relative) in results.items()
+            },
+        }
+        with open(args.baseline, 'w') as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"Saved {len(results)} results to {args.baseline}")
+        return 0
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+    else:
+        print(f"No baseline at {args.baseline}; run with --save to create one\n")
+
+    # A case can be slow once by chance (another process on the core, a
+    # frequency change): flagged cases are measured again and keep the
+    # faster result, so only a slowdown seen twice fails the run
+    slow = slower_cases(results, baseline, args.threshold)
+    if slow:
+        remeasured = run_cases(args.filter, min_time, slow)
+        for key in slow:
+            results[key] = min(results[key], remeasured[key], key=lambda result: result[1])
+
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n{regressions} case(s) slower than the baseline by more than {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
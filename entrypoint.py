@@ -2,18 +2,24 @@
 """
 Ternary Operator Action - Entry Point
 Evaluates multiple conditions and sets corresponding outputs.
+
+Run with ``--serve [SOCKET]`` to start the evaluator daemon instead.
 """
 
+import os
 import sys
 from src.evaluator import TernaryOperator
 
 
 def main() -> int:
     """Entry point for the script."""
+    if len(sys.argv) > 1 and sys.argv[1] == '--serve':
+        from src.server import DEFAULT_SOCKET_PATH, serve
+        path = sys.argv[2] if len(sys.argv) > 2 else os.getenv('TERNARY_OPERATOR_SOCKET', DEFAULT_SOCKET_PATH)
+        return serve(path)
     operator = TernaryOperator()
     return operator.run()
 
 
 if __name__ == '__main__':
     sys.exit(main())
-
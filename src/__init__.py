@@ -6,4 +6,4 @@ for GitHub Actions workflows.
 """
 
 __version__ = "1.3.2"
-__all__ = ["TernaryOperator", "ConditionParser"]
+__all__ = ["TernaryOperator", "ConditionParser", "ConditionCompiler"]
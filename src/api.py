@@ -0,0 +1,88 @@
+"""
+Library API: evaluate conditions against a mapping of variables, safely from
+any number of threads.
+
+TernaryOperator is built around one action run: it reads its settings from
+the INPUT_* environment and keeps per-run state (timings, the loaded rule
+set) on the instance. evaluate() takes the conditions, the variables and the
+settings as arguments instead. Everything it keeps between calls is
+immutable or only ever filled in: compiled trees and generated functions in
+the compile caches, and one tree walker per case sensitivity, whose
+handlers hold no per-call state. Variable values and memoized results live in an
+EvaluationContext created for each call.
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Mapping, Optional, Sequence, Union
+
+from .compiler import ConditionCompiler, shared_subexpressions
+from .context import EvaluationContext
+from .evaluator import TernaryOperator
+from .parser import ConditionParser
+
+
+@dataclass(frozen=True)
+class EvaluationOptions:
+    """Settings of an evaluate() call; the same as the action inputs of the same name."""
+    case_sensitive: bool = True
+    reorder_operands: bool = True
+    backend: str = 'tree'
+
+    def __post_init__(self):
+        TernaryOperator.check_backend(self.backend)
+
+
+DEFAULT_OPTIONS = EvaluationOptions()
+
+
+@lru_cache(maxsize=None)
+def _tree_walker(case_sensitive: bool) -> TernaryOperator:
+    """A TernaryOperator used only to walk compiled trees, shared by all calls with this case sensitivity.
+
+    Walking a tree never modifies the instance, except to add an operator
+    evaluator to its dispatch table the first time a node type is seen; two
+    threads doing so at once each store an equivalent evaluator.
+    """
+    return TernaryOperator.for_library(case_sensitive)
+
+
+def evaluate(conditions: Union[str, Sequence[str]], variables: Mapping[str, str],
+             options: Optional[EvaluationOptions] = None) -> List[bool]:
+    """
+    Evaluate *conditions* with the values in *variables* and return one result per condition.
+
+    Examples:
+        evaluate('SERVICE == game, ENV IN qa,prod', {'SERVICE': 'game', 'ENV': 'dev'})
+            -> [True, False]
+        evaluate(['BRANCH MATCHES ^release/'], {'BRANCH': 'release/1.2'}, EvaluationOptions(backend='codegen'))
+            -> [True]
+
+    Args:
+        conditions: Comma-separated conditions as given to the ``conditions``
+            input, or a sequence of single conditions
+        variables: Variable values; a variable missing from it is empty.
+            The process environment is never read.
+        options: Case sensitivity, operand ordering and backend
+
+    A condition that cannot be compiled or raises during evaluation is
+    False (see TernaryOperator.safe_results). Safe to call from several
+    threads at once, with the same or different arguments.
+    """
+    if options is None:
+        options = DEFAULT_OPTIONS
+    if isinstance(conditions, str):
+        conditions = ConditionParser.parse(conditions)
+    settings = (TernaryOperator.MAX_RECURSION_DEPTH, options.case_sensitive, options.reorder_operands)
+
+    if options.backend == 'codegen':
+        from .codegen import CodeGenerator
+        functions = [CodeGenerator.compile(condition, *settings) for condition in conditions]
+        context = EvaluationContext(variables)
+        return TernaryOperator.safe_results(lambda function: function(context.get), functions)
+
+    nodes = [ConditionCompiler.compile(condition, *settings) for condition in conditions]
+    # Sub-conditions shared between conditions are evaluated once per call
+    context = EvaluationContext(variables, (), shared_subexpressions(nodes))
+    walk = _tree_walker(options.case_sensitive).evaluate_node
+    return TernaryOperator.safe_results(lambda node: walk(node, context), nodes)
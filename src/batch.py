@@ -0,0 +1,224 @@
+"""
+Column-wise batch evaluation of compiled conditions over many rows of variables.
+
+NumPy is optional: when it is installed, each node is evaluated as a whole-
+column array operation; otherwise every row runs through the code-generation
+backend and plain lists of booleans are returned.
+"""
+
+from typing import Dict, List, Mapping, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without NumPy
+    np = None
+
+from .codegen import CodeGenerator
+from .compiler import (
+    ConditionCompiler, COMPARISON_OPS, MAX_DEPTH, InvalidNode, NotNode, AndNode, OrNode, ComparisonNode,
+    InNode, ContainsNode, ContainsAnyNode, StartsEndsWithNode, StartsEndsWithAnyNode, MatchesNode, MatchesAnyNode,
+    EmptyNode, SemverNode, FileSearchNode, SEMVER_OPERATORS, compare_values, is_numeric, referenced_variables,
+)
+from .version import compare_versions, parse_version
+
+
+class BatchEvaluator:
+    """
+    Evaluate conditions over columns of variable values.
+
+    Examples:
+        batch = BatchEvaluator({'SERVICE': ['game', 'web'], 'ENV': ['prod', 'prod']})
+        batch.evaluate('SERVICE IN game,batch && ENV == prod')  -> [True, False]
+
+    Columns are converted once and reused by every condition evaluated on the
+    same instance (case folding, numeric parsing). Variables without a column
+    evaluate as empty strings, like unset environment variables.
+    """
+
+    def __init__(self, columns: Mapping[str, Sequence[str]], case_sensitive: bool = True,
+                 max_depth: int = MAX_DEPTH, use_numpy: Optional[bool] = None):
+        lengths = {len(column) for column in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"All columns must have the same length, got {sorted(lengths)}")
+        self.size = lengths.pop() if lengths else 0
+        self.case_sensitive = case_sensitive
+        self.max_depth = max_depth
+        self.use_numpy = np is not None if use_numpy is None else use_numpy
+        if self.use_numpy and np is None:
+            raise ValueError("NumPy is not installed")
+
+        if self.use_numpy:
+            self.columns = {name: np.asarray(column, dtype=str) for name, column in columns.items()}
+            self._empty = np.full(self.size, '', dtype=str)
+        else:
+            self.columns = {name: list(column) for name, column in columns.items()}
+            self._empty = [''] * self.size
+        self._folded: Dict[str, object] = {}
+        self._numbers: Dict[str, tuple] = {}
+
+    def evaluate(self, condition: str):
+        """
+        Evaluate *condition* for every row.
+
+        Returns:
+            Boolean NumPy array, or a list of bools without NumPy
+        """
+        node = ConditionCompiler.compile(condition, self.max_depth, self.case_sensitive)
+        if self.use_numpy:
+            return self._evaluate_array(node)
+        return self._evaluate_rows(condition, node)
+
+    def evaluate_all(self, conditions: Sequence[str]) -> List:
+        """Evaluate each condition, returning one boolean array per condition."""
+        return [self.evaluate(condition) for condition in conditions]
+
+    # Pure-Python fallback
+
+    def _evaluate_rows(self, condition: str, node) -> List[bool]:
+        function = CodeGenerator.compile(condition, self.max_depth, self.case_sensitive)
+        names = sorted(referenced_variables(node))
+        if not names:
+            return [function({}.get)] * self.size
+        columns = [self.columns.get(name, self._empty) for name in names]
+        return [function(dict(zip(names, row)).__getitem__) for row in zip(*columns)]
+
+    # NumPy evaluation
+
+    def _column(self, name: str):
+        return self.columns.get(name, self._empty)
+
+    def _fold(self, name: str):
+        """Column *name* lower-cased when comparisons are case-insensitive."""
+        if self.case_sensitive:
+            return self._column(name)
+        folded = self._folded.get(name)
+        if folded is None:
+            folded = self._folded[name] = np.char.lower(self._column(name))
+        return folded
+
+    def _literal(self, value: str) -> str:
+        return value if self.case_sensitive else value.lower()
+
+    def _per_unique(self, column, function, dtype):
+        """Apply a scalar *function* once per distinct value of *column*."""
+        unique, inverse = np.unique(column, return_inverse=True)
+        mapped = np.fromiter((function(value) for value in unique.tolist()), dtype=dtype, count=len(unique))
+        return mapped[inverse.reshape(-1)]
+
+    def _numbers_of(self, name: str):
+        """(is_numeric mask, float values) for column *name*, parsed once per distinct value."""
+        numbers = self._numbers.get(name)
+        if numbers is None:
+            unique, inverse = np.unique(self._column(name), return_inverse=True)
+            values = unique.tolist()
+            mask = np.fromiter((is_numeric(v) for v in values), dtype=bool, count=len(values))
+            parsed = np.fromiter((float(v) if m else 0.0 for v, m in zip(values, mask.tolist())),
+                                 dtype=float, count=len(values))
+            inverse = inverse.reshape(-1)
+            numbers = self._numbers[name] = (mask[inverse], parsed[inverse])
+        return numbers
+
+    def _evaluate_array(self, node):
+        if isinstance(node, NotNode):
+            return ~self._evaluate_array(node.operand)
+        if isinstance(node, AndNode):
+            return np.logical_and.reduce([self._evaluate_array(o) for o in node.operands])
+        if isinstance(node, OrNode):
+            return np.logical_or.reduce([self._evaluate_array(o) for o in node.operands])
+        if isinstance(node, ComparisonNode):
+            return self._comparison(node)
+        if isinstance(node, InNode):
+            column = self._column(node.var_name)
+            return (column != '') & np.isin(self._fold(node.var_name), list(node.value_set))
+        if isinstance(node, ContainsNode):
+            operand = node.operand
+            needle = self._fold(operand.value) if operand.is_variable else self._literal(operand.value)
+            return np.char.find(self._fold(node.var_name), needle) >= 0
+        if isinstance(node, ContainsAnyNode):
+            return self._per_unique(self._fold(node.var_name), node.automaton.search, bool)
+        if isinstance(node, StartsEndsWithNode):
+            check = np.char.startswith if node.op_name == 'STARTS_WITH' else np.char.endswith
+            return check(self._fold(node.var_name), self._literal(node.target))
+        if isinstance(node, StartsEndsWithAnyNode):
+            return self._per_unique(self._fold(node.var_name), node.trie.match, bool)
+        if isinstance(node, MatchesNode):
+            regex = node.regex
+            return self._per_unique(self._column(node.var_name), lambda v: regex.search(v) is not None, bool)
+        if isinstance(node, MatchesAnyNode):
+            return self._per_unique(self._column(node.var_name), node.pattern_set.search, bool)
+        if isinstance(node, EmptyNode):
+            empty = np.char.strip(self._column(node.var_name)) == ''
+            return ~empty if node.negate else empty
+        if isinstance(node, SemverNode):
+            return self._semver(node)
+        if isinstance(node, FileSearchNode):
+            # Each distinct file is searched once
+            from .files import search_file_quietly
+            if not node.path.is_variable:
+                return np.full(self.size, search_file_quietly(node.path.value, node))
+            return self._per_unique(self._column(node.path.value), lambda v: search_file_quietly(v, node), bool)
+        if isinstance(node, InvalidNode):
+            return np.zeros(self.size, dtype=bool)
+        raise TypeError(f"Unsupported node type: {type(node).__name__}")
+
+    def _semver(self, node: SemverNode):
+        """Version comparison; each distinct value is parsed once."""
+        op_func = COMPARISON_OPS[SEMVER_OPERATORS[node.op_name]]
+        operand = node.operand
+        if not operand.is_variable:
+            key = node.key
+            return self._per_unique(
+                self._column(node.var_name), lambda v: compare_versions(op_func, parse_version(v), key), bool
+            )
+        keys: Dict[str, object] = {}
+
+        def version(value: str):
+            if value not in keys:
+                keys[value] = parse_version(value)
+            return keys[value]
+
+        pairs = zip(self._column(node.var_name).tolist(), self._column(operand.value).tolist())
+        return np.fromiter((compare_versions(op_func, version(l), version(r)) for l, r in pairs),
+                           dtype=bool, count=self.size)
+
+    def _comparison(self, node: ComparisonNode):
+        op_func = COMPARISON_OPS[node.op]
+        left, right = node.left, node.right
+        if not left.is_variable and not right.is_variable:
+            return np.full(self.size, compare_values(op_func, left.value, right.value, self.case_sensitive))
+
+        def numbers(operand):
+            if operand.is_variable:
+                return self._numbers_of(operand.value)
+            numeric = is_numeric(operand.value)
+            return numeric, float(operand.value) if numeric else 0.0
+
+        def strings(operand):
+            return self._fold(operand.value) if operand.is_variable else self._literal(operand.value)
+
+        left_mask, left_values = numbers(left)
+        right_mask, right_values = numbers(right)
+        numeric = np.broadcast_to(np.logical_and(left_mask, right_mask), (self.size,))
+        by_string = op_func(strings(left), strings(right))
+        if not numeric.any():
+            return np.broadcast_to(by_string, (self.size,)).copy()
+        return np.where(numeric, op_func(left_values, right_values), by_string)
+
+
+def evaluate_batch(conditions: Sequence[str], columns: Mapping[str, Sequence[str]],
+                   case_sensitive: bool = True) -> List:
+    """
+    Evaluate each condition over columns of variable values.
+
+    Examples:
+        evaluate_batch(['ENV == prod'], {'ENV': ['prod', 'qa']})  -> [array([ True, False])]
+
+    Args:
+        conditions: Condition strings as produced by ConditionParser
+        columns: Mapping from variable name to one value per row
+        case_sensitive: Whether string operators compare case-sensitively
+
+    Returns:
+        One boolean array (or list without NumPy) per condition
+    """
+    return BatchEvaluator(columns, case_sensitive).evaluate_all(conditions)
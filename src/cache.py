@@ -0,0 +1,74 @@
+"""
+Bounded caches used by the condition compiler.
+"""
+
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable
+
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Bounded least-recently-used cache with hit, miss and eviction counters.
+
+    Safe to share between threads without a lock: each step is a single
+    OrderedDict operation, and an entry evicted by another thread in between
+    is simply created again. Counters may then be slightly off.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: OrderedDict = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get_or_create(self, key: Hashable, factory: Callable):
+        """Return the cached value for *key*, creating it with *factory* on a miss.
+
+        Exceptions raised by *factory* propagate and nothing is cached.
+        """
+        value = self._data.get(key, _MISSING)
+        if value is _MISSING:
+            self.misses += 1
+            value = factory()
+            self._data[key] = value
+            while len(self._data) > self.maxsize:
+                try:
+                    self._data.popitem(last=False)
+                except KeyError:
+                    break
+                self.evictions += 1
+            return value
+        self.hits += 1
+        try:
+            self._data.move_to_end(key)
+        except KeyError:
+            pass
+        return value
+
+    def resize(self, maxsize: int) -> None:
+        """Change the capacity, evicting least recently used entries if needed."""
+        self.maxsize = maxsize
+        while len(self._data) > maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        self._data.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Return the current size, capacity and counters."""
+        return {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
@@ -0,0 +1,192 @@
+"""
+Code-generation backend: translates a compiled condition tree into a Python
+function so evaluation is a single call with no tree walking.
+"""
+
+import marshal
+from functools import lru_cache
+from typing import Callable, Dict, List, Tuple
+
+from .compiler import (
+    ConditionCompiler, COMPARISON_OPS, MAX_DEPTH, COMPILE_CACHE_SIZE, InvalidNode, NotNode, AndNode, OrNode,
+    ComparisonNode, InNode, ContainsNode, ContainsAnyNode, StartsEndsWithNode, StartsEndsWithAnyNode, MatchesNode,
+    MatchesAnyNode, EmptyNode, SemverNode, FileSearchNode, SEMVER_OPERATORS, compare_values, is_numeric,
+    referenced_variables,
+)
+from .version import compare_versions, parse_version
+
+
+class _SourceBuilder:
+    """Emits a Python expression for a tree, collecting constants to bind."""
+
+    def __init__(self, case_sensitive: bool, variables: Dict[str, str]):
+        self.case_sensitive = case_sensitive
+        self.variables = variables
+        self.constants: Dict[str, object] = {}
+
+    def constant(self, value) -> str:
+        name = f"_c{len(self.constants)}"
+        self.constants[name] = value
+        return name
+
+    def fold(self, expr: str) -> str:
+        return expr if self.case_sensitive else f"{expr}.lower()"
+
+    def literal(self, value: str) -> str:
+        return repr(value if self.case_sensitive else value.lower())
+
+    def expression(self, node) -> str:
+        if isinstance(node, NotNode):
+            return f"(not {self.expression(node.operand)})"
+        if isinstance(node, AndNode):
+            return '(' + ' and '.join(self.expression(o) for o in node.operands) + ')'
+        if isinstance(node, OrNode):
+            return '(' + ' or '.join(self.expression(o) for o in node.operands) + ')'
+        if isinstance(node, ComparisonNode):
+            return self._comparison(node)
+        if isinstance(node, InNode):
+            var = self.variables[node.var_name]
+            return f"({var} != '' and {self.fold(var)} in {self.constant(node.value_set)})"
+        if isinstance(node, ContainsNode):
+            var = self.variables[node.var_name]
+            operand = node.operand
+            needle = self.fold(self.variables[operand.value]) if operand.is_variable else self.literal(operand.value)
+            return f"({needle} in {self.fold(var)})"
+        if isinstance(node, ContainsAnyNode):
+            var = self.variables[node.var_name]
+            return f"{self.constant(node.automaton)}.search({self.fold(var)})"
+        if isinstance(node, StartsEndsWithNode):
+            method = 'startswith' if node.op_name == 'STARTS_WITH' else 'endswith'
+            var = self.variables[node.var_name]
+            return f"{self.fold(var)}.{method}({self.literal(node.target)})"
+        if isinstance(node, StartsEndsWithAnyNode):
+            var = self.variables[node.var_name]
+            return f"{self.constant(node.trie)}.match({self.fold(var)})"
+        if isinstance(node, MatchesNode):
+            var = self.variables[node.var_name]
+            return f"({self.constant(node.regex)}.search({var}) is not None)"
+        if isinstance(node, MatchesAnyNode):
+            var = self.variables[node.var_name]
+            return f"{self.constant(node.pattern_set)}.search({var})"
+        if isinstance(node, EmptyNode):
+            var = self.variables[node.var_name]
+            return f"({var}.strip() != '')" if node.negate else f"(not {var}.strip())"
+        if isinstance(node, SemverNode):
+            return self._semver(node)
+        if isinstance(node, FileSearchNode):
+            from .files import search_file_prefetched
+            path = self.variables[node.path.value] if node.path.is_variable else repr(node.path.value)
+            return f"{self.constant(search_file_prefetched)}(files, {path}, {self.constant(node)})"
+        if isinstance(node, InvalidNode):
+            return 'False'
+        raise TypeError(f"Unsupported node type: {type(node).__name__}")
+
+    def _comparison(self, node: ComparisonNode) -> str:
+        left, right = node.left, node.right
+        if not left.is_variable and not right.is_variable:
+            # Both sides are literals: fold the result into a constant
+            return repr(compare_values(COMPARISON_OPS[node.op], left.value, right.value, self.case_sensitive))
+
+        def operand_expr(operand) -> str:
+            return self.variables[operand.value] if operand.is_variable else repr(operand.value)
+
+        literal = right if not right.is_variable else left if not left.is_variable else None
+        if literal is not None and not is_numeric(literal.value):
+            # A non-numeric literal always forces a string comparison
+            left_expr = self.fold(operand_expr(left)) if left.is_variable else self.literal(left.value)
+            right_expr = self.fold(operand_expr(right)) if right.is_variable else self.literal(right.value)
+            return f"({left_expr} {node.op} {right_expr})"
+
+        op_func = self.constant(COMPARISON_OPS[node.op])
+        return f"_compare({op_func}, {operand_expr(left)}, {operand_expr(right)}, {self.case_sensitive!r})"
+
+    def _semver(self, node: SemverNode) -> str:
+        parse = self.constant(parse_version)
+        left = f"{parse}({self.variables[node.var_name]})"
+        operand = node.operand
+        right = f"{parse}({self.variables[operand.value]})" if operand.is_variable else self.constant(node.key)
+        op_func = self.constant(COMPARISON_OPS[SEMVER_OPERATORS[node.op_name]])
+        return f"{self.constant(compare_versions)}({op_func}, {left}, {right})"
+
+
+def generate_source(node, case_sensitive: bool = True):
+    """
+    Translate a compiled tree into the source of a function factory.
+
+    The generated ``_make`` receives the bound constants (precompiled
+    regexes, frozensets, operator functions) and returns
+    ``condition(get, files=None)``, where ``get`` maps a variable name to its
+    value and ``files`` holds file search results prefetched for the run
+    (EvaluationContext.files).
+
+    Returns:
+        Tuple of (source, constants) where constants maps names to values
+    """
+    names = sorted(referenced_variables(node))
+    variables = {name: f"v{i}" for i, name in enumerate(names)}
+    builder = _SourceBuilder(case_sensitive, variables)
+    expression = builder.expression(node)
+
+    params = ', '.join(['_compare'] + list(builder.constants))
+    lines: List[str] = [f"def _make({params}):", "    def condition(get, files=None):"]
+    lines.extend(f"        {var} = get({name!r})" for name, var in variables.items())
+    lines.append(f"        return {expression}")
+    lines.append("    return condition")
+    return '\n'.join(lines) + '\n', builder.constants
+
+
+def _instantiate(code, constants) -> Callable:
+    namespace: Dict[str, object] = {}
+    exec(code, namespace)
+    return namespace['_make'](compare_values, *constants)
+
+
+def compile_node(node, case_sensitive: bool = True) -> Callable:
+    """Generate, compile and instantiate the Python function for a tree."""
+    source, constants = generate_source(node, case_sensitive)
+    return _instantiate(compile(source, '<condition>', 'exec'), constants.values())
+
+
+def function_code(node, case_sensitive: bool = True) -> Tuple[bytes, tuple]:
+    """
+    Return the function for a tree as marshalled bytecode and its bound constants.
+
+    The pair can be stored (see diskcache.encode for the constants) and
+    turned back into the function with load_function() without generating
+    or compiling source again. Marshalled code is only valid for the Python version that
+    produced it.
+    """
+    source, constants = generate_source(node, case_sensitive)
+    return marshal.dumps(compile(source, '<condition>', 'exec')), tuple(constants.values())
+
+
+def load_function(code: bytes, constants: tuple) -> Callable:
+    """Instantiate a function stored with function_code()."""
+    return _instantiate(marshal.loads(code), constants)
+
+
+class CodeGenerator:
+    """Compiler from condition strings to cached Python functions."""
+
+    @staticmethod
+    @lru_cache(maxsize=COMPILE_CACHE_SIZE)
+    def compile(condition: str, max_depth: int = MAX_DEPTH, case_sensitive: bool = True,
+                reorder: bool = False) -> Callable:
+        """
+        Compile a condition string into a function of a variable lookup.
+
+        Examples:
+            fn = CodeGenerator.compile('SERVICE IN game,batch && ENV == prod')
+            fn({'SERVICE': 'game', 'ENV': 'prod'}.get)  -> True
+
+        Args:
+            condition: Condition string as produced by ConditionParser
+            max_depth: Nesting depth beyond which sub-conditions evaluate to False
+            case_sensitive: Whether string operators compare case-sensitively
+            reorder: Reorder ``&&``/``||`` operands so cheaper checks run first
+
+        Returns:
+            Function taking ``get(name) -> str`` and returning the condition result
+        """
+        node = ConditionCompiler.compile(condition, max_depth, case_sensitive, reorder)
+        return compile_node(node, case_sensitive)
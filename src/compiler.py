@@ -0,0 +1,712 @@
+"""
+Condition compiler: turns a condition string into an immutable expression tree.
+
+A condition is tokenized and parsed once; the resulting tree is cached by
+condition text so repeated evaluations only walk the tree.
+"""
+
+import operator
+import re
+import weakref
+from collections import Counter
+from functools import lru_cache
+from typing import Callable, FrozenSet, List, Optional, Tuple, Union
+
+from .cache import LRUCache
+
+# The keyword indexes and the version parser are imported by the parse
+# methods of the operators that need them, so conditions without those
+# operators do not load them at start-up.
+
+VARIABLE_PATTERN = re.compile(r'^[A-Z][A-Z0-9_]*$')
+
+# Longest first so that '<=' is not matched as '<'
+COMPARISON_OPERATORS = ('<=', '>=', '!=', '==', '<', '>')
+
+COMPARISON_OPS = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<=': operator.le,
+    '>=': operator.ge,
+    '<': operator.lt,
+    '>': operator.gt,
+}
+
+
+def is_numeric(value: str) -> bool:
+    """Check if a string value is numeric (int or float)."""
+    try:
+        float(value)
+        return True
+    except ValueError:
+        return False
+
+
+def compare_values(op_func: Callable, left: str, right: str, case_sensitive: bool = True) -> bool:
+    """Apply a comparison operator: numerically when both sides are numbers, otherwise to the strings.
+
+    Shared by every backend, so ``==``, ``<`` and the rest mean the same in
+    the tree walker, generated code and batch evaluation.
+    """
+    try:
+        # Each side is parsed once
+        numbers = float(left), float(right)
+    except ValueError:
+        numbers = None
+    if numbers is not None:
+        return bool(op_func(*numbers))
+    if not case_sensitive:
+        left, right = left.lower(), right.lower()
+    return bool(op_func(left, right))
+
+
+# Semantic version operators and the comparison each one performs
+SEMVER_OPERATORS = {
+    'SEMVER_EQ': '==',
+    'SEMVER_NE': '!=',
+    'SEMVER_GT': '>',
+    'SEMVER_GTE': '>=',
+    'SEMVER_LT': '<',
+    'SEMVER_LTE': '<=',
+}
+SEMVER_PATTERN = re.compile(r'\s+(SEMVER_(?:EQ|NE|GTE|GT|LTE|LT))\s+')
+
+MAX_DEPTH = 50
+COMPILE_CACHE_SIZE = 4096
+PATTERN_CACHE_SIZE = 1024
+
+# Compiled MATCHES patterns keyed by (pattern, flags)
+PATTERN_CACHE = LRUCache(PATTERN_CACHE_SIZE)
+
+# Canonical instance of every live node, so equal sub-trees are one object
+_INTERNED_NODES = weakref.WeakValueDictionary()
+
+# Token kinds
+LPAREN = 'LPAREN'
+RPAREN = 'RPAREN'
+AND = 'AND'
+OR = 'OR'
+NOT = 'NOT'
+LEAF = 'LEAF'
+EOF = 'EOF'
+
+
+class ConditionSyntaxError(ValueError):
+    """Raised when a condition string cannot be parsed into a tree."""
+
+
+class _ValueObject:
+    """Immutable value with equality, hashing and repr over its ``__slots__``.
+
+    Used instead of frozen dataclasses: importing ``dataclasses`` and
+    generating the methods for every node class would add ~20 ms to each
+    action start.
+    """
+
+    __slots__ = ('__weakref__',)
+
+    def __init__(self, *values):
+        names = self.__slots__
+        if len(values) != len(names):
+            raise TypeError(f"{type(self).__name__} takes {len(names)} arguments, got {len(values)}")
+        for name, value in zip(names, values):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"cannot assign to field '{name}'")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"cannot delete field '{name}'")
+
+    def _values(self) -> tuple:
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return self._values() == other._values()
+
+    def __hash__(self):
+        return hash(self._values())
+
+    def __repr__(self):
+        fields = ', '.join(f"{name}={value!r}" for name, value in zip(self.__slots__, self._values()))
+        return f"{type(self).__name__}({fields})"
+
+    def __reduce__(self):
+        return type(self), self._values()
+
+
+class Operand(_ValueObject):
+    """A comparison operand: either a variable name or a literal value."""
+    __slots__ = ('value', 'is_variable')
+    value: str
+    is_variable: bool
+
+    @classmethod
+    def parse(cls, text: str) -> 'Operand':
+        """Treat uppercase identifiers as variable names, everything else as literals."""
+        return cls(text, bool(VARIABLE_PATTERN.match(text)))
+
+
+class InvalidNode(_ValueObject):
+    """A condition (or part of one) that could not be compiled; evaluates to False."""
+    __slots__ = ('condition', 'message')
+    condition: str
+    message: str
+
+
+class NotNode(_ValueObject):
+    """Logical negation of a sub-condition."""
+    __slots__ = ('operand',)
+    operand: object
+
+
+class AndNode(_ValueObject):
+    """Logical conjunction (``&&``) of two or more sub-conditions."""
+    __slots__ = ('operands',)
+    operands: Tuple
+
+
+class OrNode(_ValueObject):
+    """Logical disjunction (``||``) of two or more sub-conditions."""
+    __slots__ = ('operands',)
+    operands: Tuple
+
+
+class ComparisonNode(_ValueObject):
+    """Comparison with one of ``==``, ``!=``, ``<``, ``>``, ``<=``, ``>=``."""
+    __slots__ = ('left', 'op', 'right')
+    left: Operand
+    op: str
+    right: Operand
+
+    @classmethod
+    def parse(cls, condition: str, case_sensitive: bool = True):
+        for op in COMPARISON_OPERATORS:
+            if f' {op} ' in condition:
+                left, right = condition.split(f' {op} ', 1)
+                return cls(Operand.parse(left.strip()), op, Operand.parse(right.strip()))
+        return InvalidNode(condition, f"No valid operator found in condition: '{condition}'")
+
+
+class InNode(_ValueObject):
+    """``VAR IN a,b,c`` membership test against a precomputed set of normalized values."""
+    __slots__ = ('var_name', 'values', 'value_set')
+    var_name: str
+    values: Tuple[str, ...]
+    value_set: FrozenSet[str]
+
+    @classmethod
+    def parse(cls, condition: str, case_sensitive: bool = True):
+        parts = condition.split(' IN ')
+        if len(parts) != 2:
+            return InvalidNode(condition, f"Invalid IN operator syntax: {condition}")
+        values = tuple(v.strip() for v in parts[1].strip().split(',') if v.strip())
+        value_set = frozenset(values if case_sensitive else (v.lower() for v in values))
+        return cls(parts[0].strip(), values, value_set)
+
+
+class ContainsNode(_ValueObject):
+    """``VAR CONTAINS text`` substring test; an uppercase right side is a variable."""
+    __slots__ = ('var_name', 'operand')
+    var_name: str
+    operand: Operand
+
+    @classmethod
+    def parse(cls, condition: str, case_sensitive: bool = True):
+        parts = re.split(r'\s+CONTAINS\s+', condition, flags=re.IGNORECASE)
+        if len(parts) != 2:
+            return InvalidNode(condition, f"Invalid CONTAINS operator syntax: {condition}")
+        right = parts[1].strip()
+        return cls(parts[0].strip(), Operand(right, right.isupper()))
+
+
+class ContainsAnyNode(_ValueObject):
+    """``VAR CONTAINS_ANY a,b,c`` test against an Aho-Corasick automaton of the keywords."""
+    __slots__ = ('var_name', 'keywords', 'automaton')
+    var_name: str
+    keywords: Tuple[str, ...]
+    automaton: 'AhoCorasick'
+
+    @classmethod
+    def parse(cls, condition: str, case_sensitive: bool = True):
+        parts = re.split(r'\s+CONTAINS_ANY\s+', condition, maxsplit=1)
+        keywords = tuple(k.strip() for k in parts[1].split(',') if k.strip()) if len(parts) == 2 else ()
+        if not keywords or not parts[0].strip():
+            return InvalidNode(condition, f"Invalid CONTAINS_ANY operator syntax: {condition}")
+        from .keywords import AhoCorasick
+        automaton = AhoCorasick(keywords if case_sensitive else (k.lower() for k in keywords))
+        return cls(parts[0].strip(), keywords, automaton)
+
+
+class StartsEndsWithNode(_ValueObject):
+    """``VAR STARTS_WITH prefix`` or ``VAR ENDS_WITH suffix``."""
+    __slots__ = ('var_name', 'op_name', 'target')
+    var_name: str
+    op_name: str
+    target: str
+
+    @classmethod
+    def parse(cls, condition: str, case_sensitive: bool = True):
+        op_name = 'STARTS_WITH' if 'STARTS_WITH' in condition else 'ENDS_WITH'
+        parts = re.split(rf'\s+{op_name}\s+', condition, maxsplit=1)
+        if len(parts) != 2:
+            return InvalidNode(condition, f"Invalid {op_name} operator syntax: {condition}")
+        return cls(parts[0].strip(), op_name, parts[1].strip())
+
+
+class StartsEndsWithAnyNode(_ValueObject):
+    """``VAR STARTS_WITH_ANY p1,p2`` or ``VAR ENDS_WITH_ANY s1,s2`` against a trie of the values."""
+    __slots__ = ('var_name', 'op_name', 'values', 'trie')
+    var_name: str
+    op_name: str
+    values: Tuple[str, ...]
+    trie: 'PrefixTrie'
+
+    @classmethod
+    def parse(cls, condition: str, case_sensitive: bool = True):
+        op_name = 'STARTS_WITH_ANY' if ' STARTS_WITH_ANY ' in condition else 'ENDS_WITH_ANY'
+        parts = re.split(rf'\s+{op_name}\s+', condition, maxsplit=1)
+        values = tuple(v.strip() for v in parts[1].split(',') if v.strip()) if len(parts) == 2 else ()
+        if not values or not parts[0].strip():
+            return InvalidNode(condition, f"Invalid {op_name} operator syntax: {condition}")
+        from .keywords import PrefixTrie
+        trie = PrefixTrie(values if case_sensitive else (v.lower() for v in values),
+                          reverse=op_name == 'ENDS_WITH_ANY')
+        return cls(parts[0].strip(), op_name, values, trie)
+
+
+class MatchesNode(_ValueObject):
+    """``VAR MATCHES pattern`` regular expression search with a precompiled pattern."""
+    __slots__ = ('var_name', 'pattern', 'regex')
+    var_name: str
+    pattern: str
+    regex: re.Pattern
+
+    @classmethod
+    def parse(cls, condition: str, case_sensitive: bool = True):
+        parts = re.split(r'\s+MATCHES\s+', condition, maxsplit=1)
+        if len(parts) != 2:
+            return InvalidNode(condition, f"Invalid MATCHES operator syntax: {condition}")
+        pattern = parts[1].strip()
+        try:
+            regex = compile_pattern(pattern, 0 if case_sensitive else re.IGNORECASE)
+        except re.error as e:
+            return InvalidNode(condition, f"Invalid regex pattern '{pattern}': {e}")
+        return cls(parts[0].strip(), pattern, regex)
+
+
+class MatchesAnyNode(_ValueObject):
+    """``VAR MATCHES_ANY p1,p2`` search for any of several patterns in one pass."""
+    __slots__ = ('var_name', 'patterns', 'pattern_set')
+    var_name: str
+    patterns: Tuple[str, ...]
+    pattern_set: 'PatternSet'
+
+    @classmethod
+    def parse(cls, condition: str, case_sensitive: bool = True):
+        from .keywords import PatternSet, split_patterns
+        parts = re.split(r'\s+MATCHES_ANY\s+', condition, maxsplit=1)
+        patterns = tuple(split_patterns(parts[1])) if len(parts) == 2 else ()
+        if not patterns or not parts[0].strip():
+            return InvalidNode(condition, f"Invalid MATCHES_ANY operator syntax: {condition}")
+        try:
+            pattern_set = PatternSet(patterns, 0 if case_sensitive else re.IGNORECASE)
+        except re.error as e:
+            return InvalidNode(condition, f"Invalid regex pattern in '{parts[1].strip()}': {e}")
+        return cls(parts[0].strip(), patterns, pattern_set)
+
+
+class SemverNode(_ValueObject):
+    """``VAR SEMVER_GTE 1.10.0`` semantic version comparison.
+
+    A literal right side is parsed into its version key at compile time
+    (``key``); a variable right side is parsed per evaluation context.
+    """
+    __slots__ = ('var_name', 'op_name', 'operand', 'key')
+    var_name: str
+    op_name: str
+    operand: Operand
+    key: Optional[Tuple]
+
+    @classmethod
+    def parse(cls, condition: str, case_sensitive: bool = True):
+        parts = SEMVER_PATTERN.split(condition, maxsplit=1)
+        if len(parts) != 3 or not parts[0].strip() or not parts[2].strip():
+            return InvalidNode(condition, f"Invalid SEMVER operator syntax: {condition}")
+        left, op_name, right = (part.strip() for part in parts)
+        operand = Operand.parse(right)
+        key = None
+        if not operand.is_variable:
+            from .version import parse_version
+            key = parse_version(right)
+            if key is None:
+                return InvalidNode(condition, f"Invalid version '{right}' in condition: {condition}")
+        return cls(left, op_name, operand, key)
+
+
+class FileSearchNode(_ValueObject):
+    """``PATH FILE_CONTAINS text`` or ``PATH FILE_MATCHES pattern`` search of a file's contents.
+
+    The left side is a variable holding the path, or a literal path. Text is
+    searched as UTF-8 bytes; ``regex`` is a precompiled bytes pattern for
+    FILE_MATCHES and for case-insensitive FILE_CONTAINS, otherwise None.
+    """
+    __slots__ = ('path', 'op_name', 'needle', 'regex')
+    path: Operand
+    op_name: str
+    needle: bytes
+    regex: Optional[re.Pattern]
+
+    @classmethod
+    def parse(cls, condition: str, case_sensitive: bool = True):
+        parts = re.split(r'\s+(FILE_CONTAINS|FILE_MATCHES)\s+', condition, maxsplit=1)
+        if len(parts) != 3 or not parts[0].strip() or not parts[2].strip():
+            return InvalidNode(condition, f"Invalid FILE_CONTAINS/FILE_MATCHES operator syntax: {condition}")
+        path, op_name, text = (part.strip() for part in parts)
+        needle = text.encode()
+        flags = 0 if case_sensitive else re.IGNORECASE
+        if op_name == 'FILE_MATCHES':
+            try:
+                regex = compile_pattern(needle, flags | re.MULTILINE)
+            except re.error as e:
+                return InvalidNode(condition, f"Invalid regex pattern '{text}': {e}")
+        else:
+            regex = None if case_sensitive else compile_pattern(re.escape(needle), flags)
+        return cls(Operand.parse(path), op_name, needle, regex)
+
+
+class EmptyNode(_ValueObject):
+    """``VAR EMPTY`` or ``VAR NOT_EMPTY``."""
+    __slots__ = ('var_name', 'negate')
+    var_name: str
+    negate: bool
+
+    @classmethod
+    def parse(cls, condition: str, case_sensitive: bool = True):
+        negate = 'NOT_EMPTY' in condition.upper()
+        keyword = r'\s+NOT_EMPTY\s*' if negate else r'\s+EMPTY\s*'
+        var_name = re.split(keyword, condition, flags=re.IGNORECASE)[0].strip()
+        if not var_name:
+            return InvalidNode(condition, f"Invalid EMPTY/NOT_EMPTY operator syntax: {condition}")
+        return cls(var_name, negate)
+
+
+def compile_pattern(pattern: Union[str, bytes], flags: int = 0) -> re.Pattern:
+    """Compile a regex through the bounded pattern cache."""
+    return PATTERN_CACHE.get_or_create((pattern, flags), lambda: re.compile(pattern, flags))
+
+
+def parse_leaf(condition: str, case_sensitive: bool = True):
+    """Compile a condition without logical operators into a leaf node.
+
+    Operators are detected in the same order the evaluator has always used,
+    so a leaf containing several keywords keeps its historical meaning.
+    """
+    upper = condition.upper()
+    if ' SEMVER_' in condition:
+        node_type = SemverNode
+    elif ' FILE_CONTAINS ' in condition or ' FILE_MATCHES ' in condition:
+        node_type = FileSearchNode
+    elif ' CONTAINS_ANY ' in condition:
+        # Before IN: keywords may contain ' in '
+        node_type = ContainsAnyNode
+    elif ' STARTS_WITH_ANY ' in condition or ' ENDS_WITH_ANY ' in condition:
+        node_type = StartsEndsWithAnyNode
+    elif ' MATCHES_ANY ' in condition:
+        node_type = MatchesAnyNode
+    elif ' IN ' in upper:
+        node_type = InNode
+    elif ' STARTS_WITH ' in condition or ' ENDS_WITH ' in condition:
+        node_type = StartsEndsWithNode
+    elif ' MATCHES ' in condition:
+        node_type = MatchesNode
+    elif ' CONTAINS ' in upper:
+        node_type = ContainsNode
+    elif ' EMPTY' in upper or ' NOT_EMPTY' in upper:
+        node_type = EmptyNode
+    else:
+        node_type = ComparisonNode
+    return node_type.parse(condition, case_sensitive)
+
+
+def referenced_variables(node) -> FrozenSet[str]:
+    """Return the names of all variables a compiled tree reads."""
+    if isinstance(node, NotNode):
+        return referenced_variables(node.operand)
+    if isinstance(node, (AndNode, OrNode)):
+        return frozenset().union(*(referenced_variables(o) for o in node.operands))
+    if isinstance(node, ComparisonNode):
+        return frozenset(o.value for o in (node.left, node.right) if o.is_variable)
+    if isinstance(node, FileSearchNode):
+        return frozenset((node.path.value,)) if node.path.is_variable else frozenset()
+    if isinstance(node, (ContainsNode, SemverNode)) and node.operand.is_variable:
+        return frozenset((node.var_name, node.operand.value))
+    if isinstance(node, (InNode, ContainsNode, ContainsAnyNode, StartsEndsWithNode, StartsEndsWithAnyNode,
+                         MatchesNode, MatchesAnyNode, EmptyNode, SemverNode)):
+        return frozenset((node.var_name,))
+    return frozenset()
+
+
+def tokenize(condition: str) -> List[Tuple[str, str]]:
+    """Split a condition into structural tokens and leaf condition text.
+
+    ``&&``, ``||``, ``NOT`` and grouping parentheses are structural. Anything
+    else is leaf text; parentheses inside a leaf (e.g. a regex group) only
+    end the leaf when they close a group opened before it.
+    """
+    tokens: List[Tuple[str, str]] = []
+    length = len(condition)
+    group_depth = 0
+    expect_operand = True
+    i = 0
+
+    while i < length:
+        char = condition[i]
+        if char.isspace():
+            i += 1
+            continue
+
+        if expect_operand:
+            if char == '(':
+                tokens.append((LPAREN, char))
+                group_depth += 1
+                i += 1
+                continue
+            if (
+                condition[i:i + 3].upper() == 'NOT'
+                and i + 3 < length
+                and (condition[i + 3].isspace() or condition[i + 3] == '(')
+            ):
+                tokens.append((NOT, 'NOT'))
+                i += 3
+                continue
+
+            start = i
+            leaf_depth = 0
+            while i < length:
+                char = condition[i]
+                if char in '&|' and condition[i:i + 2] in ('&&', '||'):
+                    break
+                if char == '(':
+                    leaf_depth += 1
+                elif char == ')':
+                    if leaf_depth == 0 and group_depth > 0:
+                        break
+                    leaf_depth = max(leaf_depth - 1, 0)
+                i += 1
+            tokens.append((LEAF, condition[start:i].strip()))
+            expect_operand = False
+            continue
+
+        pair = condition[i:i + 2]
+        if pair == '&&':
+            tokens.append((AND, pair))
+            expect_operand = True
+            i += 2
+        elif pair == '||':
+            tokens.append((OR, pair))
+            expect_operand = True
+            i += 2
+        elif char == ')':
+            tokens.append((RPAREN, char))
+            group_depth -= 1
+            i += 1
+        else:
+            raise ConditionSyntaxError(f"Unexpected '{condition[i:]}' in condition: '{condition}'")
+
+    tokens.append((EOF, ''))
+    return tokens
+
+
+class _Parser:
+    """Recursive-descent parser: ``||`` binds loosest, then ``&&``, then ``NOT``."""
+
+    def __init__(self, condition: str, case_sensitive: bool = True):
+        self.condition = condition
+        self.case_sensitive = case_sensitive
+        self.tokens = tokenize(condition)
+        self.pos = 0
+
+    def _peek(self) -> str:
+        return self.tokens[self.pos][0]
+
+    def _advance(self) -> Tuple[str, str]:
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token
+
+    def parse(self):
+        node = self._parse_or()
+        if self._peek() != EOF:
+            raise ConditionSyntaxError(f"Unbalanced parentheses in condition: '{self.condition}'")
+        return node
+
+    def _parse_or(self):
+        operands = [self._parse_and()]
+        while self._peek() == OR:
+            self._advance()
+            operands.append(self._parse_and())
+        return operands[0] if len(operands) == 1 else OrNode(tuple(operands))
+
+    def _parse_and(self):
+        operands = [self._parse_unary()]
+        while self._peek() == AND:
+            self._advance()
+            operands.append(self._parse_unary())
+        return operands[0] if len(operands) == 1 else AndNode(tuple(operands))
+
+    def _parse_unary(self):
+        if self._peek() == NOT:
+            self._advance()
+            return NotNode(self._parse_unary())
+        return self._parse_primary()
+
+    def _parse_primary(self):
+        kind = self._peek()
+        if kind == LPAREN:
+            self._advance()
+            node = self._parse_or()
+            if self._advance()[0] != RPAREN:
+                raise ConditionSyntaxError(f"Missing ')' in condition: '{self.condition}'")
+            return node
+        if kind == LEAF:
+            return parse_leaf(self._advance()[1], self.case_sensitive)
+        # Missing operand (e.g. trailing '&&'): an empty leaf evaluates to False
+        return parse_leaf('', self.case_sensitive)
+
+
+def _limit_depth(node, depth: int, max_depth: int):
+    """Replace sub-trees nested deeper than *max_depth* with an invalid node."""
+    if depth >= max_depth:
+        return InvalidNode('', f"Max recursion depth ({max_depth}) exceeded")
+    if isinstance(node, NotNode):
+        return NotNode(_limit_depth(node.operand, depth + 1, max_depth))
+    if isinstance(node, (AndNode, OrNode)):
+        return type(node)(tuple(_limit_depth(o, depth + 1, max_depth) for o in node.operands))
+    return node
+
+
+# Static evaluation cost per leaf type, cheapest first
+OPERATOR_COSTS = {
+    InvalidNode: 0,
+    EmptyNode: 1,
+    ComparisonNode: 2,
+    InNode: 3,
+    SemverNode: 3,
+    StartsEndsWithNode: 4,
+    StartsEndsWithAnyNode: 4,
+    ContainsNode: 5,
+    ContainsAnyNode: 7,
+    MatchesNode: 8,
+    MatchesAnyNode: 9,
+    FileSearchNode: 20,
+}
+
+
+def estimate_cost(node) -> int:
+    """Estimate the relative cost of evaluating a tree from its operator types."""
+    if isinstance(node, NotNode):
+        return estimate_cost(node.operand)
+    if isinstance(node, (AndNode, OrNode)):
+        return sum(estimate_cost(o) for o in node.operands)
+    return OPERATOR_COSTS[type(node)]
+
+
+def reorder_operands(node):
+    """Sort the operands of every ``&&`` and ``||`` chain cheapest first.
+
+    All operators are free of side effects, so with short-circuit evaluation
+    the result is unchanged while expensive checks (e.g. MATCHES) are skipped
+    whenever a cheaper operand already decides the chain. The sort is stable,
+    so operands of equal cost keep their written order.
+    """
+    if isinstance(node, NotNode):
+        return NotNode(reorder_operands(node.operand))
+    if isinstance(node, (AndNode, OrNode)):
+        operands = sorted((reorder_operands(o) for o in node.operands), key=estimate_cost)
+        return type(node)(tuple(operands))
+    return node
+
+
+def intern_node(node):
+    """Hash-cons a tree bottom-up so structurally equal sub-trees are shared.
+
+    Trees compiled from different conditions then reuse the same node
+    objects for identical sub-conditions, which lets a run evaluate each
+    distinct sub-condition once (see shared_subexpressions). Keys refer to
+    already-interned children by id so the table never keeps nodes alive.
+    """
+    if isinstance(node, NotNode):
+        node = NotNode(intern_node(node.operand))
+        key = (NotNode, id(node.operand))
+    elif isinstance(node, (AndNode, OrNode)):
+        node = type(node)(tuple(intern_node(o) for o in node.operands))
+        key = (type(node), tuple(id(o) for o in node.operands))
+    else:
+        key = (type(node),) + node._values()
+    return _INTERNED_NODES.setdefault(key, node)
+
+
+def shared_subexpressions(nodes) -> FrozenSet[int]:
+    """Return the ids of interned nodes that occur more than once across *nodes*.
+
+    A repeated node is counted without descending into it again, so the
+    children of a shared node are only reported if they also occur elsewhere.
+    """
+    counts: Counter = Counter()
+    stack = list(nodes)
+    while stack:
+        node = stack.pop()
+        counts[id(node)] += 1
+        if counts[id(node)] > 1:
+            continue
+        if isinstance(node, NotNode):
+            stack.append(node.operand)
+        elif isinstance(node, (AndNode, OrNode)):
+            stack.extend(node.operands)
+    return frozenset(key for key, count in counts.items() if count > 1)
+
+
+class ConditionCompiler:
+    """Compiler from condition strings to cached, immutable expression trees."""
+
+    @staticmethod
+    @lru_cache(maxsize=COMPILE_CACHE_SIZE)
+    def compile(condition: str, max_depth: int = MAX_DEPTH, case_sensitive: bool = True,
+                reorder: bool = False):
+        """
+        Compile a single condition string into an expression tree.
+
+        Examples:
+            'SERVICE == game && ENV IN qa,prod'
+              -> AndNode((ComparisonNode(...), InNode('ENV', ('qa', 'prod'))))
+            'NOT (BRANCH STARTS_WITH release/)'
+              -> NotNode(StartsEndsWithNode('BRANCH', 'STARTS_WITH', 'release/'))
+
+        Args:
+            condition: Condition string as produced by ConditionParser
+            max_depth: Nesting depth beyond which sub-conditions evaluate to False
+            case_sensitive: Whether string operators compare case-sensitively
+            reorder: Reorder ``&&``/``||`` operands so cheaper checks run first
+
+        Returns:
+            Root node of the tree; malformed input yields an InvalidNode
+        """
+        condition = condition.strip()
+        try:
+            node = _Parser(condition, case_sensitive).parse()
+        except ConditionSyntaxError as e:
+            return InvalidNode(condition, str(e))
+        except RecursionError:
+            return InvalidNode(condition, f"Max recursion depth ({max_depth}) exceeded")
+        node = _limit_depth(node, 0, max_depth)
+        if reorder:
+            node = reorder_operands(node)
+        return intern_node(node)
+
+    @staticmethod
+    def pattern_cache_info():
+        """Return size, capacity and hit/miss/eviction counters of the regex cache."""
+        return PATTERN_CACHE.stats()
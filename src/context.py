@@ -0,0 +1,47 @@
+"""
+Evaluation context: per-run state shared by the evaluator and all operators.
+"""
+
+import os
+from typing import Dict, FrozenSet, Iterable, Mapping, Optional, Tuple
+
+
+class EvaluationContext:
+    """Snapshot of variable values used while evaluating conditions.
+
+    Each variable is read from the source mapping (``os.environ`` by default)
+    at most once; later lookups are served from the resolved table, so every
+    operator in a run sees the same value. Results of sub-conditions listed
+    in *shared* (node ids) are memoized so each is evaluated once per run,
+    version keys of variables compared with SEMVER operators are parsed
+    once, and ``files`` holds file search results prefetched for the run.
+    """
+
+    def __init__(self, source: Optional[Mapping[str, str]] = None, names: Iterable[str] = (),
+                 shared: FrozenSet[int] = frozenset()):
+        self.source = os.environ if source is None else source
+        self.variables: Dict[str, str] = {}
+        self.shared = shared
+        self.results: Dict[int, bool] = {}
+        self.versions: Dict[str, Optional[Tuple]] = {}
+        self.files: Dict[int, object] = {}
+        for name in names:
+            self.get(name)
+
+    def get(self, name: str) -> str:
+        """Return the value of variable *name*, or '' if it is not set."""
+        try:
+            return self.variables[name]
+        except KeyError:
+            value = self.source.get(name, '')
+            self.variables[name] = value
+            return value
+
+    def version_key(self, name: str) -> Optional[Tuple]:
+        """Return the parsed version key of variable *name*, or None if it is not a version."""
+        try:
+            return self.versions[name]
+        except KeyError:
+            from .version import parse_version
+            key = self.versions[name] = parse_version(self.get(name))
+            return key
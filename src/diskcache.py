@@ -0,0 +1,210 @@
+"""
+On-disk cache of compiled rule sets for the ``cache_dir`` input.
+
+Self-hosted runners that keep a directory between jobs can skip parsing and
+compiling conditions a previous run has already seen. Each entry is keyed
+by everything that affects the compiled form: the inputs, a checksum of
+the package sources (so any upgrade that changes the compiler, operators
+or code generation invalidates old entries), the cache format version and
+the Python version (marshalled data and bytecode are only valid for the
+interpreter that wrote them).
+
+Loading an entry is on the start-up path of every cached run, and a run has
+at most a handful of conditions, so the cache avoids imports that would cost
+more than the parsing it saves: entries are written with ``marshal``
+instead of ``pickle`` and named by a non-cryptographic hash of their key.
+The full key is stored in the entry and compared on load, so two keys
+sharing a name only cost a miss.
+"""
+
+import marshal
+import os
+import re
+import sys
+import zlib
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+from .compiler import _ValueObject
+from .keywords import _KeywordIndex
+
+# Bump when the layout of cached entries changes
+FORMAT_VERSION = 2
+
+# Classes and functions are stored by name and only resolved in these modules
+_PACKAGE = __package__ + '.'
+_FOREIGN_MODULES = frozenset(('operator', '_operator'))
+
+_MISS_ERRORS = (OSError, EOFError, ValueError, TypeError, KeyError, AttributeError, ImportError, re.error)
+
+
+@lru_cache(maxsize=None)
+def source_checksum() -> int:
+    """CRC-32 of the package's Python sources, in file name order."""
+    directory = os.path.dirname(os.path.abspath(__file__))
+    checksum = 0
+    for name in sorted(os.listdir(directory)):
+        if name.endswith('.py'):
+            with open(os.path.join(directory, name), 'rb') as f:
+                checksum = zlib.crc32(name.encode() + b'\0' + f.read(), checksum)
+    return checksum
+
+
+def cache_key(*parts) -> Tuple:
+    """Return the key of the cache entry for *parts* (strings, bools and ints)."""
+    return (FORMAT_VERSION, source_checksum(), sys.implementation.cache_tag) + parts
+
+
+def _reference(value) -> str:
+    return f"{value.__module__}:{value.__qualname__}"
+
+
+def _resolve(reference: str):
+    module, _, name = reference.partition(':')
+    if not (module.startswith(_PACKAGE) or module in _FOREIGN_MODULES):
+        raise ImportError(f"cannot load {reference} from the cache")
+    __import__(module)
+    return getattr(sys.modules[module], name)
+
+
+def _is_importable(function) -> bool:
+    """True if *function* can be found again by its module and name."""
+    try:
+        return _resolve(_reference(function)) is function
+    except (AttributeError, ImportError):
+        return False
+
+
+def encode(value, memo: Optional[Dict[int, tuple]] = None):
+    """
+    Convert *value* into data ``marshal`` can store.
+
+    Compiled nodes and keyword indexes become ``{'type': ..., 'args': ...}``
+    records of their constructor arguments, compiled regexes their pattern
+    and flags, and functions (such as the comparison functions bound into
+    generated code) their module and name. Containers are converted element
+    by element; dicts are reserved for the records.
+
+    Raises:
+        TypeError: If *value* holds anything else
+    """
+    if memo is None:
+        memo = {}
+    found = memo.get(id(value))
+    if found is not None:
+        return found[1]
+    if value is None or type(value) in (bool, int, float, str, bytes):
+        return value
+    if isinstance(value, int):
+        # marshal only stores exact ints: re.RegexFlag values become plain ints
+        return int(value)
+    if isinstance(value, (_ValueObject, _KeywordIndex)):
+        cls, args = value.__reduce__()
+        encoded = {'type': _reference(cls), 'args': encode(args, memo)}
+    elif isinstance(value, re.Pattern):
+        encoded = {'regex': value.pattern, 'flags': value.flags}
+    elif isinstance(value, (tuple, list, frozenset)):
+        encoded = type(value)(encode(item, memo) for item in value)
+    elif callable(value) and _is_importable(value):
+        encoded = {'function': _reference(value)}
+    else:
+        raise TypeError(f"cannot store {type(value).__name__} in the cache")
+    # Shared objects are encoded once, so marshal writes them once; the
+    # value is kept alive so its id is not reused by a later temporary
+    memo[id(value)] = (value, encoded)
+    return encoded
+
+
+def decode(data, memo: Optional[Dict[int, object]] = None):
+    """
+    Rebuild a value converted by encode().
+
+    marshal loads a record shared by several rules as one object, and it is
+    decoded once, so sub-conditions shared between rules are shared again.
+
+    Raises:
+        ImportError: If a record names something outside this package
+        TypeError: If a record names a class that is not a node or index
+    """
+    if memo is None:
+        memo = {}
+    if isinstance(data, dict):
+        found = memo.get(id(data))
+        if found is not None:
+            return found
+        if 'regex' in data:
+            value = re.compile(data['regex'], data['flags'])
+        elif 'function' in data:
+            value = _resolve(data['function'])
+        else:
+            cls = _resolve(data['type'])
+            if not (isinstance(cls, type) and issubclass(cls, (_ValueObject, _KeywordIndex))):
+                raise TypeError(f"{data['type']} is not a compiled node")
+            value = cls(*decode(data['args'], memo))
+        memo[id(data)] = value
+        return value
+    if isinstance(data, (tuple, list, frozenset)):
+        return type(data)([decode(item, memo) for item in data])
+    return data
+
+
+class RulesetCache:
+    """
+    Directory of values keyed by cache_key().
+
+    Examples:
+        cache = RulesetCache('/var/cache/ternary-operator')
+        key = cache_key(conditions, true_values, false_values)
+        state = cache.load(key)           # None on a miss
+        cache.save(key, state)
+
+    Values are anything encode() accepts. Unreadable, truncated or outdated
+    entries count as misses, and a failed write leaves no partial entry
+    behind. Only use a directory that nothing but the runner itself writes
+    to: cached bytecode is executed, and malformed marshal data can crash
+    the interpreter.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def path(self, key: Tuple) -> str:
+        # Unlike str and bytes hashes, int hashes are the same in every
+        # process: this is the key's bytes as a number modulo 2**61 - 1
+        name = hash(int.from_bytes(repr(key).encode('utf-8'), 'little'))
+        return os.path.join(self.directory, f"{name:016x}.marshal")
+
+    def load(self, key: Tuple) -> Optional[object]:
+        """Return the value stored under *key*, or None if there is no usable entry."""
+        try:
+            with open(self.path(key), 'rb') as f:
+                stored_key, data = marshal.load(f)
+            if stored_key != key:
+                return None
+            return decode(data)
+        except _MISS_ERRORS:
+            return None
+
+    def save(self, key: Tuple, value: object) -> None:
+        """
+        Store *value* under *key*, replacing any previous entry atomically.
+
+        Raises:
+            OSError: If the directory cannot be created or written
+            TypeError: If *value* holds something encode() does not support
+            ValueError: If marshal cannot store the encoded value
+        """
+        data = marshal.dumps((key, encode(value)))
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path(key)
+        # Written next to the entry and renamed over it, so readers never see
+        # a partial file; the pid keeps concurrent writers apart
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
@@ -0,0 +1,188 @@
+"""
+Indexed rule engine: only the rules whose equality tests can succeed for a
+given set of variable values are evaluated.
+
+Most rules in large rule sets start with equality tests on a handful of
+variables (``SERVICE == game && ENVIRONMENT == prod``). The rules are
+arranged in a discrimination network keyed on those tests: each branch
+looks up the value of one variable in a hash map from value to the rules
+requiring it, so a lookup touches a few maps instead of every rule.
+"""
+
+from collections import Counter, defaultdict
+from typing import Callable, Dict, FrozenSet, List, Mapping, Optional, Sequence, Tuple
+
+from .codegen import compile_node
+from .compiler import AndNode, ComparisonNode, InNode, is_numeric, shared_subexpressions
+from .context import EvaluationContext
+from .evaluator import TernaryOperator
+
+# Rule sets at most this large are not split any further
+DEFAULT_LEAF_SIZE = 8
+
+Constraints = Dict[str, FrozenSet[str]]
+
+
+def _constraint(node, case_sensitive: bool) -> Optional[Tuple[str, FrozenSet[str]]]:
+    """Return (variable, accepted values) if *node* only holds for those values."""
+    if isinstance(node, InNode):
+        return node.var_name, node.value_set
+    if isinstance(node, ComparisonNode) and node.op == '==' and node.left.is_variable != node.right.is_variable:
+        variable, literal = (node.left, node.right) if node.left.is_variable else (node.right, node.left)
+        # A numeric literal compares as a number ('1.0' == '1'), which a hash lookup cannot do
+        if not is_numeric(literal.value):
+            return variable.value, frozenset((literal.value if case_sensitive else literal.value.lower(),))
+    return None
+
+
+def equality_constraints(node, case_sensitive: bool = True) -> Constraints:
+    """
+    Return the equality tests every match of a compiled condition must pass.
+
+    Examples:
+        'SERVICE == game && ENV IN qa,prod && COUNT > 5' -> {'SERVICE': {'game'}, 'ENV': {'qa', 'prod'}}
+        'SERVICE == game || ENV == prod'                 -> {}
+
+    Only ``==`` against a non-numeric literal and ``IN`` count, either as
+    the whole condition or as an operand of its top-level ``&&``. Values
+    are lower-cased when *case_sensitive* is false.
+    """
+    constraints: Constraints = {}
+    for operand in node.operands if isinstance(node, AndNode) else (node,):
+        found = _constraint(operand, case_sensitive)
+        if found is not None:
+            name, values = found
+            constraints[name] = constraints[name] & values if name in constraints else values
+    return constraints
+
+
+class _Leaf:
+    __slots__ = ('rules',)
+
+    def __init__(self, rules: Tuple[int, ...]):
+        self.rules = rules
+
+
+class _Branch:
+    """Tests one variable: rules requiring a value are under ``table``, the others under ``rest``."""
+    __slots__ = ('variable', 'table', 'rest')
+
+    def __init__(self, variable: str, table: Dict[str, object], rest: Optional[object]):
+        self.variable = variable
+        self.table = table
+        self.rest = rest
+
+
+def _build(entries: List[Tuple[int, Constraints]], leaf_size: int):
+    """Build the network for (rule index, constraints) pairs, testing the most used variable first."""
+    counts = Counter(name for _, constraints in entries for name in constraints)
+    if len(entries) <= leaf_size or not counts:
+        return _Leaf(tuple(index for index, _ in entries))
+    variable = counts.most_common(1)[0][0]
+    buckets: Dict[str, list] = defaultdict(list)
+    rest = []
+    for index, constraints in entries:
+        values = constraints.get(variable)
+        if values is None:
+            rest.append((index, constraints))
+            continue
+        remaining = {name: v for name, v in constraints.items() if name != variable}
+        for value in values:
+            buckets[value].append((index, remaining))
+    return _Branch(
+        variable,
+        {value: _build(bucket, leaf_size) for value, bucket in buckets.items()},
+        _build(rest, leaf_size) if rest else None,
+    )
+
+
+class RuleIndex:
+    """
+    Discrimination network over the equality tests of compiled conditions.
+
+    Examples:
+        index = RuleIndex(nodes)               # nodes: compiled conditions
+        index.candidates(context.get)          # [0, 3]: rules that may be true
+
+    Every rule left out of ``candidates`` is false for those variable
+    values; rules without equality tests are always candidates.
+    """
+
+    def __init__(self, nodes: Sequence, case_sensitive: bool = True, leaf_size: int = DEFAULT_LEAF_SIZE):
+        entries = [(index, equality_constraints(node, case_sensitive)) for index, node in enumerate(nodes)]
+        self.size = len(entries)
+        self.indexed = sum(1 for _, constraints in entries if constraints)
+        self.case_sensitive = case_sensitive
+        self._root = _build(entries, leaf_size)
+
+    def candidates(self, get: Callable[[str], str]) -> List[int]:
+        """Return the indexes of the rules that may be true, in rule order.
+
+        Args:
+            get: Maps a variable name to its value ('' if not set)
+        """
+        found: List[int] = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if type(node) is _Leaf:
+                found.extend(node.rules)
+                continue
+            if node.rest is not None:
+                stack.append(node.rest)
+            value = get(node.variable)
+            if value:
+                child = node.table.get(value if self.case_sensitive else value.lower())
+                if child is not None:
+                    stack.append(child)
+        # A rule sits on exactly one path for a given set of values
+        found.sort()
+        return found
+
+
+class RuleEngine:
+    """
+    Evaluate a large rule set for one variable context at a time, skipping
+    rules whose equality tests cannot succeed.
+
+    Examples:
+        engine = RuleEngine(['SERVICE == game && ENVIRONMENT == prod', 'SERVICE IN api,web', 'COUNT > 5'])
+        engine.matching({'SERVICE': 'game', 'ENVIRONMENT': 'prod'})   -> [0]
+        engine.evaluate({'SERVICE': 'web', 'COUNT': '7'})             -> [False, True, True]
+
+    A condition that raises during evaluation is false (see
+    TernaryOperator.safe_results).
+    """
+
+    def __init__(self, conditions: Sequence[str], case_sensitive: bool = True, reorder_operands: bool = True,
+                 backend: str = 'tree', leaf_size: int = DEFAULT_LEAF_SIZE):
+        TernaryOperator.check_backend(backend)
+        self.conditions = list(conditions)
+        operator = TernaryOperator.for_library(case_sensitive, reorder_operands)
+        self.nodes = [operator.compile_condition(condition) for condition in self.conditions]
+        self.index = RuleIndex(self.nodes, case_sensitive, leaf_size)
+        self.shared = shared_subexpressions(self.nodes)
+        if backend == 'codegen':
+            functions = [compile_node(node, case_sensitive) for node in self.nodes]
+            self._evaluators = [lambda context, f=f: f(context.get) for f in functions]
+        else:
+            evaluate = operator.evaluate_node
+            self._evaluators = [lambda context, n=n: evaluate(n, context) for n in self.nodes]
+
+    def _context(self, variables: Mapping[str, str]) -> EvaluationContext:
+        return EvaluationContext(variables, (), self.shared)
+
+    def matching(self, variables: Mapping[str, str]) -> List[int]:
+        """Return the indexes of the rules that are true for *variables*, in rule order."""
+        context = self._context(variables)
+        candidates = self.index.candidates(context.get)
+        results = TernaryOperator.safe_results(lambda index: self._evaluators[index](context), candidates)
+        return [index for index, result in zip(candidates, results) if result]
+
+    def evaluate(self, variables: Mapping[str, str]) -> List[bool]:
+        """Return the result of every rule for *variables*."""
+        results = [False] * len(self.nodes)
+        for index in self.matching(variables):
+            results[index] = True
+        return results
+
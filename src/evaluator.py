@@ -2,49 +2,144 @@
 Main evaluator class for the Ternary Operator Action.
 """
 
-import operator
 import os
-import re
 import sys
+from typing import Callable, FrozenSet, Iterable, List, Mapping, Optional, Tuple
 
 from .colors import Colors
-from .parser import ConditionParser
-from .operators import (
-    InOperatorEvaluator, ContainsOperatorEvaluator, StartsEndsWithOperatorEvaluator,
-    MatchesOperatorEvaluator, EmptyOperatorEvaluator,
+from .context import EvaluationContext
+from .log import get_logger
+from .compiler import (
+    ConditionCompiler, COMPARISON_OPS, Operand, compare_values, is_numeric, referenced_variables, shared_subexpressions,
+    InvalidNode, NotNode, AndNode, OrNode, ComparisonNode,
 )
+from .output import OutputSink
+from .parser import ConditionParser
+
+# Operator evaluators, the code-generation backend, the rules-file reader, the
+# timing recorder, the on-disk cache and json are imported where first needed
+# so a run only pays for what its conditions use.
+
+
+class _HandlerTable(dict):
+    """Node type -> evaluation routine; missing handlers are created on first use."""
+
+    def __init__(self, factory, handlers):
+        super().__init__(handlers)
+        self._factory = factory
+
+    def __missing__(self, node_type):
+        handler = self[node_type] = self._factory(node_type)
+        return handler
+
+
+class CompiledRuleset:
+    """The condition inputs of a run, parsed and compiled.
+
+    ``inputs`` are the raw inputs and settings it was built from; ``code``
+    holds the generated function of each condition (see
+    codegen.function_code) when it was built for the on-disk cache with the
+    codegen backend.
+    """
+
+    __slots__ = ('inputs', 'conditions', 'true_values', 'false_values', 'default_values', 'nodes', 'code')
+
+    def __init__(self, inputs: Tuple, conditions: List[str], true_values: List[str], false_values: List[str],
+                 default_values: List[str], nodes: List, code: Optional[List[Tuple[bytes, tuple]]] = None):
+        self.inputs = inputs
+        self.conditions = conditions
+        self.true_values = true_values
+        self.false_values = false_values
+        self.default_values = default_values
+        self.nodes = nodes
+        self.code = code
+
+    def compiled(self) -> Tuple:
+        """Everything but ``inputs``, as stored in the on-disk cache."""
+        return tuple(getattr(self, name) for name in self.__slots__[1:])
 
 
 class TernaryOperator:
     """Main class for evaluating conditions and setting outputs."""
 
     MAX_CONDITIONS = 10
+    STREAM_BUFFER_SIZE = 64 * 1024
     MAX_RECURSION_DEPTH = 50
-    COMPARISON_OPS = {
-        '==': operator.eq,
-        '!=': operator.ne,
-        '<=': operator.le,
-        '>=': operator.ge,
-        '<': operator.lt,
-        '>': operator.gt,
-    }
+    COMPARISON_OPS = dict(COMPARISON_OPS)
+    BACKENDS = ('tree', 'codegen')
     
-    def __init__(self):
-        """Initialize with environment variables."""
+    def __init__(self, variables: Optional[Mapping[str, str]] = None):
+        """Initialize with environment variables.
+
+        Args:
+            variables: Mapping to read condition variables from instead of os.environ
+        """
+        self.variables = variables
         self.debug_mode = os.getenv('INPUT_DEBUG_MODE', 'false').lower() == 'true'
         self.conditions = os.getenv('INPUT_CONDITIONS', '')
         self.true_values = os.getenv('INPUT_TRUE_VALUES', '')
         self.false_values = os.getenv('INPUT_FALSE_VALUES', '')
         self.default_values = os.getenv('INPUT_DEFAULT_VALUES', '')
+        self.conditions_file = os.getenv('INPUT_CONDITIONS_FILE', '')
+        self.index_rules = os.getenv('INPUT_INDEX_RULES', 'false').lower() == 'true'
         self.case_sensitive = os.getenv('INPUT_CASE_SENSITIVE', 'true').lower() != 'false'
+        self.reorder_operands = os.getenv('INPUT_REORDER_OPERANDS', 'true').lower() != 'false'
+        self.backend = os.getenv('INPUT_BACKEND', 'tree').lower()
+        self.timings = os.getenv('INPUT_TIMINGS', 'false').lower() == 'true'
+        self.cache_dir = os.getenv('INPUT_CACHE_DIR', '')
         self.github_output = os.getenv('GITHUB_OUTPUT', '')
-        
-        # Initialize operator evaluators
-        self.in_evaluator = InOperatorEvaluator(self.debug_mode, self.case_sensitive)
-        self.contains_evaluator = ContainsOperatorEvaluator(self.debug_mode, self.case_sensitive)
-        self.starts_ends_evaluator = StartsEndsWithOperatorEvaluator(self.debug_mode, self.case_sensitive)
-        self.matches_evaluator = MatchesOperatorEvaluator(self.debug_mode, self.case_sensitive)
-        self.empty_evaluator = EmptyOperatorEvaluator(self.debug_mode)
+        self.log = get_logger(self.debug_mode)
+
+        # Dispatch table from compiled node type to its evaluation routine;
+        # operator evaluators (IN, CONTAINS, ...) are added when first needed
+        self._node_handlers = _HandlerTable(self._operator_handler, {
+            NotNode: self._evaluate_not,
+            AndNode: self._evaluate_and,
+            OrNode: self._evaluate_or,
+            ComparisonNode: self._evaluate_comparison,
+            InvalidNode: self._evaluate_invalid,
+        })
+        # Set while evaluate_conditions() records timings
+        self._timer = None
+        # Built by load_ruleset() and shared by validation and evaluation
+        self._ruleset: Optional[CompiledRuleset] = None
+
+    @classmethod
+    def for_library(cls, case_sensitive: bool = True, reorder_operands: bool = True) -> 'TernaryOperator':
+        """Create a quiet instance for library use, with settings from the arguments instead of the INPUT_* environment."""
+        operator = cls({})
+        operator.debug_mode = False
+        operator.log = get_logger(False)
+        operator.case_sensitive = case_sensitive
+        operator.reorder_operands = reorder_operands
+        return operator
+
+    @classmethod
+    def check_backend(cls, backend: str) -> None:
+        """Raise ValueError if *backend* is not one of BACKENDS."""
+        if backend not in cls.BACKENDS:
+            raise ValueError(f"backend must be one of: {', '.join(cls.BACKENDS)}")
+
+    @staticmethod
+    def safe_results(evaluate: Callable, items: Iterable) -> List[bool]:
+        """Return ``bool(evaluate(item))`` for each of *items*.
+
+        An item whose evaluation raises is False, as a condition is in an
+        action run without default values.
+        """
+        results = []
+        for item in items:
+            try:
+                results.append(bool(evaluate(item)))
+            except (TypeError, ValueError, KeyError, IndexError):
+                results.append(False)
+        return results
+
+    def _operator_handler(self, node_type: type):
+        """Create the operator evaluator for *node_type* and return its entry point."""
+        from .operators import OPERATOR_EVALUATORS
+        evaluator = OPERATOR_EVALUATORS[node_type](self.debug_mode, self.case_sensitive)
+        return evaluator.evaluate_node
     
     def print_header(self, message: str) -> None:
         """Print a formatted header."""
@@ -52,10 +147,9 @@ class TernaryOperator:
         print(f"  {message}")
         print(f"{'=' * 50}\n")
     
-    def print_debug(self, message: str) -> None:
-        """Print debug message if debug mode is enabled."""
-        if self.debug_mode:
-            print(f"{Colors.OKCYAN}• Debug: {message}{Colors.ENDC}")
+    def print_debug(self, message: str, *args) -> None:
+        """Print debug message if debug mode is enabled, formatting ``message % args`` lazily."""
+        self.log.debug(message, *args)
     
     def print_error(self, message: str) -> None:
         """Print error message and exit."""
@@ -66,20 +160,37 @@ class TernaryOperator:
         """Print success message."""
         print(f"{Colors.OKGREEN}Success: {message}{Colors.ENDC}")
     
-    def safe_write_output(self, key: str, value: str) -> None:
-        """Safely write output to both stdout and GITHUB_OUTPUT."""
-        output_line = f"{key}={value}"
-        print(output_line)
-        
-        if self.github_output:
-            try:
-                with open(self.github_output, 'a') as f:
-                    f.write(f"{output_line}\n")
-            except IOError as e:
-                self.print_debug(f"Warning: Could not write to GITHUB_OUTPUT: {e}")
+    def safe_write_output(self, key: str, value: str, sink: Optional[OutputSink] = None) -> None:
+        """Safely write output to both stdout and GITHUB_OUTPUT.
+
+        With a *sink* the entry is buffered until flush_outputs(); without
+        one it is written to GITHUB_OUTPUT immediately.
+        """
+        print(f"{key}={value}")
+
+        flush_now = sink is None
+        if flush_now:
+            sink = OutputSink(self.github_output)
+        try:
+            sink.add(key, value)
+        except IOError as e:
+            self.print_debug("Warning: Could not write to GITHUB_OUTPUT: %s", e)
+        if flush_now:
+            self.flush_outputs(sink)
+
+    def flush_outputs(self, sink: OutputSink) -> None:
+        """Write all buffered outputs to GITHUB_OUTPUT in a single append."""
+        try:
+            sink.flush()
+        except IOError as e:
+            self.print_debug("Warning: Could not write to GITHUB_OUTPUT: %s", e)
     
     def validate_inputs(self) -> None:
         """Validate all required inputs."""
+        if self.conditions_file:
+            self._validate_conditions_file()
+            return
+
         missing_inputs = []
         
         if not self.conditions:
@@ -96,13 +207,15 @@ class TernaryOperator:
         debug_input = os.getenv('INPUT_DEBUG_MODE', 'false').lower()
         if debug_input not in ('true', 'false'):
             self.print_error("DEBUG_MODE must be either 'true' or 'false'")
+
+        self._validate_backend()
         
         # DEBUG: Print raw conditions
         if self.debug_mode:
             print(f"• Debug: Raw conditions string: '{self.conditions}'")
         
         # Validate maximum conditions
-        conditions_list = ConditionParser.parse(self.conditions)
+        conditions_list = self.load_ruleset().conditions
         
         if self.debug_mode:
             print(f"• Debug: Parsed {len(conditions_list)} conditions:")
@@ -115,21 +228,61 @@ class TernaryOperator:
                 f"Found {len(conditions_list)} conditions"
             )
     
-    def get_var_value(self, varname: str) -> str:
-        """Get environment variable value."""
-        value = os.getenv(varname, '')
-        if not value:
-            self.print_debug(f"Warning: Variable {varname} is not set or empty")
+    def _validate_conditions_file(self) -> None:
+        """Validate inputs for conditions_file mode (no condition count limit)."""
+        if self.conditions:
+            self.print_error("CONDITIONS and CONDITIONS_FILE cannot be used together")
+
+        debug_input = os.getenv('INPUT_DEBUG_MODE', 'false').lower()
+        if debug_input not in ('true', 'false'):
+            self.print_error("DEBUG_MODE must be either 'true' or 'false'")
+
+        self._validate_backend()
+
+        if not os.path.isfile(self.conditions_file):
+            self.print_error(f"Conditions file not found: {self.conditions_file}")
+
+        self.print_debug("Conditions file: '%s'", self.conditions_file)
+
+    def _validate_backend(self) -> None:
+        if self.backend not in self.BACKENDS:
+            self.print_error(f"BACKEND must be one of: {', '.join(self.BACKENDS)}")
+
+    def new_context(self, names: Iterable[str] = (),
+                    shared: FrozenSet[int] = frozenset()) -> EvaluationContext:
+        """Create an evaluation context with *names* resolved from the variable source."""
+        context = EvaluationContext(self.variables, names, shared)
+        self.print_debug("Resolved %d variables", len(context.variables))
+        return context
+
+    def get_var_value(self, varname: str, context: Optional[EvaluationContext] = None) -> str:
+        """Get variable value from the evaluation context, else the variables mapping, else the environment."""
+        if context is not None:
+            value = context.get(varname)
+        elif self.variables is not None:
+            value = self.variables.get(varname, '')
+        else:
+            value = os.getenv(varname, '')
+        if not value and self.debug_mode:
+            self.print_debug("Warning: Variable %s is not set or empty", varname)
         return value
     
     @staticmethod
     def _is_numeric(value: str) -> bool:
         """Check if a string value is numeric (int or float)."""
-        try:
-            float(value)
-            return True
-        except ValueError:
-            return False
+        return is_numeric(value)
+
+    def _resolve_operand(self, operand: Operand, context: Optional[EvaluationContext] = None) -> str:
+        """Resolve a comparison operand to a variable value or a literal."""
+        return self.get_var_value(operand.value, context) if operand.is_variable else operand.value
+
+    def _resolve_comparison(self, node: ComparisonNode, context: Optional[EvaluationContext] = None):
+        """Resolve both sides of a compiled comparison into (left, op, right)."""
+        left_val = self._resolve_operand(node.left, context)
+        right_val = self._resolve_operand(node.right, context)
+        if self.debug_mode:
+            self.print_debug("Comparison: '%s' %s '%s'", left_val, node.op, right_val)
+        return left_val, node.op, right_val
 
     def _parse_comparison(self, condition: str):
         """Parse a simple comparison condition into (left, op, right).
@@ -137,157 +290,322 @@ class TernaryOperator:
         Returns a tuple of (left_value, operator_str, right_value) or None if
         no comparison operator is found.
         """
-        # Match operators in order: longest first to avoid <= matching as <
-        for op in ('<=', '>=', '!=', '==', '<', '>'):
-            if f' {op} ' in condition:
-                parts = condition.split(f' {op} ', 1)
-                if len(parts) == 2:
-                    left_raw = parts[0].strip()
-                    right_raw = parts[1].strip()
-
-                    # Resolve environment variables (uppercase names)
-                    left_val = self.get_var_value(left_raw) if re.match(r'^[A-Z][A-Z0-9_]*$', left_raw) else left_raw
-                    right_val = self.get_var_value(right_raw) if re.match(r'^[A-Z][A-Z0-9_]*$', right_raw) else right_raw
-
-                    self.print_debug(f"Comparison: '{left_val}' {op} '{right_val}'")
-                    return left_val, op, right_val
-        return None
-    
-    def _evaluate_logical(self, condition: str, op: str, aggregator) -> bool:
-        """Evaluate a logical operator (|| or &&) by splitting and aggregating results."""
-        parts = condition.split(op)
-        return aggregator(
-            self.evaluate_condition(part.strip(), self._depth + 1)
-            for part in parts
-        )
+        node = ComparisonNode.parse(condition)
+        if isinstance(node, InvalidNode):
+            return None
+        return self._resolve_comparison(node)
 
-    def evaluate_condition(self, condition: str, depth: int = 0) -> bool:
-        """Evaluate a single condition with support for all operators."""
-        self._depth = depth
-        if depth >= self.MAX_RECURSION_DEPTH:
-            self.print_debug(f"Max recursion depth ({self.MAX_RECURSION_DEPTH}) exceeded")
-            return False
-
-        # Handle NOT operator first (highest priority)
-        if condition.strip().upper().startswith('NOT '):
-            inner_condition = condition[4:].strip()
-            # Remove surrounding parentheses if present
-            if inner_condition.startswith('(') and inner_condition.endswith(')'):
-                inner_condition = inner_condition[1:-1].strip()
-            result = self.evaluate_condition(inner_condition, depth + 1)
-            self.print_debug(f"NOT operator: negating {result} -> {not result}")
-            return not result
-
-        # Check if condition contains logical operators (|| or &&)
-        if '||' in condition:
-            return self._evaluate_logical(condition, '||', any)
-        if '&&' in condition:
-            return self._evaluate_logical(condition, '&&', all)
-
-        # Check for IN operator
-        if ' IN ' in condition.upper():
-            return self.in_evaluator.evaluate(condition)
-
-        # Check for STARTS_WITH / ENDS_WITH operators
-        if ' STARTS_WITH ' in condition:
-            return self.starts_ends_evaluator.evaluate(condition)
-        if ' ENDS_WITH ' in condition:
-            return self.starts_ends_evaluator.evaluate(condition)
-
-        # Check for MATCHES operator
-        if ' MATCHES ' in condition:
-            return self.matches_evaluator.evaluate(condition)
-
-        # Check for CONTAINS operator
-        if ' CONTAINS ' in condition.upper():
-            return self.contains_evaluator.evaluate(condition)
-
-        # Check for EMPTY/NOT_EMPTY operators
-        if ' EMPTY' in condition.upper() or ' NOT_EMPTY' in condition.upper():
-            return self.empty_evaluator.evaluate(condition)
-
-        # Simple comparison operator
-        parsed = self._parse_comparison(condition)
-        if parsed is None:
-            self.print_debug(f"No valid operator found in condition: '{condition}'")
-            return False
-
-        left_val, op_str, right_val = parsed
+    def _evaluate_comparison(self, node: ComparisonNode, context: EvaluationContext) -> bool:
+        """Evaluate a compiled comparison node."""
+        left_val, op_str, right_val = self._resolve_comparison(node, context)
         op_func = self.COMPARISON_OPS.get(op_str)
         if op_func is None:
-            self.print_debug(f"Unsupported operator: '{op_str}'")
+            self.print_debug("Unsupported operator: '%s'", op_str)
             return False
 
         try:
-            # Compare as numbers if both sides are numeric
-            if self._is_numeric(left_val) and self._is_numeric(right_val):
-                result = op_func(float(left_val), float(right_val))
-            else:
-                if not self.case_sensitive:
-                    left_val = left_val.lower()
-                    right_val = right_val.lower()
-                result = op_func(left_val, right_val)
-            self.print_debug(f"Result: '{left_val}' {op_str} '{right_val}' = {result}")
-            return bool(result)
+            result = compare_values(op_func, left_val, right_val, self.case_sensitive)
+            if self.debug_mode:
+                self.print_debug("Result: '%s' %s '%s' = %s", left_val, op_str, right_val, result)
+            return result
         except (TypeError, ValueError) as e:
-            self.print_debug(f"Error evaluating condition '{condition}': {e}")
+            self.print_debug("Error evaluating condition '%s %s %s': %s", left_val, op_str, right_val, e)
             return False
+
+    def _evaluate_not(self, node: NotNode, context: EvaluationContext) -> bool:
+        result = self._evaluate_tree(node.operand, context)
+        if self.debug_mode:
+            self.print_debug("NOT operator: negating %s -> %s", result, not result)
+        return not result
+
+    def _evaluate_and(self, node: AndNode, context: EvaluationContext) -> bool:
+        return all(self._evaluate_tree(operand, context) for operand in node.operands)
+
+    def _evaluate_or(self, node: OrNode, context: EvaluationContext) -> bool:
+        return any(self._evaluate_tree(operand, context) for operand in node.operands)
+
+    def _evaluate_invalid(self, node: InvalidNode, context: EvaluationContext) -> bool:
+        self.print_debug(node.message)
+        return False
+
+    def _evaluate_tree(self, node, context: EvaluationContext) -> bool:
+        shared = context.shared
+        if shared and id(node) in shared:
+            results = context.results
+            key = id(node)
+            if key not in results:
+                results[key] = self._node_handlers[type(node)](node, context)
+            else:
+                self.print_debug("Reusing result of shared sub-condition")
+            return results[key]
+        return self._node_handlers[type(node)](node, context)
+
+    def compile_condition(self, condition: str):
+        """Compile a condition with this evaluator's depth limit, case sensitivity and ordering."""
+        return ConditionCompiler.compile(
+            condition, self.MAX_RECURSION_DEPTH, self.case_sensitive, self.reorder_operands
+        )
+
+    def evaluate_node(self, node, context: Optional[EvaluationContext] = None) -> bool:
+        """Evaluate a compiled expression tree by walking it.
+
+        Without a *context*, the variables referenced by *node* are resolved
+        into a fresh one first.
+        """
+        if context is None:
+            context = self.new_context(referenced_variables(node))
+        return self._evaluate_tree(node, context)
+
+    def evaluate_condition(self, condition: str, context: Optional[EvaluationContext] = None) -> bool:
+        """Evaluate a single condition with support for all operators.
+
+        With the codegen backend the condition runs as a generated Python
+        function; debug mode always walks the tree so it can trace each step.
+        """
+        if self.backend == 'codegen' and not self.debug_mode:
+            from .codegen import CodeGenerator
+            if context is None:
+                context = self.new_context()
+            function = CodeGenerator.compile(
+                condition, self.MAX_RECURSION_DEPTH, self.case_sensitive, self.reorder_operands
+            )
+            return function(context.get, context.files)
+        return self.evaluate_node(self.compile_condition(condition), context)
     
+    def load_ruleset(self) -> CompiledRuleset:
+        """Parse and compile the condition inputs, once per run.
+
+        With ``cache_dir`` the rule set is loaded from the on-disk cache when
+        a run with identical inputs and settings stored it there, and stored
+        there otherwise, so repeat runs skip parsing and compiling entirely.
+        """
+        inputs = (
+            self.conditions, self.true_values, self.false_values, self.default_values,
+            self.case_sensitive, self.reorder_operands, self.backend, self.MAX_RECURSION_DEPTH,
+        )
+        if self._ruleset is not None and self._ruleset.inputs == inputs:
+            return self._ruleset
+
+        cache = key = None
+        if self.cache_dir:
+            from .diskcache import RulesetCache, cache_key
+            cache, key = RulesetCache(self.cache_dir), cache_key(*inputs)
+            compiled = cache.load(key)
+            if compiled is not None:
+                self.print_debug("Loaded compiled rule set from cache: %s", cache.path(key))
+                self._ruleset = CompiledRuleset(inputs, *compiled)
+                return self._ruleset
+
+        conditions = ConditionParser.parse(self.conditions)
+        ruleset = CompiledRuleset(
+            inputs, conditions,
+            ConditionParser.split_values(self.true_values),
+            ConditionParser.split_values(self.false_values),
+            ConditionParser.split_values(self.default_values),
+            [self.compile_condition(condition) for condition in conditions],
+        )
+        if cache is not None:
+            if self.backend == 'codegen':
+                from .codegen import function_code
+                ruleset.code = [function_code(node, self.case_sensitive) for node in ruleset.nodes]
+            try:
+                cache.save(key, ruleset.compiled())
+                self.print_debug("Stored compiled rule set in cache: %s", cache.path(key))
+            except (OSError, TypeError, ValueError) as e:
+                self.print_debug("Warning: Could not write the rule set cache: %s", e)
+        self._ruleset = ruleset
+        return ruleset
+
+    def _compiled_evaluators(self, ruleset: CompiledRuleset) -> List[Callable]:
+        """Functions evaluating each rule from its compiled form instead of its condition text."""
+        if self.backend == 'codegen' and not self.debug_mode and ruleset.code is not None:
+            from .codegen import load_function
+            functions = [load_function(code, constants) for code, constants in ruleset.code]
+            return [lambda context, f=f: f(context.get, context.files) for f in functions]
+        return [lambda context, n=node: self.evaluate_node(n, context) for node in ruleset.nodes]
+
+    @staticmethod
+    def length_mismatch(conditions: List[str], true_values: List[str], false_values: List[str],
+                        default_values: List[str]) -> Optional[str]:
+        """Return an error message if the value lists do not line up with the conditions."""
+        if len(conditions) != len(true_values) or len(conditions) != len(false_values):
+            return (
+                f"Number of conditions ({len(conditions)}), "
+                f"true values ({len(true_values)}), "
+                f"and false values ({len(false_values)}) must match"
+            )
+        if default_values and len(default_values) != len(conditions):
+            return (
+                f"Number of default values ({len(default_values)}) "
+                f"must match number of conditions ({len(conditions)})"
+            )
+        return None
+
     def evaluate_conditions(self) -> None:
         """Evaluate all conditions and set outputs."""
-        # Parse conditions
-        conditions_list = ConditionParser.parse(self.conditions)
-        true_values_list = [v.strip() for v in self.true_values.split(',') if v.strip()]
-        false_values_list = [v.strip() for v in self.false_values.split(',') if v.strip()]
-        default_values_list = (
-            [v.strip() for v in self.default_values.split(',') if v.strip()]
-            if self.default_values else []
-        )
+        ruleset = self.load_ruleset()
+        conditions_list = ruleset.conditions
+        true_values_list = ruleset.true_values
+        false_values_list = ruleset.false_values
+        default_values_list = ruleset.default_values
 
         # Validate array lengths match
-        if len(conditions_list) != len(true_values_list) or len(conditions_list) != len(false_values_list):
-            self.print_error(
-                f"Number of conditions ({len(conditions_list)}), "
-                f"true values ({len(true_values_list)}), "
-                f"and false values ({len(false_values_list)}) must match"
-            )
+        error = self.length_mismatch(conditions_list, true_values_list, false_values_list, default_values_list)
+        if error:
+            self.print_error(error)
 
-        if default_values_list and len(default_values_list) != len(conditions_list):
-            self.print_error(
-                f"Number of default values ({len(default_values_list)}) "
-                f"must match number of conditions ({len(conditions_list)})"
-            )
+        self.print_debug("Processing %d conditions", len(conditions_list))
 
-        self.print_debug(f"Processing {len(conditions_list)} conditions")
+        # Resolve every referenced variable once for the whole run and find
+        # sub-conditions shared between conditions so each is evaluated once
+        nodes = ruleset.nodes
+        names = set()
+        for node in nodes:
+            names.update(referenced_variables(node))
+        shared = shared_subexpressions(nodes)
+        self.print_debug("Shared sub-conditions: %d", len(shared))
+        context = self.new_context(sorted(names), shared)
+        self._prefetch_file_searches(conditions_list, nodes, context)
 
-        results = {}
-        for i, condition in enumerate(conditions_list, 1):
-            print(f"\nEvaluating Condition {i}: {condition}")
+        # Rules loaded from the cache are evaluated from their compiled form;
+        # compiling them from their text again would defeat the cache
+        evaluators = self._compiled_evaluators(ruleset) if self.cache_dir else [None] * len(nodes)
 
-            try:
-                # Evaluate the condition
-                if self.evaluate_condition(condition):
-                    result = true_values_list[i - 1]
-                    self.print_success(f"Condition {i} is TRUE")
-                else:
-                    result = false_values_list[i - 1]
-                    self.print_debug(f"Condition {i} is FALSE")
-            except (TypeError, ValueError, KeyError, IndexError):
-                if default_values_list:
-                    result = default_values_list[i - 1]
-                    self.print_debug(f"Condition {i} evaluation error, using default: {result}")
-                else:
-                    result = false_values_list[i - 1]
-                    self.print_debug(f"Condition {i} evaluation error, using false value")
+        handlers = self._node_handlers
+        if self.timings:
+            from .timing import TimingRecorder
+            self._timer = TimingRecorder()
+            self._node_handlers = _HandlerTable(lambda node_type: self._timer.wrap(handlers[node_type]), {})
 
-            results[f"output_{i}"] = result
-            self.safe_write_output(f"output_{i}", result)
+        results = {}
+        sink = OutputSink(self.github_output)
+        try:
+            for i, condition in enumerate(conditions_list, 1):
+                result = self._evaluate_rule(
+                    i, condition, true_values_list[i - 1], false_values_list[i - 1],
+                    default_values_list[i - 1] if default_values_list else None, context, evaluators[i - 1],
+                )
+                results[f"output_{i}"] = result
+                self.safe_write_output(f"output_{i}", result, sink)
+        finally:
+            timer, self._timer = self._timer, None
+            self._node_handlers = handlers
+
+        if self.debug_mode:
+            stats = ConditionCompiler.pattern_cache_info()
+            self.print_debug(
+                "Regex cache: size=%d/%d, hits=%d, misses=%d, evictions=%d",
+                stats['size'], stats['maxsize'], stats['hits'], stats['misses'], stats['evictions'],
+            )
 
         # Write combined JSON result
         if results:
             import json
-            self.safe_write_output("result", json.dumps(results))
+            self.safe_write_output("result", json.dumps(results), sink)
+
+        if timer is not None:
+            import json
+            for row in timer.table():
+                self.print_debug(row)
+            self.safe_write_output("timings", json.dumps(timer.as_dict()), sink)
+
+        self.flush_outputs(sink)
     
+    def _prefetch_file_searches(self, conditions: List[str], nodes, context: EvaluationContext) -> None:
+        """Run the FILE_CONTAINS / FILE_MATCHES searches of a run concurrently.
+
+        Every search in the run is performed, including ones that
+        short-circuiting would have skipped; with a single search nothing is
+        prefetched.
+        """
+        if not any(' FILE_' in condition for condition in conditions):
+            return
+        from .files import file_nodes, prefetch_searches
+        searches = file_nodes(nodes)
+        if len(searches) > 1:
+            self.print_debug("Running %d file searches concurrently", len(searches))
+            prefetch_searches(searches, context)
+
+    def _evaluate_rule(self, index: int, condition: str, true_value: str, false_value: str,
+                       default_value: Optional[str] = None,
+                       context: Optional[EvaluationContext] = None,
+                       evaluate: Optional[Callable[[EvaluationContext], bool]] = None) -> str:
+        """Evaluate one condition and return the value to output for it.
+
+        *evaluate*, if given, evaluates the already compiled condition in
+        *context*; otherwise the condition text is compiled (or looked up in
+        the compile cache).
+        """
+        print(f"\nEvaluating Condition {index}: {condition}")
+
+        if evaluate is None:
+            evaluate, args = self.evaluate_condition, (condition, context)
+        else:
+            args = (context,)
+        try:
+            # Evaluate the condition
+            if self._timer is None:
+                matched = evaluate(*args)
+            else:
+                matched = self._timer.time_condition(f"output_{index}", condition, evaluate, *args)
+            if matched:
+                self.print_success(f"Condition {index} is TRUE")
+                return true_value
+            self.print_debug("Condition %d is FALSE", index)
+            return false_value
+        except (TypeError, ValueError, KeyError, IndexError):
+            if default_value is not None:
+                self.print_debug("Condition %d evaluation error, using default: %s", index, default_value)
+                return default_value
+            self.print_debug("Condition %d evaluation error, using false value", index)
+            return false_value
+
+    def evaluate_conditions_file(self) -> None:
+        """Stream rules from the conditions file, writing each output as it is evaluated.
+
+        Rules are read, evaluated and written one at a time and the output
+        sink flushes in small batches, so memory use does not grow with the
+        number of rules. The combined ``result`` output is not produced in
+        this mode. Variables are resolved on first use and shared by all rules.
+
+        With ``index_rules`` the whole file is loaded instead and only the
+        rules whose equality tests can succeed are evaluated.
+        """
+        from .rules import iter_rules
+        context = self.new_context()
+        sink = OutputSink(self.github_output, self.STREAM_BUFFER_SIZE)
+        if self.index_rules:
+            rules = list(iter_rules(self.conditions_file))
+            self._evaluate_indexed_rules(rules, context, sink)
+            count = len(rules)
+        else:
+            count = 0
+            for count, rule in enumerate(iter_rules(self.conditions_file), 1):
+                result = self._evaluate_rule(
+                    count, rule.condition, rule.true_value, rule.false_value, rule.default_value, context,
+                )
+                self.safe_write_output(f"output_{count}", result, sink)
+
+        self.flush_outputs(sink)
+        self.print_debug("Processed %d rules from %s", count, self.conditions_file)
+
+    def _evaluate_indexed_rules(self, rules: List, context: EvaluationContext, sink: OutputSink) -> None:
+        """Evaluate the candidate rules found by a rule index; every other rule gets its false value."""
+        from .engine import RuleIndex
+        index = RuleIndex([self.compile_condition(rule.condition) for rule in rules], self.case_sensitive)
+        candidates = set(index.candidates(context.get))
+        self.print_debug("Rule index: %d of %d rules have equality tests, %d candidates",
+                         index.indexed, index.size, len(candidates))
+        for i, rule in enumerate(rules, 1):
+            if i - 1 in candidates:
+                result = self._evaluate_rule(
+                    i, rule.condition, rule.true_value, rule.false_value, rule.default_value, context,
+                )
+            else:
+                self.print_debug("Condition %d skipped: its equality tests do not match", i)
+                result = rule.false_value
+            self.safe_write_output(f"output_{i}", result, sink)
+
     def run(self) -> int:
         """Main execution method."""
         try:
@@ -297,7 +615,10 @@ class TernaryOperator:
             self.validate_inputs()
             
             self.print_debug("Starting condition evaluation")
-            self.evaluate_conditions()
+            if self.conditions_file:
+                self.evaluate_conditions_file()
+            else:
+                self.evaluate_conditions()
             
             self.print_header("Process Completed Successfully")
             return 0
@@ -0,0 +1,99 @@
+"""
+File content search for FILE_CONTAINS / FILE_MATCHES.
+
+Files are memory-mapped and searched in place (``mmap.find`` or a bytes
+regex), so even very large artifacts are never read into Python memory.
+Searches of several files in one run can be dispatched on a thread pool.
+"""
+
+import mmap
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+from .compiler import FileSearchNode, NotNode, AndNode, OrNode
+from .context import EvaluationContext
+
+MAX_WORKERS = 8
+
+
+def _find(node: FileSearchNode, data) -> bool:
+    if node.regex is not None:
+        return node.regex.search(data) is not None
+    return data.find(node.needle) != -1
+
+
+def search_file(path: str, node: FileSearchNode) -> bool:
+    """
+    Search the file at *path* for the text or pattern of *node*.
+
+    Raises:
+        OSError: If the file cannot be opened or mapped
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # Empty files cannot be mapped
+            return _find(node, b'')
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return _find(node, data)
+
+
+def search_file_quietly(path: str, node: FileSearchNode) -> bool:
+    """Like search_file(), but a file that cannot be read gives False."""
+    try:
+        return search_file(path, node)
+    except (OSError, ValueError):
+        return False
+
+
+def search_file_prefetched(files: Optional[Dict[int, object]], path: str, node: FileSearchNode) -> bool:
+    """Like search_file_quietly(), but use the result prefetch_searches() stored in *files*, if any."""
+    if files is not None and id(node) in files:
+        result = files[id(node)]
+        return not isinstance(result, Exception) and result
+    return search_file_quietly(path, node)
+
+
+def resolve_path(node: FileSearchNode, context: EvaluationContext) -> str:
+    """Return the file path of *node*: the variable's value, or the literal path."""
+    return context.get(node.path.value) if node.path.is_variable else node.path.value
+
+
+def file_nodes(nodes: Iterable) -> List[FileSearchNode]:
+    """Return the distinct file search nodes in compiled trees, in first-seen order."""
+    found: Dict[int, FileSearchNode] = {}
+    stack = list(reversed(list(nodes)))
+    while stack:
+        node = stack.pop()
+        if isinstance(node, FileSearchNode):
+            found.setdefault(id(node), node)
+        elif isinstance(node, NotNode):
+            stack.append(node.operand)
+        elif isinstance(node, (AndNode, OrNode)):
+            stack.extend(reversed(node.operands))
+    return list(found.values())
+
+
+def _search(node: FileSearchNode, path: str):
+    try:
+        return search_file(path, node)
+    except (OSError, ValueError) as e:
+        return e
+
+
+def prefetch_searches(nodes: Iterable[FileSearchNode], context: EvaluationContext,
+                      max_workers: int = MAX_WORKERS) -> None:
+    """
+    Search the files of all *nodes* concurrently and store the results in *context*.
+
+    Results (or the error raised by the search) are keyed by node id in
+    ``context.files``; the operator evaluator reads them from there instead
+    of searching again.
+    """
+    pending = [node for node in nodes if id(node) not in context.files]
+    if not pending:
+        return
+    paths = [resolve_path(node, context) for node in pending]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(pending))) as pool:
+        for node, result in zip(pending, pool.map(_search, pending, paths)):
+            context.files[id(node)] = result
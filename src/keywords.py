@@ -0,0 +1,285 @@
+"""
+Multi-keyword matching automata for operators that take a keyword list.
+"""
+
+import re
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class _KeywordIndex:
+    """Base class: instances compare, hash and pickle by their constructor arguments.
+
+    Compiled condition nodes hold these indexes, so nodes can still be
+    interned, cached and sent to worker processes.
+    """
+
+    keywords: Tuple[str, ...]
+
+    def _args(self) -> tuple:
+        return (self.keywords,)
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return self._args() == other._args()
+
+    def __hash__(self):
+        return hash((type(self),) + self._args())
+
+    def __repr__(self):
+        return f"{type(self).__name__}({len(self.keywords)} keywords)"
+
+    def __reduce__(self):
+        return type(self), self._args()
+
+
+class AhoCorasick(_KeywordIndex):
+    """
+    Aho-Corasick automaton answering "does the text contain any keyword?".
+
+    Built once from the keyword list; a search is a single left-to-right
+    scan of the text whose cost does not depend on the number of keywords.
+
+    Examples:
+        automaton = AhoCorasick(['wip', 'do not merge'])
+        automaton.search('feat: WIP login')   -> False (case-sensitive)
+        automaton.search('feat: wip login')   -> True
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords: Tuple[str, ...] = tuple(sorted(set(keywords)))
+        # State 0 is the root; goto[state] maps a character to the next state
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._final: List[bool] = [False]
+        for keyword in self.keywords:
+            self._add(keyword)
+        self._link()
+
+    def _add(self, keyword: str) -> None:
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._final.append(False)
+                self._goto[state][char] = next_state
+            state = next_state
+        self._final[state] = True
+
+    def _link(self) -> None:
+        """Compute failure links breadth-first and propagate final states along them."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                if self._final[self._fail[next_state]]:
+                    self._final[next_state] = True
+
+    def search(self, text: str) -> bool:
+        """Return True if *text* contains at least one keyword."""
+        if not self.keywords:
+            return False
+        if self._final[0]:
+            # The empty string is a keyword
+            return True
+        goto, fail, final = self._goto, self._fail, self._final
+        state = 0
+        for char in text:
+            transitions = goto[state]
+            while state and char not in transitions:
+                state = fail[state]
+                transitions = goto[state]
+            state = transitions.get(char, 0)
+            if final[state]:
+                return True
+        return False
+
+
+# Marks the end of a keyword in a trie node; never a character of the text
+_END = ''
+
+
+class PrefixTrie(_KeywordIndex):
+    """
+    Character trie answering "does the text start (or end) with any keyword?".
+
+    With ``reverse=True`` the keywords are stored reversed and the text is
+    walked from its end, so the same lookup answers suffix queries. A lookup
+    visits at most ``len(text)`` nodes, however many keywords there are.
+
+    Examples:
+        PrefixTrie(['release/', 'hotfix/']).match('release/1.2')   -> True
+        PrefixTrie(['.yml', '.yaml'], reverse=True).match('ci.yml') -> True
+    """
+
+    def __init__(self, keywords: Iterable[str], reverse: bool = False):
+        self.keywords: Tuple[str, ...] = tuple(sorted(set(keywords)))
+        self.reverse = reverse
+        self._root: Dict[str, dict] = {}
+        for keyword in self.keywords:
+            node = self._root
+            for char in (reversed(keyword) if reverse else keyword):
+                node = node.setdefault(char, {})
+            node[_END] = True
+
+    def _args(self) -> tuple:
+        return self.keywords, self.reverse
+
+    def match(self, text: str) -> bool:
+        """Return True if *text* starts with (ends with, if reversed) at least one keyword."""
+        node = self._root
+        if _END in node:
+            return True
+        for char in (reversed(text) if self.reverse else text):
+            node = node.get(char)
+            if node is None:
+                return False
+            if _END in node:
+                return True
+        return False
+
+
+# Pattern features that break when the pattern is moved into a larger
+# alternation: numbered group references and global inline flags
+_NOT_UNIONABLE = re.compile(r'\\[1-9]|\\g<\d+>|\(\?\(\d+\)|^\(\?[aiLmsux]+\)')
+
+
+def _top_level(text: str, separator: str) -> List[int]:
+    """Return the positions of *separator* outside groups, classes, counts and escapes."""
+    positions, depth, in_class, i = [], 0, False, 0
+    while i < len(text):
+        char = text[i]
+        if char == '\\':
+            i += 2
+            continue
+        if in_class:
+            in_class = char != ']'
+        elif char == '[':
+            in_class = True
+        elif char in '({':
+            depth += 1
+        elif char in ')}':
+            depth = max(depth - 1, 0)
+        elif char == separator and depth == 0:
+            positions.append(i)
+        i += 1
+    return positions
+
+
+def split_patterns(text: str) -> List[str]:
+    """
+    Split a comma-separated list of regular expressions.
+
+    Commas inside groups, character classes, repetition counts (``{1,3}``)
+    or escaped with a backslash do not separate patterns.
+
+    Examples:
+        split_patterns('^v[0-9]+$,^release/[0-9]{1,3}$') -> ['^v[0-9]+$', '^release/[0-9]{1,3}$']
+    """
+    bounds = [-1] + _top_level(text, ',') + [len(text)]
+    patterns = (text[start + 1:end].strip() for start, end in zip(bounds, bounds[1:]))
+    return [pattern for pattern in patterns if pattern]
+
+
+def _is_anchored(pattern: str, flags: int) -> bool:
+    """True if *pattern* can only match at the start of the text."""
+    return pattern.startswith('^') and not flags & re.MULTILINE and not _top_level(pattern, '|')
+
+
+class PatternSet(_KeywordIndex):
+    """
+    A list of regular expressions searched in a single pass.
+
+    The patterns are combined into one alternation, so one search answers
+    whether any pattern matches. Patterns anchored with ``^`` get an
+    alternation of their own that is only tried at the start of the text,
+    instead of at every position. Patterns that cannot be moved into an
+    alternation (numbered backreferences, global inline flags) are searched
+    one by one afterwards.
+
+    To tell which pattern matched, which() uses the same alternation with
+    each pattern wrapped in a named group. It is built on first use only:
+    ``re`` saves and restores every group on each failed branch, which makes
+    a search with one group per pattern quadratic in the number of patterns.
+
+    Examples:
+        patterns = PatternSet(['^v[0-9]+$', '^release/'])
+        patterns.search('release/1.2')   -> True
+        patterns.which('release/1.2')    -> '^release/'
+
+    Raises:
+        re.error: If a pattern is not a valid regular expression
+    """
+
+    def __init__(self, patterns: Iterable[str], flags: int = 0):
+        self.keywords: Tuple[str, ...] = tuple(patterns)
+        self.flags = flags
+        # Compiling each pattern on its own reports errors against the pattern
+        compiled = [re.compile(pattern, flags) for pattern in self.keywords]
+        unionable = [i for i, pattern in enumerate(self.keywords) if not _NOT_UNIONABLE.search(pattern)]
+        anchored = [i for i in unionable if _is_anchored(self.keywords[i], flags)]
+        # (regex, method name, indexes of its patterns) for each alternation
+        self.unions: List[Tuple[re.Pattern, str, Tuple[int, ...]]] = []
+        in_union = set()
+        for indexes, method in ((anchored, 'match'), ([i for i in unionable if i not in anchored], 'search')):
+            if len(indexes) < 2:
+                continue
+            try:
+                union = re.compile('|'.join(f"(?:{self.keywords[i]})" for i in indexes), flags)
+            except re.error:
+                # e.g. the same group name in two patterns
+                continue
+            self.unions.append((union, method, tuple(indexes)))
+            in_union.update(indexes)
+        self.fallback: Tuple[Tuple[int, re.Pattern], ...] = tuple(
+            (i, regex) for i, regex in enumerate(compiled) if i not in in_union
+        )
+        self._named: Dict[int, re.Pattern] = {}
+
+    def _args(self) -> tuple:
+        return self.keywords, self.flags
+
+    def __repr__(self):
+        return f"PatternSet({len(self.keywords)} patterns, {len(self.fallback)} searched separately)"
+
+    def search(self, text: str) -> bool:
+        """Return True if at least one pattern matches somewhere in *text*."""
+        for union, method, _ in self.unions:
+            if getattr(union, method)(text) is not None:
+                return True
+        return any(regex.search(text) is not None for _, regex in self.fallback)
+
+    def _named_union(self, position: int) -> re.Pattern:
+        named = self._named.get(position)
+        if named is None:
+            _, _, indexes = self.unions[position]
+            named = re.compile('|'.join(f"(?P<_p{i}>{self.keywords[i]})" for i in indexes), self.flags)
+            self._named[position] = named
+        return named
+
+    def which(self, text: str) -> Optional[str]:
+        """Return a pattern that matches *text*, or None if none does.
+
+        When several patterns match, anchored patterns are reported first,
+        then the one matching leftmost; the separately searched patterns
+        only when none of the combined ones match.
+        """
+        for position, (_, method, _) in enumerate(self.unions):
+            match = getattr(self._named_union(position), method)(text)
+            if match is not None:
+                # The pattern's group closes last, so it is the last group matched
+                return self.keywords[int(match.lastgroup[2:])]
+        for index, regex in self.fallback:
+            if regex.search(text) is not None:
+                return self.keywords[index]
+        return None
@@ -0,0 +1,39 @@
+"""
+Leveled console logging with lazily formatted messages.
+"""
+
+from .colors import Colors
+
+DEBUG = 10
+INFO = 20
+
+
+class Logger:
+    """Console logger that formats a message only when its level is enabled.
+
+    Messages take ``%``-style arguments, so a disabled call costs a level
+    check and nothing else:
+
+        log.debug("Comparison: '%s' %s '%s'", left, op, right)
+
+    Hot paths should additionally test ``debug_enabled`` before calls whose
+    arguments are themselves expensive to build (e.g. joining a value list).
+    """
+
+    def __init__(self, level: int = INFO):
+        self.level = level
+        self.debug_enabled = level <= DEBUG
+
+    @staticmethod
+    def _format(message: str, args: tuple) -> str:
+        return message % args if args else message
+
+    def debug(self, message: str, *args) -> None:
+        """Print a debug message if debug logging is enabled."""
+        if self.debug_enabled:
+            print(f"{Colors.OKCYAN}• Debug: {self._format(message, args)}{Colors.ENDC}")
+
+
+def get_logger(debug_mode: bool) -> Logger:
+    """Return a logger at DEBUG level in debug mode, INFO otherwise."""
+    return Logger(DEBUG if debug_mode else INFO)
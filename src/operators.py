@@ -3,39 +3,65 @@ Operator evaluators for different condition types.
 """
 
 import os
-import re
+from typing import Optional
 
-from .colors import Colors
+from .context import EvaluationContext
+from .compiler import (
+    COMPARISON_OPS, SEMVER_OPERATORS, InvalidNode, InNode, ContainsNode, ContainsAnyNode, StartsEndsWithNode,
+    StartsEndsWithAnyNode, MatchesNode, MatchesAnyNode, EmptyNode, SemverNode, FileSearchNode,
+)
+from .log import get_logger
+
+# The version parser is imported by the SEMVER evaluator, so runs without
+# SEMVER operators do not load it.
 
 
 class OperatorEvaluator:
     """Base class for operator evaluation logic."""
 
+    node_type = None
+
     def __init__(self, debug_mode: bool = False, case_sensitive: bool = True):
         self.debug_mode = debug_mode
         self.case_sensitive = case_sensitive
+        self.log = get_logger(debug_mode)
 
     def _normalize(self, value: str) -> str:
         """Normalize value based on case sensitivity setting."""
         return value if self.case_sensitive else value.lower()
 
-    def print_debug(self, message: str) -> None:
-        """Print debug message if debug mode is enabled."""
-        if self.debug_mode:
-            print(f"{Colors.OKCYAN}• Debug: {message}{Colors.ENDC}")
+    def print_debug(self, message: str, *args) -> None:
+        """Print debug message if debug mode is enabled, formatting ``message % args`` lazily."""
+        self.log.debug(message, *args)
     
-    def get_var_value(self, varname: str) -> str:
-        """Get environment variable value."""
-        value = os.getenv(varname, '')
-        if not value:
-            self.print_debug(f"Warning: Variable {varname} is not set or empty")
+    def get_var_value(self, varname: str, context: Optional[EvaluationContext] = None) -> str:
+        """Get variable value from the evaluation context, or the environment without one."""
+        value = os.getenv(varname, '') if context is None else context.get(varname)
+        if not value and self.debug_mode:
+            self.print_debug("Warning: Variable %s is not set or empty", varname)
         return value
 
+    def evaluate(self, condition: str, context: Optional[EvaluationContext] = None) -> bool:
+        """Compile a raw condition string for this operator and evaluate it."""
+        return self.evaluate_node(self.node_type.parse(condition, self.case_sensitive), context)
+
+    def evaluate_node(self, node, context: Optional[EvaluationContext] = None) -> bool:
+        """Evaluate a compiled leaf node produced by the condition compiler."""
+        if isinstance(node, InvalidNode):
+            self.print_debug(node.message)
+            return False
+        return self._evaluate(node, context)
+
+    def _evaluate(self, node, context: Optional[EvaluationContext]) -> bool:
+        raise NotImplementedError
+
 
 class InOperatorEvaluator(OperatorEvaluator):
     """Evaluator for IN operator."""
+
+    node_type = InNode
     
-    def evaluate(self, condition: str) -> bool:
+    def _evaluate(self, node: InNode, context: Optional[EvaluationContext]) -> bool:
         """
         Evaluate IN operator condition.
         
@@ -44,47 +70,39 @@ class InOperatorEvaluator(OperatorEvaluator):
             'ENV IN dev,qa,stage,prod' -> checks if ENV is one of [dev, qa, stage, prod]
         
         Args:
-            condition: Condition string with IN operator
+            node: Compiled IN operator node
+            context: Evaluation context holding resolved variable values
             
         Returns:
             True if variable value is in the list, False otherwise
         """
         try:
-            # Split by IN operator
-            parts = condition.split(' IN ')
-            if len(parts) != 2:
-                self.print_debug(f"Invalid IN operator syntax: {condition}")
-                return False
-            
-            var_name = parts[0].strip()
-            values_str = parts[1].strip()
-            
             # Get variable value
-            var_value = self.get_var_value(var_name)
+            var_value = self.get_var_value(node.var_name, context)
             if not var_value:
-                self.print_debug(f"Variable {var_name} is not set")
+                self.print_debug("Variable %s is not set", node.var_name)
                 return False
             
-            # Parse comma-separated values
-            allowed_values = [v.strip() for v in values_str.split(',') if v.strip()]
-            
-            self.print_debug(f"Checking if {var_name}='{var_value}' IN [{', '.join(allowed_values)}]")
-            
-            # Check if variable value is in the allowed values list
-            result = self._normalize(var_value) in [self._normalize(v) for v in allowed_values]
-            self.print_debug(f"IN operator result: {result}")
+            # Set lookup against the values normalized at compile time
+            result = self._normalize(var_value) in node.value_set
+            if self.debug_mode:
+                self.print_debug("Checking if %s='%s' IN [%s]", node.var_name, var_value, ', '.join(node.values))
+                self.print_debug("IN operator result: %s", result)
             
             return result
             
         except (ValueError, KeyError, AttributeError) as e:
-            self.print_debug(f"Error evaluating IN operator '{condition}': {e}")
+            if self.debug_mode:
+                self.print_debug("Error evaluating IN operator '%s IN %s': %s", node.var_name, ','.join(node.values), e)
             return False
 
 
 class ContainsOperatorEvaluator(OperatorEvaluator):
     """Evaluator for CONTAINS operator."""
+
+    node_type = ContainsNode
     
-    def evaluate(self, condition: str) -> bool:
+    def _evaluate(self, node: ContainsNode, context: Optional[EvaluationContext]) -> bool:
         """
         Evaluate CONTAINS operator condition (case-sensitive).
         
@@ -93,44 +111,68 @@ class ContainsOperatorEvaluator(OperatorEvaluator):
             'MESSAGE CONTAINS hotfix' -> checks if MESSAGE contains 'hotfix'
         
         Args:
-            condition: Condition string with CONTAINS operator
+            node: Compiled CONTAINS operator node
+            context: Evaluation context holding resolved variable values
             
         Returns:
             True if left value contains right value, False otherwise
         """
         try:
-            # Split by CONTAINS operator (case-insensitive split)
-            parts = re.split(r'\s+CONTAINS\s+', condition, flags=re.IGNORECASE)
-            if len(parts) != 2:
-                self.print_debug(f"Invalid CONTAINS operator syntax: {condition}")
-                return False
-            
-            left_part = parts[0].strip()
-            right_part = parts[1].strip()
-            
             # Get variable value for left side
-            left_value = self.get_var_value(left_part)
+            left_value = self.get_var_value(node.var_name, context)
             
             # Get variable value for right side, or use as literal
-            right_value = self.get_var_value(right_part) if right_part.isupper() else right_part
-            
-            self.print_debug(f"Checking if '{left_value}' CONTAINS '{right_value}'")
+            operand = node.operand
+            right_value = self.get_var_value(operand.value, context) if operand.is_variable else operand.value
             
             # Check if left contains right
             result = self._normalize(right_value) in self._normalize(left_value)
-            self.print_debug(f"CONTAINS operator result: {result}")
+            if self.debug_mode:
+                self.print_debug("Checking if '%s' CONTAINS '%s'", left_value, right_value)
+                self.print_debug("CONTAINS operator result: %s", result)
             
             return result
             
         except (ValueError, KeyError, AttributeError) as e:
-            self.print_debug(f"Error evaluating CONTAINS operator '{condition}': {e}")
+            self.print_debug("Error evaluating CONTAINS operator '%s CONTAINS %s': %s", node.var_name, node.operand.value, e)
             return False
 
 
+class ContainsAnyOperatorEvaluator(OperatorEvaluator):
+    """Evaluator for CONTAINS_ANY operator."""
+
+    node_type = ContainsAnyNode
+
+    def _evaluate(self, node: ContainsAnyNode, context: Optional[EvaluationContext]) -> bool:
+        """
+        Evaluate CONTAINS_ANY operator condition.
+
+        Examples:
+            'COMMIT_MSG CONTAINS_ANY wip,do not merge,fixup!' -> COMMIT_MSG contains any of the keywords
+
+        Args:
+            node: Compiled CONTAINS_ANY node holding the keyword automaton
+            context: Evaluation context holding resolved variable values
+
+        Returns:
+            True if the variable value contains at least one keyword
+        """
+        var_value = self.get_var_value(node.var_name, context)
+        # One scan of the value, whatever the number of keywords
+        result = node.automaton.search(self._normalize(var_value))
+        if self.debug_mode:
+            self.print_debug("Checking if %s='%s' CONTAINS_ANY of %d keywords", node.var_name, var_value,
+                             len(node.keywords))
+            self.print_debug("CONTAINS_ANY operator result: %s", result)
+        return result
+
+
 class StartsEndsWithOperatorEvaluator(OperatorEvaluator):
     """Evaluator for STARTS_WITH and ENDS_WITH operators."""
 
-    def evaluate(self, condition: str) -> bool:
+    node_type = StartsEndsWithNode
+
+    def _evaluate(self, node: StartsEndsWithNode, context: Optional[EvaluationContext]) -> bool:
         """
         Evaluate STARTS_WITH or ENDS_WITH operator condition.
 
@@ -138,39 +180,61 @@ class StartsEndsWithOperatorEvaluator(OperatorEvaluator):
             'BRANCH STARTS_WITH feature/' -> checks if BRANCH starts with 'feature/'
             'FILE ENDS_WITH .yml' -> checks if FILE ends with '.yml'
         """
+        op_name = node.op_name
         try:
-            is_starts = 'STARTS_WITH' in condition
-            op_name = 'STARTS_WITH' if is_starts else 'ENDS_WITH'
-
-            parts = re.split(rf'\s+{op_name}\s+', condition, maxsplit=1)
-            if len(parts) != 2:
-                self.print_debug(f"Invalid {op_name} operator syntax: {condition}")
-                return False
-
-            var_name = parts[0].strip()
-            target = parts[1].strip()
-
-            var_value = self.get_var_value(var_name)
-
-            self.print_debug(f"Checking if {var_name}='{var_value}' {op_name} '{target}'")
+            var_value = self.get_var_value(node.var_name, context)
 
             left = self._normalize(var_value)
-            right = self._normalize(target)
+            right = self._normalize(node.target)
 
-            result = left.startswith(right) if is_starts else left.endswith(right)
-            self.print_debug(f"{op_name} operator result: {result}")
+            result = left.startswith(right) if op_name == 'STARTS_WITH' else left.endswith(right)
+            if self.debug_mode:
+                self.print_debug("Checking if %s='%s' %s '%s'", node.var_name, var_value, op_name, node.target)
+                self.print_debug("%s operator result: %s", op_name, result)
 
             return result
 
         except (ValueError, KeyError, AttributeError) as e:
-            self.print_debug(f"Error evaluating {op_name} operator '{condition}': {e}")
+            self.print_debug("Error evaluating %s operator '%s %s %s': %s", op_name, node.var_name, op_name, node.target, e)
             return False
 
 
+class StartsEndsWithAnyOperatorEvaluator(OperatorEvaluator):
+    """Evaluator for STARTS_WITH_ANY and ENDS_WITH_ANY operators."""
+
+    node_type = StartsEndsWithAnyNode
+
+    def _evaluate(self, node: StartsEndsWithAnyNode, context: Optional[EvaluationContext]) -> bool:
+        """
+        Evaluate STARTS_WITH_ANY or ENDS_WITH_ANY operator condition.
+
+        Examples:
+            'BRANCH STARTS_WITH_ANY release/,hotfix/' -> BRANCH starts with one of the prefixes
+            'FILE ENDS_WITH_ANY .yml,.yaml' -> FILE ends with one of the suffixes
+
+        Args:
+            node: Compiled node holding the prefix (or reversed suffix) trie
+            context: Evaluation context holding resolved variable values
+
+        Returns:
+            True if the variable value starts (ends) with at least one of the values
+        """
+        var_value = self.get_var_value(node.var_name, context)
+        # One walk down the trie, whatever the number of values
+        result = node.trie.match(self._normalize(var_value))
+        if self.debug_mode:
+            self.print_debug("Checking if %s='%s' %s of %d values", node.var_name, var_value, node.op_name,
+                             len(node.values))
+            self.print_debug("%s operator result: %s", node.op_name, result)
+        return result
+
+
 class MatchesOperatorEvaluator(OperatorEvaluator):
     """Evaluator for MATCHES operator (regex pattern matching)."""
 
-    def evaluate(self, condition: str) -> bool:
+    node_type = MatchesNode
+
+    def _evaluate(self, node: MatchesNode, context: Optional[EvaluationContext]) -> bool:
         """
         Evaluate MATCHES operator condition using regex.
 
@@ -179,42 +243,62 @@ class MatchesOperatorEvaluator(OperatorEvaluator):
             'TAG MATCHES ^v[0-9]+\\.[0-9]+\\.[0-9]+$' -> checks if TAG is a semver tag
 
         Args:
-            condition: Condition string with MATCHES operator
+            node: Compiled MATCHES operator node
+            context: Evaluation context holding resolved variable values
 
         Returns:
             True if variable value matches the regex pattern, False otherwise
         """
         try:
-            parts = re.split(r'\s+MATCHES\s+', condition, maxsplit=1)
-            if len(parts) != 2:
-                self.print_debug(f"Invalid MATCHES operator syntax: {condition}")
-                return False
-
-            var_name = parts[0].strip()
-            pattern = parts[1].strip()
-
-            var_value = self.get_var_value(var_name)
-
-            self.print_debug(f"Checking if {var_name}='{var_value}' MATCHES '{pattern}'")
+            var_value = self.get_var_value(node.var_name, context)
 
-            flags = 0 if self.case_sensitive else re.IGNORECASE
-            result = bool(re.search(pattern, var_value, flags))
-            self.print_debug(f"MATCHES operator result: {result}")
+            result = node.regex.search(var_value) is not None
+            if self.debug_mode:
+                self.print_debug("Checking if %s='%s' MATCHES '%s'", node.var_name, var_value, node.pattern)
+                self.print_debug("MATCHES operator result: %s", result)
 
             return result
 
-        except re.error as e:
-            self.print_debug(f"Invalid regex pattern '{pattern}': {e}")
-            return False
         except (ValueError, KeyError, AttributeError) as e:
-            self.print_debug(f"Error evaluating MATCHES operator '{condition}': {e}")
+            self.print_debug("Error evaluating MATCHES operator '%s MATCHES %s': %s", node.var_name, node.pattern, e)
             return False
 
 
+class MatchesAnyOperatorEvaluator(OperatorEvaluator):
+    """Evaluator for MATCHES_ANY operator (one search for a list of regex patterns)."""
+
+    node_type = MatchesAnyNode
+
+    def _evaluate(self, node: MatchesAnyNode, context: Optional[EvaluationContext]) -> bool:
+        """
+        Evaluate MATCHES_ANY operator condition.
+
+        Examples:
+            'TAG MATCHES_ANY ^v[0-9]+$,^release-[0-9]{1,3}$' -> TAG matches at least one pattern
+
+        Args:
+            node: Compiled MATCHES_ANY node holding the combined pattern set
+            context: Evaluation context holding resolved variable values
+
+        Returns:
+            True if the variable value matches at least one pattern
+        """
+        var_value = self.get_var_value(node.var_name, context)
+        if not self.debug_mode:
+            return node.pattern_set.search(var_value)
+        matched = node.pattern_set.which(var_value)
+        self.print_debug("Checking if %s='%s' MATCHES_ANY of %d patterns", node.var_name, var_value,
+                         len(node.patterns))
+        self.print_debug("MATCHES_ANY operator result: %s (pattern: %s)", matched is not None, matched)
+        return matched is not None
+
+
 class EmptyOperatorEvaluator(OperatorEvaluator):
     """Evaluator for EMPTY and NOT_EMPTY operators."""
+
+    node_type = EmptyNode
     
-    def evaluate(self, condition: str) -> bool:
+    def _evaluate(self, node: EmptyNode, context: Optional[EvaluationContext]) -> bool:
         """
         Evaluate EMPTY or NOT_EMPTY operator condition.
         
@@ -223,43 +307,125 @@ class EmptyOperatorEvaluator(OperatorEvaluator):
             'VAR NOT_EMPTY' -> checks if VAR is not empty
         
         Args:
-            condition: Condition string with EMPTY or NOT_EMPTY operator
+            node: Compiled EMPTY/NOT_EMPTY operator node
+            context: Evaluation context holding resolved variable values
             
         Returns:
             True if condition is satisfied, False otherwise
         """
         try:
-            # Check which operator is used
-            is_not_empty = 'NOT_EMPTY' in condition.upper()
-            
-            if is_not_empty:
-                # Split by NOT_EMPTY
-                parts = re.split(r'\s+NOT_EMPTY\s*', condition, flags=re.IGNORECASE)
-            else:
-                # Split by EMPTY
-                parts = re.split(r'\s+EMPTY\s*', condition, flags=re.IGNORECASE)
-            
-            if len(parts) < 1 or not parts[0].strip():
-                self.print_debug(f"Invalid EMPTY/NOT_EMPTY operator syntax: {condition}")
-                return False
-            
-            var_name = parts[0].strip()
-            
             # Get variable value
-            var_value = self.get_var_value(var_name)
+            var_value = self.get_var_value(node.var_name, context)
             
             # Check if empty
             is_empty = not var_value or var_value.strip() == ''
             
-            if is_not_empty:
-                result = not is_empty
-                self.print_debug(f"Checking if {var_name}='{var_value}' NOT_EMPTY: {result}")
-            else:
-                result = is_empty
-                self.print_debug(f"Checking if {var_name}='{var_value}' EMPTY: {result}")
+            result = not is_empty if node.negate else is_empty
+            if self.debug_mode:
+                self.print_debug(
+                    "Checking if %s='%s' %s: %s",
+                    node.var_name, var_value, 'NOT_EMPTY' if node.negate else 'EMPTY', result,
+                )
             
             return result
             
         except (ValueError, KeyError, AttributeError) as e:
-            self.print_debug(f"Error evaluating EMPTY/NOT_EMPTY operator '{condition}': {e}")
+            self.print_debug("Error evaluating EMPTY/NOT_EMPTY operator on '%s': %s", node.var_name, e)
             return False
+
+
+class SemverOperatorEvaluator(OperatorEvaluator):
+    """Evaluator for SEMVER_EQ/NE/GT/GTE/LT/LTE operators."""
+
+    node_type = SemverNode
+
+    def _version_key(self, name: str, context: Optional[EvaluationContext]):
+        if context is None:
+            from .version import parse_version
+            return parse_version(self.get_var_value(name))
+        return context.version_key(name)
+
+    def _evaluate(self, node: SemverNode, context: Optional[EvaluationContext]) -> bool:
+        """
+        Evaluate a semantic version comparison.
+
+        Examples:
+            'VERSION SEMVER_GTE 1.10.0' -> True for 1.10.0 and 2.0, False for 1.9.9
+            'VERSION SEMVER_LT 2.0.0' -> True for 2.0.0-rc.1 (pre-releases sort first)
+
+        Args:
+            node: Compiled SEMVER node; a literal right side is already parsed
+            context: Evaluation context caching parsed variable versions
+
+        Returns:
+            Result of the comparison, False if either side is not a version
+        """
+        from .version import compare_versions
+        left = self._version_key(node.var_name, context)
+        operand = node.operand
+        right = self._version_key(operand.value, context) if operand.is_variable else node.key
+        if self.debug_mode and (left is None or right is None):
+            self.print_debug("%s: '%s' is not a version", node.op_name,
+                             node.var_name if left is None else operand.value)
+
+        result = compare_versions(SEMVER_OPS[node.op_name], left, right)
+        if self.debug_mode:
+            self.print_debug("%s %s %s -> %s", node.var_name, node.op_name, operand.value, result)
+        return result
+
+
+class FileSearchOperatorEvaluator(OperatorEvaluator):
+    """Evaluator for FILE_CONTAINS and FILE_MATCHES operators."""
+
+    node_type = FileSearchNode
+
+    def _evaluate(self, node: FileSearchNode, context: Optional[EvaluationContext]) -> bool:
+        """
+        Search a file's contents without reading it into memory.
+
+        Examples:
+            'BUILD_LOG FILE_CONTAINS BUILD SUCCESSFUL' -> the file named by BUILD_LOG contains the text
+            'dist/manifest.json FILE_MATCHES "version": "2\\.' -> the literal path matches the regex
+
+        Args:
+            node: Compiled file search node
+            context: Evaluation context; holds results prefetched for the run
+
+        Returns:
+            True if the file contains the text or matches the pattern; False
+            if it does not, or cannot be read
+        """
+        from .files import search_file
+        path = self.get_var_value(node.path.value, context) if node.path.is_variable else node.path.value
+        if context is not None and id(node) in context.files:
+            result = context.files[id(node)]
+        else:
+            try:
+                result = search_file(path, node)
+            except (OSError, ValueError) as e:
+                result = e
+        if isinstance(result, Exception):
+            self.print_debug("Cannot search '%s' for %s: %s", path, node.op_name, result)
+            return False
+        if self.debug_mode:
+            self.print_debug("Checking if file '%s' %s '%s': %s", path, node.op_name,
+                             node.needle.decode(errors='replace'), result)
+        return result
+
+
+# Comparison function for each SEMVER operator
+SEMVER_OPS = {name: COMPARISON_OPS[op] for name, op in SEMVER_OPERATORS.items()}
+
+# Evaluator class for each compiled leaf node type
+OPERATOR_EVALUATORS = {
+    InNode: InOperatorEvaluator,
+    ContainsNode: ContainsOperatorEvaluator,
+    ContainsAnyNode: ContainsAnyOperatorEvaluator,
+    StartsEndsWithNode: StartsEndsWithOperatorEvaluator,
+    StartsEndsWithAnyNode: StartsEndsWithAnyOperatorEvaluator,
+    MatchesNode: MatchesOperatorEvaluator,
+    MatchesAnyNode: MatchesAnyOperatorEvaluator,
+    EmptyNode: EmptyOperatorEvaluator,
+    SemverNode: SemverOperatorEvaluator,
+    FileSearchNode: FileSearchOperatorEvaluator,
+}
@@ -0,0 +1,63 @@
+"""
+Buffered writer for GitHub Actions step outputs.
+"""
+
+import os
+from typing import List
+
+DELIMITER_PREFIX = 'ghadelimiter_'
+
+
+def format_output(key: str, value: str) -> str:
+    """Format one output entry for GITHUB_OUTPUT.
+
+    Single-line values use ``key=value``; values containing newlines use the
+    heredoc syntax with a random delimiter that does not occur in the value.
+    """
+    if '\n' not in value and '\r' not in value:
+        return f"{key}={value}\n"
+
+    delimiter = f"{DELIMITER_PREFIX}{os.urandom(16).hex()}"
+    while delimiter in value:
+        delimiter = f"{DELIMITER_PREFIX}{os.urandom(16).hex()}"
+    return f"{key}<<{delimiter}\n{value}\n{delimiter}\n"
+
+
+class OutputSink:
+    """Accumulates output entries and appends them to GITHUB_OUTPUT in one write.
+
+    Entries are buffered in memory and written with a single open/write/close
+    when flush() is called, or automatically once the buffer grows beyond
+    ``max_buffer`` characters.
+    """
+
+    DEFAULT_MAX_BUFFER = 1024 * 1024
+
+    def __init__(self, path: str, max_buffer: int = DEFAULT_MAX_BUFFER):
+        self.path = path
+        self.max_buffer = max_buffer
+        self._entries: List[str] = []
+        self._buffered = 0
+
+    def add(self, key: str, value: str) -> None:
+        """Buffer one output entry, flushing if the buffer is full."""
+        if not self.path:
+            return
+        entry = format_output(key, value)
+        self._entries.append(entry)
+        self._buffered += len(entry)
+        if self._buffered >= self.max_buffer:
+            self.flush()
+
+    def flush(self) -> None:
+        """Append all buffered entries to the output file.
+
+        Raises:
+            IOError: If the output file cannot be written; the buffer is kept
+        """
+        if not self._entries:
+            return
+        with open(self.path, 'a') as f:
+            f.write(''.join(self._entries))
+        self._entries = []
+        self._buffered = 0
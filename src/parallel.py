@@ -0,0 +1,145 @@
+"""
+Multi-core batch evaluation: a rule set applied to many variable contexts,
+sharded across a process pool.
+
+The compiled rule set is sent to each worker once through the pool
+initializer; tasks then only carry chunks of contexts. Results are yielded
+in input order with a bounded number of chunks in flight, so arbitrarily
+long inputs are processed with flat memory use.
+"""
+
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from .compiler import shared_subexpressions, referenced_variables
+from .context import EvaluationContext
+from .evaluator import TernaryOperator
+
+DEFAULT_CHUNK_SIZE = 1000
+
+# Per-process state set up by _init_worker
+_worker = None
+
+
+class _Worker:
+    """Evaluates chunks of contexts against the rule set shipped at start-up."""
+
+    def __init__(self, nodes: Sequence, case_sensitive: bool, backend: str):
+        self.operator = TernaryOperator.for_library(case_sensitive)
+        self.nodes = list(nodes)
+        # Pickling keeps nodes shared between rules shared, so ids are valid here
+        self.shared = shared_subexpressions(self.nodes)
+        self.names = sorted(set().union(*(referenced_variables(node) for node in self.nodes)))
+        if backend == 'codegen':
+            from .codegen import compile_node
+            functions = [compile_node(node, case_sensitive) for node in self.nodes]
+            self.evaluators = [lambda context, f=f: f(context.get) for f in functions]
+        else:
+            evaluate = self.operator.evaluate_node
+            self.evaluators = [lambda context, n=n: evaluate(n, context) for n in self.nodes]
+
+    def evaluate(self, variables: Mapping[str, str]) -> List[bool]:
+        context = EvaluationContext(variables, self.names, self.shared)
+        return TernaryOperator.safe_results(lambda evaluate: evaluate(context), self.evaluators)
+
+
+def _init_worker(nodes: Sequence, case_sensitive: bool, backend: str) -> None:
+    global _worker
+    _worker = _Worker(nodes, case_sensitive, backend)
+
+
+def _evaluate_chunk(chunk: Sequence[Mapping[str, str]]) -> Tuple[int, int, List[List[bool]]]:
+    """Evaluate one chunk; returns (worker pid, elapsed ns, results per context)."""
+    start = time.perf_counter_ns()
+    results = [_worker.evaluate(variables) for variables in chunk]
+    return os.getpid(), time.perf_counter_ns() - start, results
+
+
+class ParallelBatchRunner:
+    """
+    Evaluate a rule set for many variable contexts on all cores.
+
+    Examples:
+        runner = ParallelBatchRunner(['SERVICE IN game,batch', 'ENV == prod'], workers=4)
+        for results in runner.run(rows):        # rows: iterable of {name: value}
+            ...                                  # [True, False], in input order
+        runner.stats                             # throughput per worker process
+
+    A condition that raises during evaluation yields False (see
+    TernaryOperator.safe_results).
+    """
+
+    def __init__(self, conditions: Sequence[str], workers: Optional[int] = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, max_in_flight: Optional[int] = None,
+                 case_sensitive: bool = True, reorder_operands: bool = True, backend: str = 'codegen'):
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        TernaryOperator.check_backend(backend)
+        self.conditions = list(conditions)
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.max_in_flight = max_in_flight or 2 * self.workers
+        self.case_sensitive = case_sensitive
+        self.backend = backend
+        compiler = TernaryOperator.for_library(case_sensitive, reorder_operands)
+        self.nodes = [compiler.compile_condition(condition) for condition in self.conditions]
+        self.stats: Dict[int, dict] = {}
+
+    def _chunks(self, contexts: Iterable[Mapping[str, str]]) -> Iterator[List[Mapping[str, str]]]:
+        iterator = iter(contexts)
+        while True:
+            chunk = [dict(variables) for variables in islice(iterator, self.chunk_size)]
+            if not chunk:
+                return
+            yield chunk
+
+    def _record(self, pid: int, elapsed_ns: int, count: int) -> None:
+        entry = self.stats.setdefault(pid, {'chunks': 0, 'contexts': 0, 'seconds': 0.0, 'per_second': 0.0})
+        entry['chunks'] += 1
+        entry['contexts'] += count
+        entry['seconds'] += elapsed_ns / 1e9
+        entry['per_second'] = entry['contexts'] / entry['seconds'] if entry['seconds'] else 0.0
+
+    def run(self, contexts: Iterable[Mapping[str, str]]) -> Iterator[List[bool]]:
+        """
+        Yield one list of condition results per context, in input order.
+
+        At most ``max_in_flight`` chunks are submitted ahead of the one being
+        yielded, so *contexts* may be a lazy iterator of any length.
+        """
+        self.stats = {}
+        with ProcessPoolExecutor(
+            max_workers=self.workers, initializer=_init_worker,
+            initargs=(self.nodes, self.case_sensitive, self.backend),
+        ) as pool:
+            pending = deque()
+            chunks = self._chunks(contexts)
+            for chunk in chunks:
+                pending.append(pool.submit(_evaluate_chunk, chunk))
+                if len(pending) >= self.max_in_flight:
+                    break
+            while pending:
+                pid, elapsed_ns, results = pending.popleft().result()
+                self._record(pid, elapsed_ns, len(results))
+                chunk = next(chunks, None)
+                if chunk is not None:
+                    pending.append(pool.submit(_evaluate_chunk, chunk))
+                yield from results
+
+    def evaluate_all(self, contexts: Iterable[Mapping[str, str]]) -> List[List[bool]]:
+        """Evaluate every context and return all results as a list."""
+        return list(self.run(contexts))
+
+    def report(self) -> List[str]:
+        """Format the per-worker throughput of the last run as table rows."""
+        rows = [f"{'worker':>8} {'chunks':>7} {'contexts':>10} {'busy s':>8} {'contexts/s':>12}"]
+        for pid, entry in sorted(self.stats.items()):
+            rows.append(
+                f"{pid:>8} {entry['chunks']:>7} {entry['contexts']:>10} "
+                f"{entry['seconds']:>8.2f} {entry['per_second']:>12,.0f}"
+            )
+        return rows
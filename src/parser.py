@@ -3,84 +3,79 @@ Condition parser for handling complex condition strings.
 """
 
 import re
-from typing import List
+from typing import List, Tuple
 
-COMMA_PLACEHOLDER = "<<<COMMA>>>"
-IN_OPERATOR_PATTERN = re.compile(r'(\w+)\s+IN\s+', re.IGNORECASE)
+# Operators whose right side is a comma-separated list
+LIST_OPERATOR_PATTERN = re.compile(
+    r'\b(\w+)\s+(IN|CONTAINS_ANY|STARTS_WITH_ANY|ENDS_WITH_ANY|MATCHES_ANY)\s+', re.IGNORECASE
+)
 
+# The only characters that can change how a condition string is split
+STRUCTURAL_PATTERN = re.compile(r'[(),]|&&|\|\|')
 
-class ConditionParser:
-    """Parser for condition strings with support for IN operator and parentheses."""
+# A comma followed by this pattern starts a new condition, even inside list values
+NEW_CONDITION_SOURCE = (
+    r'\s*(?:\w+\s+(?:==|!=|<=|>=|<|>|IN|CONTAINS_ANY|CONTAINS|STARTS_WITH_ANY|STARTS_WITH'
+    r'|ENDS_WITH_ANY|ENDS_WITH|MATCHES_ANY|MATCHES|EMPTY|NOT_EMPTY'
+    r'|SEMVER_\w+|FILE_CONTAINS|FILE_MATCHES)'
+    r'|(?-i:NOT) )'
+)
+NEW_CONDITION_PATTERN = re.compile(NEW_CONDITION_SOURCE, re.IGNORECASE)
+# Keywords of the other list operators are free text ('work in progress'):
+# only upper-case operators end them
+NEW_CONDITION_STRICT_PATTERN = re.compile(NEW_CONDITION_SOURCE)
 
-    @staticmethod
-    def _protect_in_commas(working_str: str) -> str:
-        """Replace commas within IN operator values with a placeholder.
 
-        Scans from right to left so earlier offsets remain valid.
-        """
-        matches = list(IN_OPERATOR_PATTERN.finditer(working_str))
-
-        for match in reversed(matches):
-            start = match.end()  # Position right after "WORD IN "
-            end = len(working_str)
-
-            i = start
-            while i < len(working_str):
-                # Check for && or ||
-                if i < len(working_str) - 1 and working_str[i:i + 2] in ('&&', '||'):
-                    end = i
-                    break
-
-                # Check for comma followed by a new condition
-                if working_str[i] == ',':
-                    remaining = working_str[i + 1:].lstrip()
-                    if remaining and (
-                        re.match(
-                            r'\w+\s+(?:==|!=|<=|>=|<|>|IN|CONTAINS|EMPTY|NOT_EMPTY)',
-                            remaining,
-                            re.IGNORECASE,
-                        )
-                        or remaining.startswith('NOT ')
-                    ):
-                        end = i
-                        break
-
-                i += 1
-
-            in_values = working_str[start:end]
-            protected = in_values.replace(',', COMMA_PLACEHOLDER)
-            working_str = working_str[:start] + protected + working_str[end:]
-
-        return working_str
+class ConditionParser:
+    """Parser for condition strings with support for list operators (IN, CONTAINS_ANY, ...) and parentheses."""
 
     @staticmethod
-    def _split_top_level(text: str) -> List[str]:
-        """Split *text* by top-level commas (not inside parentheses)."""
-        conditions: List[str] = []
-        current: List[str] = []
+    def split_ranges(text: str) -> List[Tuple[int, int]]:
+        """Return (start, end) index ranges of the top-level conditions in *text*.
+
+        Single left-to-right pass over the structural characters: commas
+        separate conditions unless they are nested in parentheses or belong
+        to the value list of IN, CONTAINS_ANY, STARTS_WITH_ANY, ENDS_WITH_ANY
+        or MATCHES_ANY. A value list runs until
+        ``&&``, ``||`` or a comma that starts a new condition.
+        """
+        ranges: List[Tuple[int, int]] = []
+        in_starts = [
+            (m.end(), NEW_CONDITION_PATTERN if m.group(2).upper() == 'IN' else NEW_CONDITION_STRICT_PATTERN)
+            for m in LIST_OPERATOR_PATTERN.finditer(text)
+        ]
+        next_in = 0
+        in_values = False
+        new_condition = NEW_CONDITION_PATTERN
         parenthesis_depth = 0
-
-        for char in text:
-            if char == '(':
+        start = 0
+
+        for match in STRUCTURAL_PATTERN.finditer(text):
+            i = match.start()
+            # Entering the value list of a list operator
+            while next_in < len(in_starts) and in_starts[next_in][0] <= i:
+                if not in_values:
+                    new_condition = in_starts[next_in][1]
+                in_values = True
+                next_in += 1
+
+            token = match.group()
+            if token == '(':
                 parenthesis_depth += 1
-                current.append(char)
-            elif char == ')':
+            elif token == ')':
                 parenthesis_depth -= 1
-                current.append(char)
-            elif char == ',' and parenthesis_depth == 0:
-                cond = ''.join(current).strip()
-                if cond:
-                    conditions.append(cond)
-                current = []
+            elif token == ',':
+                if in_values and new_condition.match(text, i + 1):
+                    in_values = False
+                if not in_values and parenthesis_depth == 0:
+                    ranges.append((start, i))
+                    start = i + 1
             else:
-                current.append(char)
-
-        # Append the last condition
-        cond = ''.join(current).strip()
-        if cond:
-            conditions.append(cond)
+                # && or || always ends a value list
+                in_values = False
 
-        return conditions
+        ranges.append((start, len(text)))
+        return ranges
 
     @staticmethod
     def parse(conditions_str: str) -> List[str]:
@@ -88,10 +83,9 @@ class ConditionParser:
         Parse conditions string handling IN operator with commas and all operators.
 
         Strategy:
-        1. Find all IN operators and their values (e.g., "VAR IN val1,val2,val3")
-        2. Replace commas within IN values with a placeholder
-        3. Split by comma only at top-level (not inside parentheses or logical operators)
-        4. Restore the commas in IN values
+        1. Scan the string once, tracking parentheses and IN value lists
+        2. Record the index range of each top-level condition
+        3. Slice and trim each range, dropping empty ones
 
         Examples:
         - "SERVICE IN game,batch,api, ENVIRONMENT == dev"
@@ -110,13 +104,20 @@ class ConditionParser:
         if not conditions_str:
             return []
 
-        # Step 1-2: protect commas inside IN values
-        working_str = ConditionParser._protect_in_commas(conditions_str)
+        conditions = []
+        for start, end in ConditionParser.split_ranges(conditions_str):
+            cond = conditions_str[start:end].strip()
+            if cond:
+                conditions.append(cond)
 
-        # Step 3: split by top-level commas
-        conditions = ConditionParser._split_top_level(working_str)
+        return conditions
 
-        # Step 4: restore commas
-        conditions = [c.replace(COMMA_PLACEHOLDER, ',') for c in conditions]
+    @staticmethod
+    def split_values(values_str: str) -> List[str]:
+        """
+        Split a comma-separated values string (true/false/default values).
 
-        return conditions
+        Examples:
+            'yes, no,,maybe' -> ['yes', 'no', 'maybe']
+        """
+        return [v.strip() for v in values_str.split(',') if v.strip()]
@@ -0,0 +1,88 @@
+"""
+Streaming reader for rule files used by the ``conditions_file`` input.
+"""
+
+import json
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+FIELD_SEPARATOR = '\t'
+
+
+@dataclass(frozen=True)
+class Rule:
+    """One condition with the values to output when it is true, false or fails."""
+    condition: str
+    true_value: str
+    false_value: str
+    default_value: Optional[str] = None
+
+
+def _parse_json_rule(line: str, location: str) -> Rule:
+    try:
+        data = json.loads(line)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"{location}: invalid JSON rule: {e}") from None
+    if not isinstance(data, dict):
+        raise ValueError(f"{location}: JSON rule must be an object")
+
+    missing = [key for key in ('condition', 'true', 'false') if key not in data]
+    if missing:
+        raise ValueError(f"{location}: missing keys: {', '.join(missing)}")
+
+    default = data.get('default')
+    return Rule(
+        str(data['condition']),
+        str(data['true']),
+        str(data['false']),
+        None if default is None else str(default),
+    )
+
+
+def _parse_text_rule(line: str, location: str) -> Rule:
+    fields = [field.strip() for field in line.split(FIELD_SEPARATOR)]
+    if len(fields) not in (3, 4):
+        raise ValueError(
+            f"{location}: expected 3 or 4 tab-separated fields "
+            f"(condition, true, false[, default]), found {len(fields)}"
+        )
+    default = fields[3] if len(fields) == 4 and fields[3] else None
+    return Rule(fields[0], fields[1], fields[2], default)
+
+
+def iter_rules(path: str) -> Iterator[Rule]:
+    """
+    Yield rules from *path* one line at a time.
+
+    Each non-blank line that does not start with ``#`` is one rule, either a
+    JSON object or tab-separated fields:
+
+        {"condition": "SERVICE == game", "true": "deploy", "false": "skip", "default": "skip"}
+        SERVICE IN game,batch<TAB>deploy<TAB>skip
+
+    Only the current line is held in memory, so files of any length can be
+    streamed.
+
+    Args:
+        path: Path of the rules file
+
+    Raises:
+        ValueError: If a line is not a valid rule (message includes the line number)
+        IOError: If the file cannot be read
+    """
+    with open(path, encoding='utf-8') as f:
+        for lineno, raw_line in enumerate(f, 1):
+            line = raw_line.rstrip('\r\n')
+            stripped = line.strip()
+            if not stripped or stripped.startswith('#'):
+                continue
+
+            location = f"{path}:{lineno}"
+            if stripped.startswith('{'):
+                rule = _parse_json_rule(stripped, location)
+            else:
+                rule = _parse_text_rule(line, location)
+
+            if not rule.condition.strip():
+                raise ValueError(f"{location}: empty condition")
+            yield rule
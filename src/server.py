@@ -0,0 +1,249 @@
+"""
+Long-running evaluator daemon over a Unix domain socket.
+
+Clients send one JSON request per line and receive one JSON response per
+line. Compile caches stay warm for the lifetime of the process, so a request
+costs a lookup and a few generated-function calls instead of an interpreter
+start.
+
+Request:
+    {"conditions": "SERVICE == game, ENV IN qa,prod",
+     "true_values": "deploy, test", "false_values": "skip, skip",
+     "default_values": "",                      # optional
+     "variables": {"SERVICE": "game", "ENV": "qa"},
+     "case_sensitive": true}                    # optional
+
+Response:
+    {"outputs": {"output_1": "deploy", "output_2": "test"}}  or  {"error": "..."}
+"""
+
+import asyncio
+import errno
+import json
+import os
+import signal
+import socket
+import stat
+import sys
+import tempfile
+from typing import Any, Dict, List, Mapping, Optional
+
+from .codegen import CodeGenerator
+from .colors import Colors
+from .context import EvaluationContext
+from .evaluator import TernaryOperator
+from .parser import ConditionParser
+
+MAX_REQUEST_SIZE = 1024 * 1024
+
+
+def default_socket_path() -> str:
+    """
+    Return the socket path used when none is given.
+
+    The socket lives in the user's runtime directory (``$XDG_RUNTIME_DIR``),
+    or else in a per-user directory under the temp directory, which serve()
+    creates with mode 0700. A fixed name directly in a shared directory such
+    as /tmp could be taken by any other user first.
+    """
+    runtime_dir = os.getenv('XDG_RUNTIME_DIR')
+    if runtime_dir:
+        return os.path.join(runtime_dir, 'ternary-operator.sock')
+    return os.path.join(tempfile.gettempdir(), f"ternary-operator-{os.getuid()}", 'server.sock')
+
+
+DEFAULT_SOCKET_PATH = default_socket_path()
+
+
+def _is_listening(path: str) -> bool:
+    """True if a server accepts connections on the socket at *path*."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(path)
+        except (ConnectionRefusedError, FileNotFoundError):
+            return False
+    return True
+
+
+def _as_list(value: Any, split) -> List[str]:
+    """Accept either a comma-separated string or a JSON list of strings."""
+    if isinstance(value, list):
+        return [str(item).strip() for item in value]
+    if isinstance(value, str):
+        return split(value)
+    raise ValueError(f"Expected a string or a list, got {type(value).__name__}")
+
+
+class EvaluationServer:
+    """Evaluates JSON requests with compile caches shared across requests."""
+
+    def __init__(self, path: str = DEFAULT_SOCKET_PATH, case_sensitive: bool = True,
+                 reorder_operands: bool = True):
+        self.path = path
+        self.case_sensitive = case_sensitive
+        self.reorder_operands = reorder_operands
+
+    def evaluate_request(self, request: Mapping[str, Any]) -> Dict[str, Any]:
+        """
+        Evaluate one request and return its outputs.
+
+        Raises:
+            ValueError: If the request is malformed
+        """
+        if not isinstance(request, dict):
+            raise ValueError("Request must be a JSON object")
+        conditions = _as_list(request.get('conditions', ''), ConditionParser.parse)
+        true_values = _as_list(request.get('true_values', ''), ConditionParser.split_values)
+        false_values = _as_list(request.get('false_values', ''), ConditionParser.split_values)
+        default_values = _as_list(request.get('default_values', ''), ConditionParser.split_values)
+        if not conditions:
+            raise ValueError("Missing required inputs: CONDITIONS")
+        error = TernaryOperator.length_mismatch(conditions, true_values, false_values, default_values)
+        if error:
+            raise ValueError(error)
+
+        variables = request.get('variables') or {}
+        if not isinstance(variables, dict):
+            raise ValueError("variables must be a JSON object")
+        case_sensitive = request.get('case_sensitive', self.case_sensitive)
+        if not isinstance(case_sensitive, bool):
+            raise ValueError("case_sensitive must be true or false")
+        context = EvaluationContext({name: str(value) for name, value in variables.items()})
+
+        outputs = {}
+        for i, condition in enumerate(conditions):
+            function = CodeGenerator.compile(
+                condition, TernaryOperator.MAX_RECURSION_DEPTH, case_sensitive, self.reorder_operands
+            )
+            try:
+                outputs[f"output_{i + 1}"] = true_values[i] if function(context.get) else false_values[i]
+            except (TypeError, ValueError, KeyError, IndexError):
+                outputs[f"output_{i + 1}"] = default_values[i] if default_values else false_values[i]
+        return {'outputs': outputs}
+
+    def handle_line(self, line: bytes) -> Dict[str, Any]:
+        """Decode, evaluate and answer one request line; errors become error responses."""
+        try:
+            return self.evaluate_request(json.loads(line))
+        except json.JSONDecodeError as e:
+            return {'error': f"Invalid JSON request: {e}"}
+        except (ValueError, TypeError) as e:
+            return {'error': str(e)}
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    writer.write(b'{"error": "Request too large"}\n')
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                writer.write(json.dumps(self.handle_line(line)).encode() + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def _prepare_path(self) -> None:
+        """
+        Make the socket path free to bind, creating its directory if needed.
+
+        Raises:
+            OSError: If another server is listening on the path, or other
+                users could replace the socket in its directory
+        """
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        info = os.stat(directory)
+        if info.st_uid not in (0, os.getuid()) or (info.st_mode & stat.S_IWOTH and not info.st_mode & stat.S_ISVTX):
+            raise PermissionError(errno.EACCES, "Socket directory can be modified by other users", directory)
+        try:
+            is_socket = stat.S_ISSOCK(os.lstat(self.path).st_mode)
+        except FileNotFoundError:
+            return
+        if is_socket:
+            if _is_listening(self.path):
+                raise OSError(errno.EADDRINUSE, "Another server is listening on this socket", self.path)
+            # Left behind by a server that was killed; anything else at the
+            # path is left alone and makes the bind fail
+            os.unlink(self.path)
+
+    def _remove_socket(self, created: os.stat_result) -> None:
+        """Remove the socket file, unless it is no longer the one this server created."""
+        try:
+            current = os.lstat(self.path)
+        except FileNotFoundError:
+            return
+        if (current.st_dev, current.st_ino) == (created.st_dev, created.st_ino):
+            os.unlink(self.path)
+
+    async def serve(self, ready: Optional[asyncio.Event] = None) -> None:
+        """
+        Serve until cancelled or sent SIGTERM, then remove the socket file.
+
+        Raises:
+            OSError: If another server is listening on the path, the socket
+                directory is not private, or the socket cannot be created
+        """
+        self._prepare_path()
+        # Created with mode 0600 instead of changed afterwards, so other
+        # users can never connect in between
+        umask = os.umask(0o177)
+        try:
+            server = await asyncio.start_unix_server(self._handle_client, path=self.path, limit=MAX_REQUEST_SIZE)
+        finally:
+            os.umask(umask)
+        created = os.lstat(self.path)
+        try:
+            async with server:
+                task = asyncio.ensure_future(server.serve_forever())
+                try:
+                    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, task.cancel)
+                except (NotImplementedError, RuntimeError):
+                    pass  # Not the main thread or no signal support
+                if ready is not None:
+                    ready.set()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        finally:
+            self._remove_socket(created)
+
+
+def send_request(path: str, request: Mapping[str, Any], timeout: float = 5.0) -> Dict[str, Any]:
+    """Send one request to a running server and return its decoded response."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(timeout)
+        client.connect(path)
+        client.sendall(json.dumps(request).encode() + b'\n')
+        response = b''
+        while not response.endswith(b'\n'):
+            chunk = client.recv(65536)
+            if not chunk:
+                break
+            response += chunk
+    return json.loads(response)
+
+
+def serve(path: str = DEFAULT_SOCKET_PATH) -> int:
+    """Run the server in the foreground using the INPUT_* settings of the environment."""
+    server = EvaluationServer(
+        path,
+        case_sensitive=os.getenv('INPUT_CASE_SENSITIVE', 'true').lower() != 'false',
+        reorder_operands=os.getenv('INPUT_REORDER_OPERANDS', 'true').lower() != 'false',
+    )
+    print(f"Listening on {path}")
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        print(f"{Colors.FAIL}Error: {e}{Colors.ENDC}", file=sys.stderr)
+        return 1
+    return 0
@@ -0,0 +1,111 @@
+"""
+Per-condition and per-node wall-clock timings for profiling a run.
+"""
+
+import time
+from typing import Callable, Dict, List
+
+from .compiler import (
+    InvalidNode, NotNode, AndNode, OrNode, ComparisonNode, InNode, ContainsNode, ContainsAnyNode,
+    StartsEndsWithNode, StartsEndsWithAnyNode, MatchesNode, MatchesAnyNode, EmptyNode, SemverNode, FileSearchNode,
+)
+
+
+def describe_node(node) -> str:
+    """Return a short label for a compiled node: its operator and leaf text."""
+    if isinstance(node, NotNode):
+        return 'NOT'
+    if isinstance(node, AndNode):
+        return f"&& ({len(node.operands)} operands)"
+    if isinstance(node, OrNode):
+        return f"|| ({len(node.operands)} operands)"
+    if isinstance(node, ComparisonNode):
+        return f"{node.left.value} {node.op} {node.right.value}"
+    if isinstance(node, InNode):
+        return f"{node.var_name} IN {','.join(node.values)}"
+    if isinstance(node, ContainsNode):
+        return f"{node.var_name} CONTAINS {node.operand.value}"
+    if isinstance(node, ContainsAnyNode):
+        return f"{node.var_name} CONTAINS_ANY ({len(node.keywords)} keywords)"
+    if isinstance(node, StartsEndsWithNode):
+        return f"{node.var_name} {node.op_name} {node.target}"
+    if isinstance(node, StartsEndsWithAnyNode):
+        return f"{node.var_name} {node.op_name} ({len(node.values)} values)"
+    if isinstance(node, MatchesNode):
+        return f"{node.var_name} MATCHES {node.pattern}"
+    if isinstance(node, MatchesAnyNode):
+        return f"{node.var_name} MATCHES_ANY ({len(node.patterns)} patterns)"
+    if isinstance(node, SemverNode):
+        return f"{node.var_name} {node.op_name} {node.operand.value}"
+    if isinstance(node, FileSearchNode):
+        return f"{node.path.value} {node.op_name} {node.needle.decode(errors='replace')}"
+    if isinstance(node, EmptyNode):
+        return f"{node.var_name} {'NOT_EMPTY' if node.negate else 'EMPTY'}"
+    if isinstance(node, InvalidNode):
+        return f"invalid: {node.condition}"
+    return type(node).__name__
+
+
+class TimingRecorder:
+    """Records wall-clock time per condition and per evaluated node.
+
+    Node handlers are wrapped with wrap(); time spent in a node includes its
+    children. Nodes are grouped under the condition being timed, so a shared
+    sub-condition is listed under the condition that first evaluated it.
+    """
+
+    def __init__(self):
+        self.conditions: List[dict] = []
+        self._nodes: Dict[int, list] = {}
+
+    def wrap(self, handler: Callable) -> Callable:
+        """Return *handler* with every call timed under the node it evaluates."""
+        clock = time.perf_counter_ns
+
+        def timed(node, context):
+            start = clock()
+            try:
+                return handler(node, context)
+            finally:
+                elapsed = clock() - start
+                entry = self._nodes.get(id(node))
+                if entry is None:
+                    self._nodes[id(node)] = [node, 1, elapsed]
+                else:
+                    entry[1] += 1
+                    entry[2] += elapsed
+        return timed
+
+    def time_condition(self, output: str, condition: str, func: Callable, *args):
+        """Call ``func(*args)`` and record its time as the evaluation of *condition*."""
+        self._nodes = {}
+        start = time.perf_counter_ns()
+        try:
+            return func(*args)
+        finally:
+            elapsed = time.perf_counter_ns() - start
+            self.conditions.append({
+                'output': output,
+                'condition': condition,
+                'ns': elapsed,
+                'nodes': [
+                    {'node': describe_node(node), 'calls': calls, 'ns': ns}
+                    for node, calls, ns in self._nodes.values()
+                ],
+            })
+
+    def as_dict(self) -> Dict[str, dict]:
+        """Return the timings keyed by output name, as written to the ``timings`` output."""
+        return {
+            entry['output']: {key: entry[key] for key in ('condition', 'ns', 'nodes')}
+            for entry in self.conditions
+        }
+
+    def table(self) -> List[str]:
+        """Format the timings as table rows, slowest condition first."""
+        rows = [f"{'output':<10} {'calls':>6} {'µs':>10}  condition / node"]
+        for entry in sorted(self.conditions, key=lambda e: e['ns'], reverse=True):
+            rows.append(f"{entry['output']:<10} {'':>6} {entry['ns'] / 1000:>10.1f}  {entry['condition']}")
+            for node in sorted(entry['nodes'], key=lambda n: n['ns'], reverse=True):
+                rows.append(f"{'':<10} {node['calls']:>6} {node['ns'] / 1000:>10.1f}    {node['node']}")
+        return rows
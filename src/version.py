@@ -0,0 +1,52 @@
+"""
+Version strings parsed into tuple keys for semantic version comparison.
+"""
+
+import re
+from typing import Callable, Optional, Tuple
+
+VERSION_PATTERN = re.compile(
+    r'^[vV]?(\d+(?:\.\d+)*)(?:-([0-9A-Za-z.-]+))?(?:\+[0-9A-Za-z.-]+)?$'
+)
+
+# Sorts after every pre-release key, so 1.0.0-rc.1 < 1.0.0
+_RELEASE = (1,)
+
+
+def parse_version(text: str) -> Optional[Tuple]:
+    """
+    Parse a version string into a key that orders like semantic versions.
+
+    Examples:
+        '1.10'        -> ((1, 10), (1,))
+        'v1.10.0'     -> ((1, 10), (1,))       same key as '1.10'
+        '1.0.0-rc.1'  -> ((1,), (0, (1, 'rc'), (0, 1)))
+        '1.0.0+build' -> ((1,), (1,))           build metadata is ignored
+
+    Numeric components compare as numbers (1.10 > 1.9) and trailing zeros
+    are insignificant. A pre-release sorts before its release; its
+    identifiers compare numerically when they are numbers and before
+    alphanumeric identifiers otherwise.
+
+    Returns:
+        Tuple key, or None if *text* is not a version
+    """
+    match = VERSION_PATTERN.match(text.strip())
+    if match is None:
+        return None
+    core = [int(part) for part in match.group(1).split('.')]
+    while len(core) > 1 and core[-1] == 0:
+        core.pop()
+    prerelease = match.group(2)
+    if prerelease is None:
+        return tuple(core), _RELEASE
+    identifiers = tuple(
+        (0, int(identifier)) if identifier.isdigit() else (1, identifier)
+        for identifier in prerelease.split('.')
+    )
+    return tuple(core), (0,) + identifiers
+
+
+def compare_versions(op_func: Callable, left: Optional[Tuple], right: Optional[Tuple]) -> bool:
+    """Apply *op_func* to two version keys; False if either side is not a version."""
+    return left is not None and right is not None and bool(op_func(left, right))
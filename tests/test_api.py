@@ -0,0 +1,90 @@
+"""Tests for src/api.py"""
+
+import random
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from src.api import EvaluationOptions, evaluate
+from src.evaluator import TernaryOperator
+
+TESTS = ['SERVICE == game', 'SERVICE IN api,Game', 'ENV == prod', 'COUNT > 5', 'TAG EMPTY',
+         'BRANCH STARTS_WITH release/', 'BRANCH MATCHES ^(main|dev)$', 'MSG CONTAINS_ANY WIP,fixup!',
+         'VERSION SEMVER_GTE 1.10']
+
+OPTIONS = [EvaluationOptions(case_sensitive, reorder_operands, backend)
+           for case_sensitive in (True, False) for reorder_operands in (True, False)
+           for backend in ('tree', 'codegen')]
+
+
+def random_rules(rng, count):
+    rules = []
+    for _ in range(count):
+        terms = rng.sample(TESTS, rng.randint(1, 3))
+        rule = ' && '.join(terms) if rng.random() < 0.6 else ' || '.join(terms)
+        rules.append(f"NOT ({rule})" if rng.random() < 0.2 else rule)
+    return rules
+
+
+def random_variables(rng):
+    return {
+        'SERVICE': rng.choice(['game', 'Game', 'api', '']),
+        'ENV': rng.choice(['prod', 'PROD', 'qa']),
+        'COUNT': rng.choice(['3', '7', 'many']),
+        'TAG': rng.choice(['', 'v1']),
+        'BRANCH': rng.choice(['main', 'release/1.2', 'feature/x']),
+        'MSG': rng.choice(['wip: login', 'fixup! typo', 'feat: x']),
+        'VERSION': rng.choice(['1.9.0', '1.10.2', 'latest']),
+    }
+
+
+def expected(rules, variables, options):
+    op = TernaryOperator(variables)
+    op.case_sensitive = options.case_sensitive
+    op.reorder_operands = options.reorder_operands
+    return [op.evaluate_condition(rule) for rule in rules]
+
+
+class TestEvaluate:
+    @pytest.mark.parametrize('options', OPTIONS, ids=repr)
+    def test_matches_evaluator(self, options):
+        rng = random.Random(3)
+        rules = random_rules(rng, 40)
+        for _ in range(20):
+            variables = random_variables(rng)
+            assert evaluate(rules, variables, options) == expected(rules, variables, options)
+
+    def test_comma_separated_conditions(self):
+        assert evaluate('SERVICE == game, ENV IN qa,prod', {'SERVICE': 'game', 'ENV': 'dev'}) == [True, False]
+
+    def test_environment_is_not_read(self, monkeypatch):
+        monkeypatch.setenv('SERVICE', 'game')
+        monkeypatch.setenv('INPUT_CASE_SENSITIVE', 'false')
+        assert evaluate(['SERVICE == game', 'ENV == prod'], {'ENV': 'PROD'}) == [False, False]
+
+    @pytest.mark.parametrize('backend', ['tree', 'codegen'])
+    def test_invalid_condition_is_false(self, backend):
+        options = EvaluationOptions(backend=backend)
+        assert evaluate(['(((SERVICE == game', 'SERVICE == game'], {'SERVICE': 'game'}, options) == [False, True]
+
+    def test_invalid_backend(self):
+        with pytest.raises(ValueError):
+            EvaluationOptions(backend='jit')
+
+
+class TestConcurrency:
+    def test_thread_pool_matches_sequential_results(self):
+        rng = random.Random(11)
+        rules = random_rules(rng, 30)
+        tasks = [(random_variables(rng), rng.choice(OPTIONS)) for _ in range(400)]
+        wanted = [expected(rules, variables, options) for variables, options in tasks]
+
+        # Switch threads as often as possible so calls interleave mid-evaluation
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                results = list(pool.map(lambda task: evaluate(rules, *task), tasks))
+        finally:
+            sys.setswitchinterval(interval)
+        assert results == wanted
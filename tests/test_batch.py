@@ -0,0 +1,51 @@
+"""Tests for src/batch.py"""
+
+import pytest
+from src.batch import BatchEvaluator, evaluate_batch
+from tests.test_codegen import CONDITIONS, VALUES
+
+NAMES = ['SERVICE', 'COUNT', 'VERSION', 'MSG', 'BRANCH', 'TAG']
+COLUMNS = {name: [values.get(name, '') for values in VALUES] for name in NAMES}
+
+
+class TestPurePythonBatch:
+    def test_evaluate(self):
+        batch = BatchEvaluator({'SERVICE': ['game', 'web'], 'ENV': ['prod', 'prod']}, use_numpy=False)
+        assert batch.evaluate('SERVICE IN game,batch && ENV == prod') == [True, False]
+
+    def test_missing_column_is_empty(self):
+        batch = BatchEvaluator({'SERVICE': ['game', 'web']}, use_numpy=False)
+        assert batch.evaluate('TAG EMPTY') == [True, True]
+
+    def test_literal_only_condition(self):
+        batch = BatchEvaluator({'SERVICE': ['a', 'b', 'c']}, use_numpy=False)
+        assert batch.evaluate('5 < 10') == [True, True, True]
+
+    def test_column_lengths_must_match(self):
+        with pytest.raises(ValueError, match='same length'):
+            BatchEvaluator({'A': ['1'], 'B': ['1', '2']})
+
+    def test_empty_batch(self):
+        assert BatchEvaluator({'A': []}, use_numpy=False).evaluate('A == a') == []
+
+
+class TestNumpyBatch:
+    @pytest.fixture(autouse=True)
+    def numpy(self):
+        return pytest.importorskip('numpy')
+
+    def test_returns_boolean_array(self, numpy):
+        result = evaluate_batch(['ENV == prod'], {'ENV': ['prod', 'qa']})[0]
+        assert result.dtype == numpy.bool_
+        assert result.tolist() == [True, False]
+
+    def test_numeric_and_string_rows(self):
+        batch = BatchEvaluator({'COUNT': ['7', 'many', '12']})
+        assert batch.evaluate('COUNT > 10').tolist() == [False, True, True]
+
+    @pytest.mark.parametrize('case_sensitive', [True, False])
+    def test_matches_row_evaluation(self, case_sensitive):
+        vectorized = BatchEvaluator(COLUMNS, case_sensitive, use_numpy=True)
+        rows = BatchEvaluator(COLUMNS, case_sensitive, use_numpy=False)
+        for condition in CONDITIONS:
+            assert vectorized.evaluate(condition).tolist() == rows.evaluate(condition), condition
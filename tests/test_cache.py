@@ -0,0 +1,64 @@
+"""Tests for src/cache.py"""
+
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from src.cache import LRUCache
+
+
+class TestLRUCache:
+    def test_miss_then_hit(self):
+        cache = LRUCache(2)
+        assert cache.get_or_create('a', lambda: 1) == 1
+        assert cache.get_or_create('a', lambda: 2) == 1
+        assert cache.stats() == {'size': 1, 'maxsize': 2, 'hits': 1, 'misses': 1, 'evictions': 0}
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(2)
+        cache.get_or_create('a', lambda: 1)
+        cache.get_or_create('b', lambda: 2)
+        cache.get_or_create('a', lambda: 0)
+        cache.get_or_create('c', lambda: 3)
+        assert cache.evictions == 1
+        assert cache.get_or_create('a', lambda: 0) == 1
+        assert cache.get_or_create('b', lambda: 9) == 9
+
+    def test_factory_error_not_cached(self):
+        cache = LRUCache(2)
+        with pytest.raises(ValueError):
+            cache.get_or_create('a', lambda: (_ for _ in ()).throw(ValueError("bad")))
+        assert len(cache) == 0
+
+    def test_resize_evicts(self):
+        cache = LRUCache(3)
+        for key in 'abc':
+            cache.get_or_create(key, lambda: key)
+        cache.resize(1)
+        assert len(cache) == 1
+        assert cache.evictions == 2
+
+    def test_clear_resets_counters(self):
+        cache = LRUCache(1)
+        cache.get_or_create('a', lambda: 1)
+        cache.clear()
+        assert cache.stats()['misses'] == 0
+        assert len(cache) == 0
+
+    def test_shared_between_threads(self):
+        cache = LRUCache(4)
+
+        def work(offset):
+            return [cache.get_or_create(i % 7, lambda i=i: i % 7) for i in range(offset, offset + 5000)]
+
+        # Switch threads as often as possible so evictions interleave with lookups
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                results = list(pool.map(work, range(8)))
+        finally:
+            sys.setswitchinterval(interval)
+        assert all(value == i % 7 for offset, values in enumerate(results)
+                   for i, value in enumerate(values, offset))
+        assert len(cache) <= 4
@@ -0,0 +1,125 @@
+"""Tests for src/codegen.py"""
+
+import marshal
+import os
+import pytest
+from src.codegen import CodeGenerator, function_code, generate_source, load_function
+from src.compiler import ConditionCompiler
+from src.context import EvaluationContext
+from src.diskcache import decode, encode
+from src.evaluator import TernaryOperator
+
+CONDITIONS = [
+    'SERVICE == game',
+    'SERVICE != game',
+    'COUNT > 5',
+    'COUNT <= 10.5',
+    'COUNT == VERSION',
+    '5 < 10',
+    'abc < abd',
+    'SERVICE IN game, batch',
+    'MSG CONTAINS fix',
+    'MSG CONTAINS SERVICE',
+    'MSG CONTAINS_ANY bug,fix,a f',
+    'BRANCH STARTS_WITH release/',
+    'BRANCH ENDS_WITH -rc',
+    'BRANCH STARTS_WITH_ANY hotfix/,release/',
+    'BRANCH ENDS_WITH_ANY -rc,-beta',
+    'BRANCH MATCHES ^(main|release/.*)$',
+    'BRANCH MATCHES_ANY ^main$,^release/[0-9]{1,3},(-rc)\\1',
+    'TAG EMPTY',
+    'TAG NOT_EMPTY',
+    'NOT (SERVICE == game) || (COUNT > 5 && BRANCH MATCHES ^main$)',
+    'VERSION SEMVER_GTE 1.10',
+    'VERSION SEMVER_LT COUNT',
+    'SERVICE game',
+    'VAR MATCHES [invalid',
+]
+
+VALUES = [
+    {'SERVICE': 'game', 'COUNT': '7', 'VERSION': '7.0', 'MSG': 'a fix for game', 'BRANCH': 'main', 'TAG': ''},
+    {'SERVICE': 'Game', 'COUNT': '12', 'VERSION': '1', 'MSG': 'Fix', 'BRANCH': 'release/1.0-RC', 'TAG': '  '},
+    {'SERVICE': 'web', 'COUNT': 'many', 'VERSION': 'Many', 'MSG': '', 'BRANCH': 'Release/2-rc', 'TAG': 'v1'},
+    {},
+]
+
+
+class TestGenerateSource:
+    def test_constants_are_bound(self):
+        node = ConditionCompiler.compile('SERVICE IN game,batch && BRANCH MATCHES ^main$')
+        source, constants = generate_source(node)
+        assert 'def condition(get, files=None):' in source
+        assert node.operands[0].value_set in constants.values()
+        assert node.operands[1].regex in constants.values()
+
+    def test_each_variable_read_once(self):
+        source, _ = generate_source(ConditionCompiler.compile('A == a || A == b || A == c'))
+        assert source.count("get('A')") == 1
+
+    def test_literal_comparison_is_folded(self):
+        source, _ = generate_source(ConditionCompiler.compile('5 < 10'))
+        assert 'return True' in source
+
+
+class TestCodeGenerator:
+    def test_compile_is_cached(self):
+        assert CodeGenerator.compile('CACHED == yes') is CodeGenerator.compile('CACHED == yes')
+
+    def test_single_call(self):
+        function = CodeGenerator.compile('SERVICE IN game,batch && ENV == prod')
+        assert function({'SERVICE': 'game', 'ENV': 'prod'}.get) is True
+        assert function({'SERVICE': 'web', 'ENV': 'prod'}.get) is False
+
+    @pytest.mark.parametrize('case_sensitive', [True, False])
+    @pytest.mark.parametrize('condition', CONDITIONS)
+    def test_matches_tree_walker(self, monkeypatch, condition, case_sensitive):
+        monkeypatch.setenv('INPUT_CASE_SENSITIVE', str(case_sensitive).lower())
+        op = TernaryOperator()
+        function = CodeGenerator.compile(condition, case_sensitive=case_sensitive)
+        for values in VALUES:
+            node = op.compile_condition(condition)
+            expected = op.evaluate_node(node, EvaluationContext(values))
+            context = EvaluationContext(values)
+            assert function(context.get) is expected, (condition, values)
+
+    @pytest.mark.parametrize('condition', CONDITIONS)
+    def test_stored_function_code(self, condition):
+        node = ConditionCompiler.compile(condition)
+        stored = marshal.dumps(encode(function_code(node)))
+        function = load_function(*decode(marshal.loads(stored)))
+        for values in VALUES:
+            expected = CodeGenerator.compile(condition)(EvaluationContext(values).get)
+            assert function(EvaluationContext(values).get) is expected, (condition, values)
+
+
+class TestCodegenBackend:
+    def setup_method(self):
+        os.environ['INPUT_CONDITIONS'] = ''
+        os.environ['INPUT_TRUE_VALUES'] = ''
+        os.environ['INPUT_FALSE_VALUES'] = ''
+
+    def test_evaluate_condition(self, monkeypatch):
+        monkeypatch.setenv('INPUT_BACKEND', 'codegen')
+        monkeypatch.setenv('SERVICE', 'game')
+        op = TernaryOperator()
+        assert op.evaluate_condition('SERVICE == game && NOT (SERVICE IN web)') is True
+
+    def test_run_outputs(self, monkeypatch, github_output):
+        monkeypatch.setenv('GITHUB_OUTPUT', github_output)
+        monkeypatch.setenv('INPUT_BACKEND', 'codegen')
+        monkeypatch.setenv('INPUT_CONDITIONS', 'SERVICE == game, SERVICE STARTS_WITH w')
+        monkeypatch.setenv('INPUT_TRUE_VALUES', 'yes, yes')
+        monkeypatch.setenv('INPUT_FALSE_VALUES', 'no, no')
+        monkeypatch.setenv('SERVICE', 'game')
+        TernaryOperator().run()
+        content = open(github_output).read()
+        assert 'output_1=yes' in content
+        assert 'output_2=no' in content
+
+    def test_invalid_backend(self, monkeypatch):
+        monkeypatch.setenv('INPUT_BACKEND', 'jit')
+        monkeypatch.setenv('INPUT_CONDITIONS', 'A == a')
+        monkeypatch.setenv('INPUT_TRUE_VALUES', 'x')
+        monkeypatch.setenv('INPUT_FALSE_VALUES', 'y')
+        with pytest.raises(SystemExit):
+            TernaryOperator().validate_inputs()
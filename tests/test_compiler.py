@@ -0,0 +1,242 @@
+"""Tests for src/compiler.py"""
+
+import os
+import pickle
+import re
+import pytest
+from src.compiler import (
+    ConditionCompiler, COMPARISON_OPS, Operand, InvalidNode, NotNode, AndNode, OrNode, ComparisonNode,
+    InNode, ContainsNode, StartsEndsWithNode, MatchesNode, EmptyNode, tokenize, referenced_variables,
+    estimate_cost, reorder_operands, shared_subexpressions, compare_values, is_numeric,
+    LEAF, AND, OR, NOT, LPAREN, RPAREN, EOF,
+)
+from src.evaluator import TernaryOperator
+
+
+class TestTokenize:
+    def test_simple_leaf(self):
+        assert tokenize('SERVICE == game') == [(LEAF, 'SERVICE == game'), (EOF, '')]
+
+    def test_logical_operators(self):
+        kinds = [kind for kind, _ in tokenize('A == a && B == b || C == c')]
+        assert kinds == [LEAF, AND, LEAF, OR, LEAF, EOF]
+
+    def test_not_and_group(self):
+        kinds = [kind for kind, _ in tokenize('NOT (A == a)')]
+        assert kinds == [NOT, LPAREN, LEAF, RPAREN, EOF]
+
+    def test_regex_group_stays_in_leaf(self):
+        tokens = tokenize('BRANCH MATCHES ^(main|develop)$')
+        assert tokens == [(LEAF, 'BRANCH MATCHES ^(main|develop)$'), (EOF, '')]
+
+    def test_not_empty_is_not_negation(self):
+        assert tokenize('VAR NOT_EMPTY')[0] == (LEAF, 'VAR NOT_EMPTY')
+
+
+class TestCompareValues:
+    @pytest.mark.parametrize('op, left, right, case_sensitive, expected', [
+        ('<', '9', '10', True, True),
+        ('==', '1.0', '1', True, True),
+        ('<', 'b', 'a10', True, False),
+        ('==', 'Game', 'game', True, False),
+        ('==', 'Game', 'game', False, True),
+        ('>', '10', 'abc', True, False),
+    ])
+    def test_numbers_then_strings(self, op, left, right, case_sensitive, expected):
+        assert compare_values(COMPARISON_OPS[op], left, right, case_sensitive) is expected
+
+    def test_is_numeric(self):
+        assert [is_numeric(v) for v in ('42', '-3.5', '1e3', '', '1.2.3', 'game')] == [True] * 3 + [False] * 3
+
+
+class TestConditionCompiler:
+    def test_comparison(self):
+        node = ConditionCompiler.compile('SERVICE == game')
+        assert node == ComparisonNode(Operand('SERVICE', True), '==', Operand('game', False))
+
+    def test_leaf_operators(self):
+        assert ConditionCompiler.compile('ENV IN qa, prod') == InNode('ENV', ('qa', 'prod'), frozenset({'qa', 'prod'}))
+        assert ConditionCompiler.compile('MSG CONTAINS fix') == ContainsNode('MSG', Operand('fix', False))
+        assert ConditionCompiler.compile('B STARTS_WITH rel/') == StartsEndsWithNode('B', 'STARTS_WITH', 'rel/')
+        assert ConditionCompiler.compile('T MATCHES ^v') == MatchesNode('T', '^v', re.compile('^v'))
+        assert ConditionCompiler.compile('V NOT_EMPTY') == EmptyNode('V', True)
+
+    def test_precedence(self):
+        node = ConditionCompiler.compile('NOT (A == a) && B == b || C == c')
+        assert isinstance(node, OrNode)
+        assert isinstance(node.operands[0], AndNode)
+        assert isinstance(node.operands[0].operands[0], NotNode)
+
+    def test_not_binds_to_next_operand(self):
+        a, b, c = (ConditionCompiler.compile(f'{v} == {v.lower()}') for v in 'ABC')
+        assert ConditionCompiler.compile('NOT (A == a) && B == b') == AndNode((NotNode(a), b))
+        assert ConditionCompiler.compile('NOT (A == a || B == b) && C == c') == AndNode((NotNode(OrNode((a, b))), c))
+
+    @pytest.mark.parametrize('variables, expected', [
+        ({'A': 'a', 'B': 'b'}, [False, False]),
+        # Negating the whole condition would make both true
+        ({'A': 'a', 'B': 'x'}, [False, False]),
+        ({'A': 'x', 'B': 'b', 'C': 'c'}, [True, False]),
+        ({'A': 'x', 'B': 'x', 'C': 'c'}, [False, True]),
+    ])
+    def test_not_binds_to_next_operand_when_evaluated(self, variables, expected):
+        op = TernaryOperator(variables)
+        conditions = ['NOT (A == a) && B == b', 'NOT (A == a || B == b) && C == c']
+        assert [op.evaluate_condition(condition) for condition in conditions] == expected
+
+    def test_parentheses_override_precedence(self):
+        node = ConditionCompiler.compile('A == a && (B == b || C == c)')
+        assert isinstance(node, AndNode)
+        assert isinstance(node.operands[1], OrNode)
+
+    def test_compile_is_cached(self):
+        first = ConditionCompiler.compile('CACHED == yes')
+        assert ConditionCompiler.compile('CACHED == yes') is first
+
+    def test_unbalanced_parentheses(self):
+        assert isinstance(ConditionCompiler.compile('(A == a'), InvalidNode)
+        assert isinstance(ConditionCompiler.compile('(A == a) junk'), InvalidNode)
+
+    def test_no_operator(self):
+        assert isinstance(ConditionCompiler.compile('SERVICE game'), InvalidNode)
+
+    def test_matches_pattern_precompiled(self):
+        node = ConditionCompiler.compile('TAG MATCHES ^V1', case_sensitive=False)
+        assert node.regex.flags & re.IGNORECASE
+        assert node.regex.search('v1.0') is not None
+
+    def test_invalid_regex_is_compile_error(self):
+        node = ConditionCompiler.compile('VAR MATCHES [invalid')
+        assert isinstance(node, InvalidNode)
+        assert 'Invalid regex pattern' in node.message
+
+    def test_pattern_cache_counts_hits(self):
+        before = ConditionCompiler.pattern_cache_info()
+        ConditionCompiler.compile('A MATCHES ^shared-pattern$')
+        ConditionCompiler.compile('B MATCHES ^shared-pattern$')
+        after = ConditionCompiler.pattern_cache_info()
+        assert after['misses'] == before['misses'] + 1
+        assert after['hits'] == before['hits'] + 1
+
+    def test_in_values_normalized_once(self):
+        node = ConditionCompiler.compile('SERVICE IN Game, BATCH,api', case_sensitive=False)
+        assert node.values == ('Game', 'BATCH', 'api')
+        assert node.value_set == frozenset({'game', 'batch', 'api'})
+
+    def test_depth_limit(self):
+        node = ConditionCompiler.compile('NOT (NOT (A == a))', max_depth=2)
+        assert node == NotNode(NotNode(InvalidNode('', 'Max recursion depth (2) exceeded')))
+
+
+class TestNodeValues:
+    def test_immutable(self):
+        node = ConditionCompiler.compile('SERVICE == game')
+        with pytest.raises(AttributeError):
+            node.op = '!='
+
+    def test_equality_includes_type(self):
+        operands = (EmptyNode('A', False), EmptyNode('B', False))
+        assert AndNode(operands) == AndNode(operands)
+        assert AndNode(operands) != OrNode(operands)
+        assert hash(AndNode(operands)) == hash(AndNode(operands))
+
+    def test_repr(self):
+        assert repr(EmptyNode('VAR', True)) == "EmptyNode(var_name='VAR', negate=True)"
+
+    def test_pickle_round_trip(self):
+        node = ConditionCompiler.compile('A IN x,y && B MATCHES ^v')
+        assert pickle.loads(pickle.dumps(node)) == node
+
+    def test_wrong_argument_count(self):
+        with pytest.raises(TypeError):
+            EmptyNode('VAR')
+
+
+class TestReferencedVariables:
+    def test_collects_all_variables(self):
+        node = ConditionCompiler.compile(
+            'SERVICE == game && (BRANCH STARTS_WITH rel/ || MSG CONTAINS TOKEN) && NOT (TAG EMPTY)'
+        )
+        assert referenced_variables(node) == {'SERVICE', 'BRANCH', 'MSG', 'TOKEN', 'TAG'}
+
+    def test_literals_are_not_variables(self):
+        assert referenced_variables(ConditionCompiler.compile('count > 5')) == frozenset()
+
+    def test_invalid_node(self):
+        assert referenced_variables(ConditionCompiler.compile('SERVICE game')) == frozenset()
+
+
+class TestReorderOperands:
+    def test_cheap_operands_first(self):
+        node = ConditionCompiler.compile(
+            'MSG MATCHES ^fix && MSG CONTAINS bug && B STARTS_WITH rel/ && S IN a,b && ENV == prod && V EMPTY',
+            reorder=True,
+        )
+        assert [type(o) for o in node.operands] == [
+            EmptyNode, ComparisonNode, InNode, StartsEndsWithNode, ContainsNode, MatchesNode,
+        ]
+
+    def test_not_reordered_by_default(self):
+        node = ConditionCompiler.compile('MSG MATCHES ^fix || ENV == prod')
+        assert isinstance(node.operands[0], MatchesNode)
+
+    def test_nested_chains_use_total_cost(self):
+        node = reorder_operands(ConditionCompiler.compile('(A MATCHES x && B == b) || NOT (C EMPTY)'))
+        assert isinstance(node.operands[0], NotNode)
+        assert isinstance(node.operands[1].operands[0], ComparisonNode)
+        assert estimate_cost(node) == 11
+
+    def test_equal_costs_keep_order(self):
+        node = ConditionCompiler.compile('B == b && A == a', reorder=True)
+        assert node.operands[0].left.value == 'B'
+
+
+class TestSharedSubexpressions:
+    def test_identical_subtrees_are_one_object(self):
+        first = ConditionCompiler.compile('ENVIRONMENT == prod && SERVICE == game')
+        second = ConditionCompiler.compile('ENVIRONMENT == prod || BRANCH STARTS_WITH release/')
+        assert first.operands[0] is second.operands[0]
+
+    def test_shared_ids(self):
+        first = ConditionCompiler.compile('ENVIRONMENT == prod && (SERVICE == game || SERVICE == api)')
+        second = ConditionCompiler.compile('(SERVICE == game || SERVICE == api) && TAG NOT_EMPTY')
+        shared = shared_subexpressions([first, second])
+        assert shared == {id(first.operands[1])}
+
+    def test_no_sharing(self):
+        first = ConditionCompiler.compile('A == a')
+        second = ConditionCompiler.compile('B == b')
+        assert shared_subexpressions([first, second]) == frozenset()
+
+
+class TestCompiledEvaluation:
+    def setup_method(self):
+        os.environ['INPUT_CONDITIONS'] = ''
+        os.environ['INPUT_TRUE_VALUES'] = ''
+        os.environ['INPUT_FALSE_VALUES'] = ''
+
+    def test_grouped_or_inside_and(self, monkeypatch):
+        monkeypatch.setenv('SERVICE', 'game')
+        monkeypatch.setenv('ENV', 'prod')
+        op = TernaryOperator()
+        assert op.evaluate_condition('SERVICE == game && (ENV == qa || ENV == prod)') is True
+        assert op.evaluate_condition('SERVICE == batch && (ENV == qa || ENV == prod)') is False
+
+    def test_not_binds_tighter_than_and(self, monkeypatch):
+        monkeypatch.setenv('SERVICE', 'game')
+        monkeypatch.setenv('ENV', 'prod')
+        op = TernaryOperator()
+        assert op.evaluate_condition('NOT (SERVICE == batch) && ENV == prod') is True
+
+    def test_regex_alternation(self, monkeypatch):
+        monkeypatch.setenv('BRANCH', 'develop')
+        op = TernaryOperator()
+        assert op.evaluate_condition('BRANCH MATCHES ^(main|develop)$ && BRANCH NOT_EMPTY') is True
+
+    def test_evaluate_node_reuses_tree(self, monkeypatch):
+        op = TernaryOperator()
+        node = ConditionCompiler.compile('SERVICE IN game,batch')
+        monkeypatch.setenv('SERVICE', 'game')
+        assert op.evaluate_node(node) is True
+        monkeypatch.setenv('SERVICE', 'web')
+        assert op.evaluate_node(node) is False
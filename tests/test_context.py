@@ -0,0 +1,38 @@
+"""Tests for src/context.py"""
+
+from src.context import EvaluationContext
+
+
+class CountingMapping(dict):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lookups = 0
+
+    def get(self, key, default=None):
+        self.lookups += 1
+        return super().get(key, default)
+
+
+class TestEvaluationContext:
+    def test_resolves_names_up_front(self):
+        source = CountingMapping(SERVICE='game')
+        context = EvaluationContext(source, ['SERVICE', 'ENV'])
+        assert context.variables == {'SERVICE': 'game', 'ENV': ''}
+        assert source.lookups == 2
+
+    def test_each_name_read_once(self):
+        source = CountingMapping(SERVICE='game')
+        context = EvaluationContext(source)
+        assert context.get('SERVICE') == 'game'
+        assert context.get('SERVICE') == 'game'
+        assert source.lookups == 1
+
+    def test_snapshot_ignores_later_changes(self, monkeypatch):
+        monkeypatch.setenv('SNAPSHOT_VAR', 'before')
+        context = EvaluationContext(names=['SNAPSHOT_VAR'])
+        monkeypatch.setenv('SNAPSHOT_VAR', 'after')
+        assert context.get('SNAPSHOT_VAR') == 'before'
+
+    def test_defaults_to_environ(self, monkeypatch):
+        monkeypatch.setenv('ENV_BACKED', 'yes')
+        assert EvaluationContext().get('ENV_BACKED') == 'yes'
@@ -0,0 +1,151 @@
+"""Tests for src/diskcache.py"""
+
+import marshal
+import os
+import re
+import subprocess
+import sys
+
+import pytest
+from src import diskcache
+from src import compiler
+from src.compiler import ConditionCompiler, _ValueObject
+from src.diskcache import RulesetCache, cache_key, decode, encode
+
+
+def round_trip(value):
+    return decode(marshal.loads(marshal.dumps(encode(value))))
+
+
+class TestCacheKey:
+    def test_stable(self):
+        assert cache_key('SERVICE == game', 'a', True) == cache_key('SERVICE == game', 'a', True)
+
+    def test_depends_on_every_part(self):
+        keys = {
+            cache_key('SERVICE == game', 'a', True),
+            cache_key('SERVICE == game', 'a', False),
+            cache_key('SERVICE == game', 'b', True),
+            cache_key('SERVICE == gam', 'ea', True),
+        }
+        assert len(keys) == 4
+
+    def test_depends_on_format_version(self, monkeypatch):
+        key = cache_key('A == a')
+        monkeypatch.setattr(diskcache, 'FORMAT_VERSION', diskcache.FORMAT_VERSION + 1)
+        assert cache_key('A == a') != key
+
+    def test_depends_on_package_sources(self, monkeypatch, tmp_path):
+        for name in ('compiler.py', 'operators.py'):
+            (tmp_path / name).write_text('# version 1\n')
+        monkeypatch.setattr(diskcache, '__file__', str(tmp_path / 'diskcache.py'))
+        diskcache.source_checksum.cache_clear()
+        try:
+            key = cache_key('A == a')
+            (tmp_path / 'operators.py').write_text('# version 2\n')
+            diskcache.source_checksum.cache_clear()
+            assert cache_key('A == a') != key
+        finally:
+            diskcache.source_checksum.cache_clear()
+
+
+class TestEncode:
+    @pytest.mark.parametrize('condition', [
+        'SERVICE == game && (ENV IN dev,qa || NOT (COUNT > 5))',
+        'MSG CONTAINS_ANY wip,fixup! || BRANCH STARTS_WITH_ANY release/,hotfix/',
+        'MSG MATCHES ^feat || TAG MATCHES_ANY ^v[0-9]+$,-rc$',
+        'VERSION SEMVER_GTE 1.10 && build.log FILE_MATCHES ERROR',
+        'SERVICE ==',
+    ])
+    def test_round_trip(self, condition):
+        node = ConditionCompiler.compile(condition)
+        assert round_trip(node) == node
+
+    def test_regex_keeps_flags(self):
+        regex = round_trip(re.compile('^v[0-9]', re.IGNORECASE))
+        assert regex.pattern == '^v[0-9]' and regex.flags & re.IGNORECASE
+
+    def test_shared_nodes_stay_shared(self):
+        shared = ConditionCompiler.compile('SERVICE == game && ENV == prod')
+        first, second = round_trip([shared, shared])
+        assert first is second
+
+    def test_unsupported_value(self):
+        with pytest.raises(TypeError):
+            encode(object())
+
+    def test_only_package_names_are_resolved(self):
+        with pytest.raises(ImportError):
+            decode({'function': 'os:system'})
+        with pytest.raises(TypeError):
+            decode({'type': 'src.context:EvaluationContext', 'args': ()})
+
+
+# Together these compile to every node type
+EVERY_NODE_TYPE = [
+    'SERVICE == game && (ENV IN dev,qa || NOT (COUNT > 5))',
+    'MSG CONTAINS fix && MSG CONTAINS_ANY wip,fixup!',
+    'BRANCH STARTS_WITH release/ || BRANCH ENDS_WITH_ANY -rc,-beta',
+    'MSG MATCHES ^feat || TAG MATCHES_ANY ^v[0-9]+$,-rc$',
+    'VERSION SEMVER_GTE 1.10 && VERSION SEMVER_LT LATEST',
+    'build.log FILE_CONTAINS Error || build.log FILE_MATCHES ^FAIL',
+    'TAG EMPTY',
+    'SERVICE ==',
+]
+
+
+def node_types(node):
+    found = {type(node)}
+    for value in node._values():
+        for item in value if isinstance(value, tuple) else (value,):
+            if isinstance(item, _ValueObject):
+                found |= node_types(item)
+    return found
+
+
+class TestRulesetCache:
+    @pytest.mark.parametrize('case_sensitive', [True, False])
+    def test_every_node_type_round_trips(self, tmp_path, case_sensitive):
+        nodes = [ConditionCompiler.compile(condition, case_sensitive=case_sensitive) for condition in EVERY_NODE_TYPE]
+        all_types = {value for value in vars(compiler).values()
+                     if isinstance(value, type) and issubclass(value, _ValueObject) and value is not _ValueObject}
+        assert set().union(*map(node_types, nodes)) == all_types
+
+        cache = RulesetCache(str(tmp_path))
+        cache.save(cache_key(case_sensitive), nodes)
+        assert cache.load(cache_key(case_sensitive)) == nodes
+
+    def test_entry_name_is_stable_across_processes(self, tmp_path):
+        cache = RulesetCache(str(tmp_path))
+        code = f"from src.diskcache import RulesetCache; print(RulesetCache({str(tmp_path)!r}).path(('A == a', True)))"
+        names = {subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                                env=dict(os.environ, PYTHONHASHSEED=seed)).stdout.strip() for seed in ('1', '2')}
+        assert names == {cache.path(('A == a', True))}
+
+    def test_round_trip(self, tmp_path):
+        cache = RulesetCache(str(tmp_path / 'cache'))
+        key = cache_key('A == a')
+        assert cache.load(key) is None
+        cache.save(key, ['A == a'])
+        assert cache.load(key) == ['A == a']
+        assert os.listdir(cache.directory) == [os.path.basename(cache.path(key))]
+
+    def test_corrupt_entry_is_a_miss(self, tmp_path):
+        cache = RulesetCache(str(tmp_path))
+        with open(cache.path('k'), 'wb') as f:
+            f.write(b'not marshal data')
+        assert cache.load('k') is None
+
+    def test_other_key_with_the_same_name_is_a_miss(self, tmp_path, monkeypatch):
+        cache = RulesetCache(str(tmp_path))
+        monkeypatch.setattr(RulesetCache, 'path', lambda self, key: os.path.join(self.directory, 'entry'))
+        cache.save(cache_key('A == a'), 'a')
+        assert cache.path(cache_key('B == b')) == cache.path(cache_key('A == a'))
+        assert cache.load(cache_key('B == b')) is None
+        assert cache.load(cache_key('A == a')) == 'a'
+
+    def test_failed_write_leaves_no_file(self, tmp_path):
+        cache = RulesetCache(str(tmp_path))
+        with pytest.raises(TypeError):
+            cache.save('k', lambda: None)
+        assert os.listdir(tmp_path) == []
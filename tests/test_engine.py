@@ -0,0 +1,101 @@
+"""Tests for src/engine.py"""
+
+import random
+
+import pytest
+from src.compiler import ConditionCompiler
+from src.engine import RuleEngine, RuleIndex, equality_constraints
+from src.evaluator import TernaryOperator
+
+
+def compile_all(conditions, case_sensitive=True):
+    return [ConditionCompiler.compile(condition, case_sensitive=case_sensitive) for condition in conditions]
+
+
+class TestEqualityConstraints:
+    def test_conjunction(self):
+        node = ConditionCompiler.compile('SERVICE == game && ENV IN qa,prod && COUNT > 5')
+        assert equality_constraints(node) == {'SERVICE': {'game'}, 'ENV': {'qa', 'prod'}}
+
+    def test_literal_on_the_left(self):
+        assert equality_constraints(ConditionCompiler.compile('game == SERVICE')) == {'SERVICE': {'game'}}
+
+    def test_repeated_variable_intersects(self):
+        node = ConditionCompiler.compile('ENV IN qa,prod && ENV IN prod,dev')
+        assert equality_constraints(node) == {'ENV': {'prod'}}
+
+    @pytest.mark.parametrize('condition', [
+        'SERVICE == game || ENV == prod',
+        'NOT (SERVICE == game)',
+        'SERVICE != game',
+        'VERSION == 1.0',
+        'SERVICE == ENV',
+        'MESSAGE CONTAINS game',
+    ])
+    def test_not_indexed(self, condition):
+        assert equality_constraints(ConditionCompiler.compile(condition)) == {}
+
+    def test_case_insensitive_values_are_folded(self):
+        node = ConditionCompiler.compile('SERVICE == Game', case_sensitive=False)
+        assert equality_constraints(node, case_sensitive=False) == {'SERVICE': {'game'}}
+
+
+class TestRuleIndex:
+    def test_candidates(self):
+        conditions = [f"SERVICE == s{i % 50} && ENV == e{i % 3}" for i in range(300)] + ['COUNT > 5']
+        index = RuleIndex(compile_all(conditions), leaf_size=1)
+        found = index.candidates({'SERVICE': 's7', 'ENV': 'e1'}.get)
+        assert found == [i for i in range(300) if i % 50 == 7 and i % 3 == 1] + [300]
+        assert index.indexed == 300
+
+    def test_small_sets_are_not_split(self):
+        conditions = [f"SERVICE == s{i % 50} && ENV == e{i % 3}" for i in range(300)]
+        index = RuleIndex(compile_all(conditions))
+        assert index.candidates({'SERVICE': 's7', 'ENV': 'e1'}.get) == list(range(7, 300, 50))
+
+    def test_unset_variable_only_leaves_unindexed_rules(self):
+        index = RuleIndex(compile_all([f"SERVICE IN a{i},b{i}" for i in range(40)] + ['TAG EMPTY']))
+        assert index.candidates(lambda name: '') == [40]
+
+
+def random_rules(rng, count):
+    tests = ['SERVICE == game', 'SERVICE == Web', 'SERVICE IN api,game', 'ENV == prod', 'ENV IN qa,prod',
+             'COUNT > 5', 'VERSION == 1.0', 'TAG EMPTY', 'SERVICE != game']
+    rules = []
+    for _ in range(count):
+        terms = rng.sample(tests, rng.randint(1, 3))
+        rules.append(' && '.join(terms) if rng.random() < 0.8 else ' || '.join(terms))
+    return rules
+
+
+def random_variables(rng):
+    return {
+        'SERVICE': rng.choice(['game', 'web', 'Web', 'api', '']),
+        'ENV': rng.choice(['prod', 'qa', 'PROD']),
+        'COUNT': rng.choice(['3', '7', 'many']),
+        'VERSION': rng.choice(['1', '1.0', '2']),
+        'TAG': rng.choice(['', 'v1']),
+    }
+
+
+class TestRuleEngine:
+    @pytest.mark.parametrize('backend', ['tree', 'codegen'])
+    @pytest.mark.parametrize('case_sensitive', [True, False])
+    def test_matches_linear_evaluation(self, backend, case_sensitive):
+        rng = random.Random(5)
+        rules = random_rules(rng, 120)
+        engine = RuleEngine(rules, case_sensitive=case_sensitive, backend=backend, leaf_size=2)
+        for _ in range(50):
+            variables = random_variables(rng)
+            op = TernaryOperator(variables)
+            op.case_sensitive = case_sensitive
+            assert engine.evaluate(variables) == [op.evaluate_condition(rule) for rule in rules]
+
+    def test_matching(self):
+        engine = RuleEngine(['SERVICE == game && ENVIRONMENT == prod', 'SERVICE IN api,web', 'COUNT > 5'])
+        assert engine.matching({'SERVICE': 'game', 'ENVIRONMENT': 'prod'}) == [0]
+        assert engine.evaluate({'SERVICE': 'web', 'COUNT': '7'}) == [False, True, True]
+
+    def test_invalid_backend(self):
+        with pytest.raises(ValueError):
+            RuleEngine(['A == a'], backend='jit')
@@ -1,9 +1,14 @@
 """Tests for src/evaluator.py"""
 
+import json
 import os
+import subprocess
+import sys
 from unittest.mock import patch, PropertyMock
 import pytest
 from src.evaluator import TernaryOperator
+from src.compiler import InNode
+from src.parser import ConditionParser
 
 
 class TestTernaryOperatorInit:
@@ -595,3 +600,330 @@ class TestRunExceptionHandling:
         with patch.object(op, 'validate_inputs', side_effect=ValueError("test error")):
             with pytest.raises(SystemExit):
                 op.run()
+
+
+class TestBufferedOutputs:
+    def test_multiline_value_uses_heredoc(self, default_env):
+        op = TernaryOperator()
+        op.safe_write_output('notes', 'first\nsecond')
+        with open(default_env) as f:
+            content = f.read()
+        assert content.startswith('notes<<ghadelimiter_')
+        assert '\nfirst\nsecond\n' in content
+
+    def test_evaluate_conditions_writes_once(self, default_env):
+        op = TernaryOperator()
+        with patch('src.output.open', create=True, side_effect=open) as mock_open:
+            op.evaluate_conditions()
+        assert mock_open.call_count == 1
+        with open(default_env) as f:
+            content = f.read()
+        assert 'output_1=pass' in content
+        assert 'result={"output_1": "pass"}' in content
+
+
+class TestConditionsFile:
+    def write_rules(self, tmp_path, lines):
+        path = tmp_path / "rules.jsonl"
+        path.write_text(''.join(line + '\n' for line in lines))
+        return str(path)
+
+    def test_streams_many_rules(self, clean_env, monkeypatch, tmp_path, github_output):
+        lines = [f'C{i % 7} == {i % 7}\tpass{i}\tfail{i}' for i in range(2000)]
+        monkeypatch.setenv('INPUT_CONDITIONS_FILE', self.write_rules(tmp_path, lines))
+        monkeypatch.setenv('GITHUB_OUTPUT', github_output)
+        monkeypatch.setenv('C3', '3')
+        op = TernaryOperator()
+        assert op.run() == 0
+        with open(github_output) as f:
+            content = f.read().splitlines()
+        assert len(content) == 2000
+        assert content[3] == 'output_4=pass3'
+        assert content[4] == 'output_5=fail4'
+
+    def test_default_value_on_error(self, clean_env, monkeypatch, tmp_path, github_output):
+        path = self.write_rules(tmp_path, ['{"condition": "A == B", "true": "y", "false": "n", "default": "d"}'])
+        monkeypatch.setenv('INPUT_CONDITIONS_FILE', path)
+        monkeypatch.setenv('GITHUB_OUTPUT', github_output)
+        op = TernaryOperator()
+        with patch.object(op, 'evaluate_condition', side_effect=ValueError("mock error")):
+            op.evaluate_conditions_file()
+        with open(github_output) as f:
+            assert f.read() == 'output_1=d\n'
+
+    def test_index_rules_matches_streaming(self, clean_env, monkeypatch, tmp_path, github_output):
+        lines = [f'SERVICE == s{i % 40} && C{i % 7} == {i % 7}\tpass{i}\tfail{i}' for i in range(400)]
+        lines.append('{"condition": "TAG EMPTY", "true": "untagged", "false": "tagged"}')
+        monkeypatch.setenv('INPUT_CONDITIONS_FILE', self.write_rules(tmp_path, lines))
+        monkeypatch.setenv('GITHUB_OUTPUT', github_output)
+        monkeypatch.setenv('SERVICE', 's3')
+        monkeypatch.setenv('C3', '3')
+        assert TernaryOperator().run() == 0
+        with open(github_output) as f:
+            streamed = f.read()
+        open(github_output, 'w').close()
+        monkeypatch.setenv('INPUT_INDEX_RULES', 'true')
+        assert TernaryOperator().run() == 0
+        with open(github_output) as f:
+            indexed = f.read()
+        assert indexed == streamed
+        assert 'output_4=pass3\n' in indexed
+        assert 'output_401=untagged\n' in indexed
+
+    def test_index_rules_skips_rules(self, clean_env, monkeypatch, tmp_path, github_output):
+        lines = [f'SERVICE == s{i}\tpass{i}\tfail{i}' for i in range(50)]
+        monkeypatch.setenv('INPUT_CONDITIONS_FILE', self.write_rules(tmp_path, lines))
+        monkeypatch.setenv('INPUT_INDEX_RULES', 'true')
+        monkeypatch.setenv('GITHUB_OUTPUT', github_output)
+        monkeypatch.setenv('SERVICE', 's7')
+        op = TernaryOperator()
+        with patch.object(op, 'evaluate_condition', wraps=op.evaluate_condition) as evaluate:
+            op.evaluate_conditions_file()
+        assert [c.args[0] for c in evaluate.call_args_list] == ['SERVICE == s7']
+
+    def test_missing_file(self, clean_env, monkeypatch, tmp_path):
+        monkeypatch.setenv('INPUT_CONDITIONS_FILE', str(tmp_path / 'missing.jsonl'))
+        op = TernaryOperator()
+        with pytest.raises(SystemExit):
+            op.validate_inputs()
+
+    def test_conflicts_with_conditions(self, clean_env, monkeypatch, tmp_path):
+        monkeypatch.setenv('INPUT_CONDITIONS_FILE', self.write_rules(tmp_path, ['A == a\ty\tn']))
+        monkeypatch.setenv('INPUT_CONDITIONS', 'A == a')
+        op = TernaryOperator()
+        with pytest.raises(SystemExit):
+            op.validate_inputs()
+
+    def test_invalid_rule_fails_run(self, clean_env, monkeypatch, tmp_path):
+        monkeypatch.setenv('INPUT_CONDITIONS_FILE', self.write_rules(tmp_path, ['not a rule']))
+        op = TernaryOperator()
+        with pytest.raises(SystemExit):
+            op.run()
+
+
+class TestInjectedVariables:
+    def test_evaluates_against_mapping(self, clean_env, monkeypatch):
+        monkeypatch.setenv('SERVICE', 'batch')
+        op = TernaryOperator(variables={'SERVICE': 'game', 'ENV': 'prod'})
+        assert op.evaluate_condition('SERVICE == game && ENV IN qa,prod') is True
+        assert op.evaluate_condition('SERVICE NOT_EMPTY && MISSING EMPTY') is True
+
+    def test_lookups_without_context_use_mapping(self, clean_env, monkeypatch):
+        monkeypatch.setenv('SERVICE', 'batch')
+        monkeypatch.setenv('MISSING', 'from-env')
+        op = TernaryOperator(variables={'SERVICE': 'game'})
+        assert op.get_var_value('SERVICE') == 'game'
+        assert op.get_var_value('MISSING') == ''
+        assert op._parse_comparison('SERVICE == game') == ('game', '==', 'game')
+        assert op._parse_comparison('MISSING != x') == ('', '!=', 'x')
+
+    def test_variables_resolved_once_per_run(self, clean_env, monkeypatch, github_output):
+        class CountingMapping(dict):
+            lookups = []
+
+            def get(self, key, default=None):
+                self.lookups.append(key)
+                return super().get(key, default)
+
+        monkeypatch.setenv('INPUT_CONDITIONS', 'SERVICE == game, SERVICE IN game,api && ENV != qa, SERVICE NOT_EMPTY')
+        monkeypatch.setenv('INPUT_TRUE_VALUES', 'a,b,c')
+        monkeypatch.setenv('INPUT_FALSE_VALUES', 'x,y,z')
+        monkeypatch.setenv('GITHUB_OUTPUT', github_output)
+        variables = CountingMapping(SERVICE='game', ENV='prod')
+        op = TernaryOperator(variables=variables)
+        op.evaluate_conditions()
+        assert sorted(variables.lookups) == ['ENV', 'SERVICE']
+        with open(github_output) as f:
+            content = f.read()
+        assert 'output_1=a' in content
+        assert 'output_2=b' in content
+        assert 'output_3=c' in content
+
+
+class TestLibraryHelpers:
+    def test_for_library_ignores_environment(self, monkeypatch):
+        monkeypatch.setenv('INPUT_DEBUG_MODE', 'true')
+        monkeypatch.setenv('INPUT_CASE_SENSITIVE', 'true')
+        op = TernaryOperator.for_library(case_sensitive=False, reorder_operands=False)
+        assert (op.debug_mode, op.case_sensitive, op.reorder_operands) == (False, False, False)
+
+    def test_check_backend(self):
+        TernaryOperator.check_backend('codegen')
+        with pytest.raises(ValueError, match='tree, codegen'):
+            TernaryOperator.check_backend('jit')
+
+    def test_safe_results_maps_errors_to_false(self):
+        def evaluate(item):
+            if item == 'boom':
+                raise KeyError(item)
+            return item
+
+        assert TernaryOperator.safe_results(evaluate, ['x', '', 'boom', 1]) == [True, False, False, True]
+
+
+class TestReorderOperands:
+    def setup_method(self):
+        os.environ['INPUT_CONDITIONS'] = ''
+        os.environ['INPUT_TRUE_VALUES'] = ''
+        os.environ['INPUT_FALSE_VALUES'] = ''
+
+    def test_cheap_check_short_circuits_regex(self, monkeypatch, capsys):
+        monkeypatch.setenv('INPUT_DEBUG_MODE', 'true')
+        monkeypatch.setenv('MESSAGE', 'fix: login')
+        monkeypatch.setenv('ENV', 'qa')
+        op = TernaryOperator()
+        assert op.evaluate_condition('MESSAGE MATCHES ^fix && ENV == prod') is False
+        assert 'MATCHES operator result' not in capsys.readouterr().out
+
+    def test_opt_out_keeps_written_order(self, monkeypatch, capsys):
+        monkeypatch.setenv('INPUT_DEBUG_MODE', 'true')
+        monkeypatch.setenv('INPUT_REORDER_OPERANDS', 'false')
+        monkeypatch.setenv('MESSAGE', 'fix: login')
+        monkeypatch.setenv('ENV', 'qa')
+        op = TernaryOperator()
+        assert op.evaluate_condition('MESSAGE MATCHES ^fix && ENV == prod') is False
+        assert 'MATCHES operator result' in capsys.readouterr().out
+
+
+class TestSharedSubconditions:
+    def test_shared_subcondition_evaluated_once(self, clean_env, monkeypatch, github_output, capsys):
+        monkeypatch.setenv('INPUT_CONDITIONS', (
+            'ENVIRONMENT == prod && BRANCH STARTS_WITH release/, '
+            'ENVIRONMENT == prod && BRANCH STARTS_WITH release/ && SERVICE == game, '
+            'SERVICE == game || ENVIRONMENT == prod'
+        ))
+        monkeypatch.setenv('INPUT_TRUE_VALUES', 'a,b,c')
+        monkeypatch.setenv('INPUT_FALSE_VALUES', 'x,y,z')
+        monkeypatch.setenv('INPUT_DEBUG_MODE', 'true')
+        monkeypatch.setenv('INPUT_REORDER_OPERANDS', 'false')
+        monkeypatch.setenv('GITHUB_OUTPUT', github_output)
+        monkeypatch.setenv('ENVIRONMENT', 'prod')
+        monkeypatch.setenv('BRANCH', 'release/1.0')
+        monkeypatch.setenv('SERVICE', 'web')
+        op = TernaryOperator()
+        op.evaluate_conditions()
+        out = capsys.readouterr().out
+        assert 'Shared sub-conditions: 3' in out
+        assert out.count('STARTS_WITH operator result') == 1
+        assert out.count("Result: 'prod' == 'prod'") == 1
+        with open(github_output) as f:
+            content = f.read()
+        assert 'output_1=a' in content
+        assert 'output_2=y' in content
+        assert 'output_3=c' in content
+
+
+class TestLazyOperators:
+    def test_operator_evaluator_created_on_first_use(self, clean_env, monkeypatch):
+        monkeypatch.setenv('SERVICE', 'game')
+        op = TernaryOperator()
+        assert InNode not in op._node_handlers
+        assert op.evaluate_condition('SERVICE IN game,batch') is True
+        assert InNode in op._node_handlers
+
+    def test_evaluator_import_is_lean(self):
+        code = (
+            "import sys, src.evaluator; "
+            "print(','.join(m for m in ('dataclasses', 'uuid', 'src.operators', 'src.codegen', 'src.rules', "
+            "'src.keywords', 'src.version') if m in sys.modules))"
+        )
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        result = subprocess.run([sys.executable, '-c', code], cwd=root, capture_output=True, text=True, check=True)
+        assert result.stdout.strip() == ''
+
+
+class TestTimings:
+    def test_timings_output(self, clean_env, monkeypatch, github_output):
+        monkeypatch.setenv('INPUT_CONDITIONS', 'SERVICE == game && ENV IN qa,prod, SERVICE == api')
+        monkeypatch.setenv('INPUT_TRUE_VALUES', 'a,b')
+        monkeypatch.setenv('INPUT_FALSE_VALUES', 'x,y')
+        monkeypatch.setenv('INPUT_TIMINGS', 'true')
+        monkeypatch.setenv('INPUT_REORDER_OPERANDS', 'false')
+        monkeypatch.setenv('GITHUB_OUTPUT', github_output)
+        monkeypatch.setenv('SERVICE', 'game')
+        monkeypatch.setenv('ENV', 'prod')
+        op = TernaryOperator()
+        op.evaluate_conditions()
+        with open(github_output) as f:
+            lines = f.read().splitlines()
+        timings = json.loads(next(line for line in lines if line.startswith('timings='))[len('timings='):])
+        assert list(timings) == ['output_1', 'output_2']
+        first = timings['output_1']
+        assert first['condition'] == 'SERVICE == game && ENV IN qa,prod'
+        assert [n['node'] for n in first['nodes']] == ['SERVICE == game', 'ENV IN qa,prod', '&& (2 operands)']
+        assert all(n['calls'] == 1 and n['ns'] <= first['ns'] for n in first['nodes'])
+        assert 'output_1=a' in lines
+        assert op._timer is None
+
+    def test_disabled_by_default(self, default_env):
+        op = TernaryOperator()
+        op.evaluate_conditions()
+        with open(default_env) as f:
+            assert 'timings=' not in f.read()
+
+    def test_debug_table(self, default_env, monkeypatch, capsys):
+        monkeypatch.setenv('INPUT_TIMINGS', 'true')
+        monkeypatch.setenv('INPUT_DEBUG_MODE', 'true')
+        TernaryOperator().evaluate_conditions()
+        out = capsys.readouterr().out
+        assert 'condition / node' in out
+        assert 'SERVICE == game' in out
+
+
+class TestRulesetCache:
+    def configure(self, monkeypatch, github_output, cache_dir, backend='tree'):
+        monkeypatch.setenv('INPUT_CONDITIONS', 'SERVICE == game && ENV IN qa,prod, BRANCH MATCHES ^release/, TAG EMPTY')
+        monkeypatch.setenv('INPUT_TRUE_VALUES', 'a,b,c')
+        monkeypatch.setenv('INPUT_FALSE_VALUES', 'x,y,z')
+        monkeypatch.setenv('INPUT_BACKEND', backend)
+        monkeypatch.setenv('INPUT_CACHE_DIR', str(cache_dir))
+        monkeypatch.setenv('GITHUB_OUTPUT', github_output)
+        monkeypatch.setenv('SERVICE', 'game')
+        monkeypatch.setenv('ENV', 'prod')
+        monkeypatch.setenv('BRANCH', 'main')
+        monkeypatch.delenv('TAG', raising=False)
+
+    def run_outputs(self, github_output):
+        open(github_output, 'w').close()
+        assert TernaryOperator().run() == 0
+        with open(github_output) as f:
+            return f.read()
+
+    @pytest.mark.parametrize('backend', ['tree', 'codegen'])
+    def test_repeat_run_skips_parsing_and_compiling(self, clean_env, monkeypatch, github_output, tmp_path, backend):
+        self.configure(monkeypatch, github_output, tmp_path / 'cache', backend)
+        first = self.run_outputs(github_output)
+        assert len(os.listdir(tmp_path / 'cache')) == 1
+        with patch('src.evaluator.ConditionParser.parse') as parse, \
+                patch.object(TernaryOperator, 'compile_condition') as compile_condition:
+            second = self.run_outputs(github_output)
+        assert not parse.called and not compile_condition.called
+        assert second == first
+        assert 'output_1=a' in first and 'output_2=y' in first and 'output_3=c' in first
+
+    def test_changed_inputs_miss(self, clean_env, monkeypatch, github_output, tmp_path):
+        self.configure(monkeypatch, github_output, tmp_path / 'cache')
+        self.run_outputs(github_output)
+        monkeypatch.setenv('INPUT_TRUE_VALUES', 'A,B,C')
+        assert 'output_1=A' in self.run_outputs(github_output)
+        assert len(os.listdir(tmp_path / 'cache')) == 2
+
+    def test_corrupt_entry_is_rebuilt(self, clean_env, monkeypatch, github_output, tmp_path):
+        self.configure(monkeypatch, github_output, tmp_path / 'cache')
+        first = self.run_outputs(github_output)
+        for name in os.listdir(tmp_path / 'cache'):
+            (tmp_path / 'cache' / name).write_bytes(b'garbage')
+        assert self.run_outputs(github_output) == first
+
+    def test_unwritable_cache_dir(self, clean_env, monkeypatch, github_output, tmp_path):
+        blocker = tmp_path / 'file'
+        blocker.write_text('')
+        self.configure(monkeypatch, github_output, blocker / 'cache')
+        assert 'output_1=a' in self.run_outputs(github_output)
+
+    def test_inputs_parsed_once_per_run(self, default_env):
+        op = TernaryOperator()
+        with patch('src.evaluator.ConditionParser.parse', wraps=ConditionParser.parse) as parse:
+            op.validate_inputs()
+            op.evaluate_conditions()
+        assert parse.call_count == 1
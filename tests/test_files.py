@@ -0,0 +1,118 @@
+"""Tests for src/files.py and the FILE_CONTAINS / FILE_MATCHES operators"""
+
+import pytest
+from src import files
+from src.codegen import CodeGenerator
+from src.compiler import ConditionCompiler, FileSearchNode, InvalidNode
+from src.context import EvaluationContext
+from src.evaluator import TernaryOperator
+from src.files import file_nodes, prefetch_searches, search_file
+
+
+@pytest.fixture
+def build_log(tmp_path):
+    path = tmp_path / 'build.log'
+    path.write_bytes(b'step 1 ok\n' * 10000 + b'BUILD SUCCESSFUL in 42s\nversion: 2.3.1\n')
+    return str(path)
+
+
+class TestFileSearchNode:
+    def test_variable_path(self):
+        node = ConditionCompiler.compile('BUILD_LOG FILE_CONTAINS BUILD SUCCESSFUL')
+        assert isinstance(node, FileSearchNode)
+        assert node.path.is_variable and node.needle == b'BUILD SUCCESSFUL' and node.regex is None
+
+    def test_literal_path(self):
+        node = ConditionCompiler.compile('dist/app.log FILE_MATCHES ^version: 2\\.')
+        assert not node.path.is_variable and node.regex is not None
+
+    def test_invalid_regex(self):
+        assert isinstance(ConditionCompiler.compile('LOG FILE_MATCHES [oops'), InvalidNode)
+
+
+class TestSearchFile:
+    def test_contains(self, build_log):
+        assert search_file(build_log, ConditionCompiler.compile('LOG FILE_CONTAINS SUCCESSFUL in')) is True
+        assert search_file(build_log, ConditionCompiler.compile('LOG FILE_CONTAINS FAILED')) is False
+
+    def test_matches_is_multiline(self, build_log):
+        assert search_file(build_log, ConditionCompiler.compile('LOG FILE_MATCHES ^version: 2\\.\\d+')) is True
+
+    def test_case_insensitive(self, build_log):
+        node = ConditionCompiler.compile('LOG FILE_CONTAINS build successful', case_sensitive=False)
+        assert search_file(build_log, node) is True
+
+    def test_empty_file(self, tmp_path):
+        path = tmp_path / 'empty.log'
+        path.write_bytes(b'')
+        assert search_file(str(path), ConditionCompiler.compile('LOG FILE_CONTAINS x')) is False
+
+    def test_missing_file_raises(self, tmp_path):
+        with pytest.raises(OSError):
+            search_file(str(tmp_path / 'missing'), ConditionCompiler.compile('LOG FILE_CONTAINS x'))
+
+
+class TestEvaluation:
+    @pytest.mark.parametrize('condition,expected', [
+        ('BUILD_LOG FILE_CONTAINS BUILD SUCCESSFUL', True),
+        ('BUILD_LOG FILE_CONTAINS ERROR', False),
+        ('BUILD_LOG FILE_MATCHES in \\d+s$', True),
+        ('MISSING_LOG FILE_CONTAINS ok', False),
+        ('NOT (BUILD_LOG FILE_CONTAINS ERROR) && BUILD_LOG FILE_CONTAINS step 1', True),
+    ])
+    def test_backends_agree(self, build_log, condition, expected):
+        variables = {'BUILD_LOG': build_log, 'MISSING_LOG': build_log + '.missing'}
+        assert TernaryOperator(variables).evaluate_condition(condition) is expected
+        assert CodeGenerator.compile(condition)(EvaluationContext(variables).get) is expected
+
+    def test_prefetch_stores_results(self, build_log):
+        nodes = [ConditionCompiler.compile(c) for c in (
+            'LOG FILE_CONTAINS SUCCESSFUL || LOG FILE_CONTAINS ERROR', 'LOG FILE_CONTAINS SUCCESSFUL', 'NOPE FILE_CONTAINS x',
+        )]
+        searches = file_nodes(nodes)
+        assert len(searches) == 3
+        context = EvaluationContext({'LOG': build_log, 'NOPE': ''})
+        prefetch_searches(searches, context)
+        assert [context.files[id(node)] for node in searches[:2]] == [True, False]
+        assert isinstance(context.files[id(searches[2])], OSError)
+
+    def test_run_prefetches_concurrently(self, clean_env, monkeypatch, github_output, build_log, capsys):
+        monkeypatch.setenv('INPUT_CONDITIONS', 'BUILD_LOG FILE_CONTAINS SUCCESSFUL, BUILD_LOG FILE_MATCHES ERROR')
+        monkeypatch.setenv('INPUT_TRUE_VALUES', 'ok,bad')
+        monkeypatch.setenv('INPUT_FALSE_VALUES', 'fail,good')
+        monkeypatch.setenv('INPUT_DEBUG_MODE', 'true')
+        monkeypatch.setenv('GITHUB_OUTPUT', github_output)
+        monkeypatch.setenv('BUILD_LOG', build_log)
+        TernaryOperator().evaluate_conditions()
+        assert 'Running 2 file searches concurrently' in capsys.readouterr().out
+        with open(github_output) as f:
+            content = f.read()
+        assert 'output_1=ok' in content
+        assert 'output_2=good' in content
+
+    @pytest.mark.parametrize('backend', ['tree', 'codegen'])
+    @pytest.mark.parametrize('cached', [False, True])
+    def test_each_file_searched_once(self, clean_env, monkeypatch, github_output, build_log, tmp_path,
+                                     backend, cached):
+        searched = []
+
+        def counting_search(path, node):
+            searched.append(path)
+            return search_file(path, node)
+
+        monkeypatch.setattr(files, 'search_file', counting_search)
+        monkeypatch.setenv('INPUT_CONDITIONS', 'BUILD_LOG FILE_CONTAINS SUCCESSFUL, OTHER_LOG FILE_CONTAINS ok')
+        monkeypatch.setenv('INPUT_TRUE_VALUES', 'ok,ok')
+        monkeypatch.setenv('INPUT_FALSE_VALUES', 'fail,fail')
+        monkeypatch.setenv('INPUT_BACKEND', backend)
+        monkeypatch.setenv('GITHUB_OUTPUT', github_output)
+        if cached:
+            monkeypatch.setenv('INPUT_CACHE_DIR', str(tmp_path / 'cache'))
+        monkeypatch.setenv('BUILD_LOG', build_log)
+        monkeypatch.setenv('OTHER_LOG', build_log + '.missing')
+        TernaryOperator().evaluate_conditions()
+        assert sorted(searched) == [build_log, build_log + '.missing']
+        with open(github_output) as f:
+            content = f.read()
+        assert 'output_1=ok' in content
+        assert 'output_2=fail' in content
@@ -0,0 +1,142 @@
+"""Tests for src/keywords.py"""
+
+import pickle
+import random
+import re
+
+import pytest
+from src.keywords import AhoCorasick, PatternSet, PrefixTrie, split_patterns
+
+
+class TestAhoCorasick:
+    def test_search(self):
+        automaton = AhoCorasick(['wip', 'do not merge', 'fixup!'])
+        assert automaton.search('feat: wip login') is True
+        assert automaton.search('please do not merge yet') is True
+        assert automaton.search('feat: login') is False
+        assert automaton.search('') is False
+
+    def test_overlapping_keywords(self):
+        automaton = AhoCorasick(['he', 'she', 'hers', 'his'])
+        assert automaton.search('ushers') is True
+        assert automaton.search('hi s') is False
+
+    def test_matches_naive_search(self):
+        rng = random.Random(7)
+        for _ in range(500):
+            keywords = [''.join(rng.choice('ab') for _ in range(rng.randint(1, 4))) for _ in range(rng.randint(1, 5))]
+            text = ''.join(rng.choice('abc') for _ in range(rng.randint(0, 12)))
+            assert AhoCorasick(keywords).search(text) is any(k in text for k in keywords)
+
+    def test_many_keywords(self):
+        automaton = AhoCorasick(f"banned{i}" for i in range(2000))
+        assert automaton.search('a message mentioning banned1999 somewhere') is True
+        assert automaton.search('a message mentioning banned somewhere') is False
+
+    def test_no_keywords(self):
+        assert AhoCorasick([]).search('anything') is False
+
+    def test_equality_and_pickle(self):
+        automaton = AhoCorasick(['b', 'a', 'a'])
+        assert automaton == AhoCorasick(['a', 'b'])
+        assert hash(automaton) == hash(AhoCorasick(['a', 'b']))
+        assert pickle.loads(pickle.dumps(automaton)).search('xbx') is True
+
+
+class TestPrefixTrie:
+    def test_prefixes(self):
+        trie = PrefixTrie(['release/', 'hotfix/'])
+        assert trie.match('release/1.2') is True
+        assert trie.match('hotfix/login') is True
+        assert trie.match('feature/release/') is False
+        assert trie.match('rel') is False
+
+    def test_suffixes(self):
+        trie = PrefixTrie(['.yml', '.yaml'], reverse=True)
+        assert trie.match('ci.yml') is True
+        assert trie.match('ci.yaml') is True
+        assert trie.match('ci.yml.bak') is False
+
+    def test_matches_naive_check(self):
+        rng = random.Random(11)
+        for _ in range(500):
+            keywords = [''.join(rng.choice('ab') for _ in range(rng.randint(1, 4))) for _ in range(rng.randint(1, 5))]
+            text = ''.join(rng.choice('ab') for _ in range(rng.randint(0, 6)))
+            assert PrefixTrie(keywords).match(text) is any(text.startswith(k) for k in keywords)
+            assert PrefixTrie(keywords, reverse=True).match(text) is any(text.endswith(k) for k in keywords)
+
+    def test_no_keywords(self):
+        assert PrefixTrie([]).match('anything') is False
+
+    def test_equality_and_pickle(self):
+        trie = PrefixTrie(['b', 'a'], reverse=True)
+        assert trie == PrefixTrie(['a', 'b'], reverse=True)
+        assert trie != PrefixTrie(['a', 'b'])
+        assert pickle.loads(pickle.dumps(trie)).match('xb') is True
+
+
+class TestSplitPatterns:
+    def test_split(self):
+        assert split_patterns('^v[0-9]+$, ^main$') == ['^v[0-9]+$', '^main$']
+
+    def test_commas_inside_pattern(self):
+        assert split_patterns(r'^[0-9]{1,3}$,(a,b),[,;],a\,b') == [r'^[0-9]{1,3}$', '(a,b)', '[,;]', r'a\,b']
+
+
+class TestPatternSet:
+    def test_search_and_which(self):
+        patterns = PatternSet(['^v[0-9]+$', '^release/(a|b)'])
+        assert patterns.search('release/a') is True
+        assert patterns.which('release/a') == '^release/(a|b)'
+        assert patterns.which('v12') == '^v[0-9]+$'
+        assert patterns.which('main') is None
+
+    def test_single_pass(self):
+        patterns = PatternSet([f"^svc{i}-[0-9]+$" for i in range(200)])
+        assert len(patterns.unions) == 1 and patterns.fallback == ()
+        assert patterns.which('svc199-7') == '^svc199-[0-9]+$'
+
+    def test_backreference_falls_back(self):
+        patterns = PatternSet(['^main$', r'(ab)\1', '(?i)^dev$', '^v[0-9]+$'])
+        assert [i for i, _ in patterns.fallback] == [1, 2]
+        assert patterns.which('xabab') == r'(ab)\1'
+        assert patterns.which('DEV') == '(?i)^dev$'
+        assert patterns.search('ab') is False
+
+    def test_duplicate_group_names_fall_back(self):
+        patterns = PatternSet(['(?P<n>a)', '(?P<n>b)'])
+        assert patterns.unions == []
+        assert patterns.which('b') == '(?P<n>b)'
+
+    def test_anchored_and_unanchored_unions(self):
+        patterns = PatternSet(['^main$', '^dev$', 'rc[0-9]', '^a|b', 'fix'])
+        assert [method for _, method, _ in patterns.unions] == ['match', 'search']
+        assert patterns.which('dev') == '^dev$'
+        assert patterns.which('v1-rc2') == 'rc[0-9]'
+        assert patterns.which('xb') == '^a|b'
+        assert patterns.search('xmain') is False
+
+    def test_matches_per_pattern_search(self):
+        rng = random.Random(3)
+        pieces = ['^a', 'b$', 'a|^b', '(a)\\1', '^(ab)+', 'b{2}', '[ab]c', '(?i)A']
+        for _ in range(500):
+            chosen = rng.sample(pieces, rng.randint(1, 5))
+            text = ''.join(rng.choice('abcA') for _ in range(rng.randint(0, 6)))
+            patterns = PatternSet(chosen)
+            assert patterns.search(text) is any(re.search(p, text) for p in chosen)
+            matched = patterns.which(text)
+            assert matched is None or re.search(matched, text)
+
+    def test_flags(self):
+        assert PatternSet(['^main$']).search('MAIN') is False
+        assert PatternSet(['^main$'], re.IGNORECASE).search('MAIN') is True
+
+    def test_invalid_pattern(self):
+        with pytest.raises(re.error):
+            PatternSet(['ok', '(unclosed'])
+
+    def test_equality_and_pickle(self):
+        patterns = PatternSet(['a', r'(b)\1'])
+        assert patterns == PatternSet(['a', r'(b)\1'])
+        assert patterns != PatternSet(['a', r'(b)\1'], re.IGNORECASE)
+        assert pickle.loads(pickle.dumps(patterns)).which('xbb') == r'(b)\1'
@@ -0,0 +1,27 @@
+"""Tests for src/log.py"""
+
+from src.log import DEBUG, INFO, Logger, get_logger
+
+
+class Unformattable:
+    def __str__(self):
+        raise AssertionError('formatted while disabled')
+
+
+class TestLogger:
+    def test_debug_disabled_does_not_format(self, capsys):
+        get_logger(False).debug("value: %s", Unformattable())
+        assert capsys.readouterr().out == ''
+
+    def test_debug_enabled_formats_args(self, capsys):
+        get_logger(True).debug("Comparison: '%s' %s '%s'", 'game', '==', 'game')
+        assert "• Debug: Comparison: 'game' == 'game'" in capsys.readouterr().out
+
+    def test_message_without_args_is_not_formatted(self, capsys):
+        get_logger(True).debug("100% literal")
+        assert '100% literal' in capsys.readouterr().out
+
+    def test_levels(self):
+        assert get_logger(True).level == DEBUG and get_logger(True).debug_enabled
+        assert get_logger(False).level == INFO and not get_logger(False).debug_enabled
+        assert not Logger(INFO).debug_enabled
@@ -1,12 +1,16 @@
 """Tests for src/operators.py"""
 
 import os
+import subprocess
+import sys
 from unittest.mock import patch
 import pytest
 from src.operators import (
     InOperatorEvaluator, ContainsOperatorEvaluator, StartsEndsWithOperatorEvaluator,
-    MatchesOperatorEvaluator, EmptyOperatorEvaluator,
+    MatchesOperatorEvaluator, EmptyOperatorEvaluator, SemverOperatorEvaluator, ContainsAnyOperatorEvaluator,
+    StartsEndsWithAnyOperatorEvaluator, MatchesAnyOperatorEvaluator,
 )
+from src.context import EvaluationContext
 
 
 class TestInOperatorEvaluator:
@@ -239,3 +243,147 @@ class TestOperatorExceptBlocks:
         monkeypatch.setenv('VAR', 'test')
         with patch.object(evaluator, 'get_var_value', side_effect=AttributeError("mock")):
             assert evaluator.evaluate('VAR EMPTY') is False
+
+
+class TestInOperatorLargeList:
+    def test_large_allow_list(self, monkeypatch):
+        evaluator = InOperatorEvaluator(debug_mode=False, case_sensitive=False)
+        values = ','.join(f'Service-{i}' for i in range(5000))
+        monkeypatch.setenv('SERVICE', 'service-4999')
+        assert evaluator.evaluate(f'SERVICE IN {values}') is True
+        monkeypatch.setenv('SERVICE', 'service-5000')
+        assert evaluator.evaluate(f'SERVICE IN {values}') is False
+
+
+class TestSemverOperatorEvaluator:
+    def setup_method(self):
+        self.evaluator = SemverOperatorEvaluator(debug_mode=False)
+
+    @pytest.mark.parametrize('condition,expected', [
+        ('VERSION SEMVER_GT 1.9', True),
+        ('VERSION SEMVER_GTE 1.10', True),
+        ('VERSION SEMVER_EQ 1.10', True),
+        ('VERSION SEMVER_NE v1.10.0', False),
+        ('VERSION SEMVER_LT 1.10.1-rc.1', True),
+        ('VERSION SEMVER_LTE 1.9.9', False),
+    ])
+    def test_literal_versions(self, monkeypatch, condition, expected):
+        monkeypatch.setenv('VERSION', '1.10.0')
+        assert self.evaluator.evaluate(condition) is expected
+
+    def test_variable_operand(self, monkeypatch):
+        monkeypatch.setenv('VERSION', '2.0.0-rc.2')
+        monkeypatch.setenv('MIN_VERSION', '2.0.0-rc.10')
+        assert self.evaluator.evaluate('VERSION SEMVER_LT MIN_VERSION') is True
+
+    def test_not_a_version(self, monkeypatch):
+        monkeypatch.setenv('VERSION', 'latest')
+        assert self.evaluator.evaluate('VERSION SEMVER_NE 1.0') is False
+
+    def test_invalid_literal(self, monkeypatch):
+        monkeypatch.setenv('VERSION', '1.0')
+        assert self.evaluator.evaluate('VERSION SEMVER_GT latest') is False
+
+    def test_variable_parsed_once_per_context(self):
+        context = EvaluationContext({'VERSION': '1.2.3'})
+        node = SemverOperatorEvaluator.node_type.parse('VERSION SEMVER_GT 1.2')
+        assert self.evaluator.evaluate_node(node, context) is True
+        context.variables['VERSION'] = '1.0'
+        assert self.evaluator.evaluate_node(node, context) is True
+        assert context.versions == {'VERSION': ((1, 2, 3), (1,))}
+
+    def test_debug_mode(self, monkeypatch, capsys):
+        monkeypatch.setenv('VERSION', 'latest')
+        SemverOperatorEvaluator(debug_mode=True).evaluate('VERSION SEMVER_GT 1.0')
+        assert "is not a version" in capsys.readouterr().out
+
+
+class TestLazyImports:
+    def test_plain_operators_do_not_load_version_parser(self):
+        code = (
+            "import sys, src.operators as o; "
+            "o.InOperatorEvaluator().evaluate('A IN a,b'); o.ContainsOperatorEvaluator().evaluate('A CONTAINS a'); "
+            "print(','.join(m for m in ('src.version', 'src.keywords', 'src.files') if m in sys.modules))"
+        )
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        result = subprocess.run([sys.executable, '-c', code], cwd=root, capture_output=True, text=True, check=True)
+        assert result.stdout.strip() == ''
+
+
+class TestContainsAnyOperatorEvaluator:
+    def setup_method(self):
+        self.evaluator = ContainsAnyOperatorEvaluator(debug_mode=False)
+
+    def test_any_keyword(self, monkeypatch):
+        monkeypatch.setenv('COMMIT_MSG', 'feat: login (do not merge)')
+        assert self.evaluator.evaluate('COMMIT_MSG CONTAINS_ANY wip,do not merge,fixup!') is True
+
+    def test_no_keyword(self, monkeypatch):
+        monkeypatch.setenv('COMMIT_MSG', 'feat: login')
+        assert self.evaluator.evaluate('COMMIT_MSG CONTAINS_ANY wip,do not merge,fixup!') is False
+
+    def test_case_insensitive(self, monkeypatch):
+        monkeypatch.setenv('COMMIT_MSG', 'WIP: login')
+        assert self.evaluator.evaluate('COMMIT_MSG CONTAINS_ANY wip') is False
+        evaluator = ContainsAnyOperatorEvaluator(debug_mode=False, case_sensitive=False)
+        assert evaluator.evaluate('COMMIT_MSG CONTAINS_ANY wip') is True
+
+    def test_unset_variable(self, monkeypatch):
+        monkeypatch.delenv('UNDEFINED_VAR', raising=False)
+        assert self.evaluator.evaluate('UNDEFINED_VAR CONTAINS_ANY a,b') is False
+
+    def test_invalid_syntax(self):
+        assert self.evaluator.evaluate('COMMIT_MSG CONTAINS_ANY ,') is False
+
+
+class TestStartsEndsWithAnyOperatorEvaluator:
+    def setup_method(self):
+        self.evaluator = StartsEndsWithAnyOperatorEvaluator(debug_mode=False)
+
+    def test_starts_with_any(self, monkeypatch):
+        monkeypatch.setenv('BRANCH', 'hotfix/login')
+        assert self.evaluator.evaluate('BRANCH STARTS_WITH_ANY release/,hotfix/') is True
+        assert self.evaluator.evaluate('BRANCH STARTS_WITH_ANY release/,feature/') is False
+
+    def test_ends_with_any(self, monkeypatch):
+        monkeypatch.setenv('FILE', 'deploy/values.yaml')
+        assert self.evaluator.evaluate('FILE ENDS_WITH_ANY .yml,.yaml') is True
+        assert self.evaluator.evaluate('FILE ENDS_WITH_ANY .json,.toml') is False
+
+    def test_case_insensitive(self, monkeypatch):
+        monkeypatch.setenv('BRANCH', 'Release/1.0')
+        assert self.evaluator.evaluate('BRANCH STARTS_WITH_ANY release/') is False
+        evaluator = StartsEndsWithAnyOperatorEvaluator(debug_mode=False, case_sensitive=False)
+        assert evaluator.evaluate('BRANCH STARTS_WITH_ANY release/') is True
+
+    def test_unset_variable(self, monkeypatch):
+        monkeypatch.delenv('UNDEFINED_VAR', raising=False)
+        assert self.evaluator.evaluate('UNDEFINED_VAR ENDS_WITH_ANY a,b') is False
+
+    def test_invalid_syntax(self):
+        assert self.evaluator.evaluate('BRANCH STARTS_WITH_ANY ,') is False
+
+
+class TestMatchesAnyOperatorEvaluator:
+    def setup_method(self):
+        self.evaluator = MatchesAnyOperatorEvaluator(debug_mode=False)
+
+    def test_any_pattern(self, monkeypatch):
+        monkeypatch.setenv('TAG', 'release-12')
+        assert self.evaluator.evaluate('TAG MATCHES_ANY ^v[0-9]+$,^release-[0-9]{1,3}$') is True
+        assert self.evaluator.evaluate('TAG MATCHES_ANY ^v[0-9]+$,^hotfix-') is False
+
+    def test_case_insensitive(self, monkeypatch):
+        monkeypatch.setenv('TAG', 'V1')
+        assert self.evaluator.evaluate('TAG MATCHES_ANY ^v[0-9]+$') is False
+        evaluator = MatchesAnyOperatorEvaluator(debug_mode=False, case_sensitive=False)
+        assert evaluator.evaluate('TAG MATCHES_ANY ^v[0-9]+$') is True
+
+    def test_invalid_pattern(self, monkeypatch):
+        monkeypatch.setenv('TAG', 'v1')
+        assert self.evaluator.evaluate('TAG MATCHES_ANY ^v,[invalid') is False
+
+    def test_debug_reports_matching_pattern(self, monkeypatch, capsys):
+        monkeypatch.setenv('TAG', 'v1')
+        MatchesAnyOperatorEvaluator(debug_mode=True).evaluate('TAG MATCHES_ANY ^main$,^v[0-9]+$')
+        assert "(pattern: ^v[0-9]+$)" in capsys.readouterr().out
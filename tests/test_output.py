@@ -0,0 +1,57 @@
+"""Tests for src/output.py"""
+
+from unittest.mock import patch
+import pytest
+from src.output import OutputSink, format_output
+
+
+class TestFormatOutput:
+    def test_single_line(self):
+        assert format_output('key', 'value') == 'key=value\n'
+
+    def test_multiline_uses_heredoc(self):
+        entry = format_output('key', 'line1\nline2')
+        header, body1, body2, footer = entry.splitlines()
+        assert header.startswith('key<<ghadelimiter_')
+        assert (body1, body2) == ('line1', 'line2')
+        assert footer == header[len('key<<'):]
+
+
+class TestOutputSink:
+    def test_buffers_until_flush(self, github_output):
+        sink = OutputSink(github_output)
+        sink.add('a', '1')
+        sink.add('b', '2')
+        with open(github_output) as f:
+            assert f.read() == ''
+        sink.flush()
+        with open(github_output) as f:
+            assert f.read() == 'a=1\nb=2\n'
+
+    def test_single_write_per_flush(self, github_output):
+        sink = OutputSink(github_output)
+        with patch('src.output.open', create=True, side_effect=open) as mock_open:
+            for i in range(50):
+                sink.add(f'output_{i}', str(i))
+            sink.flush()
+        assert mock_open.call_count == 1
+
+    def test_auto_flush_when_buffer_full(self, github_output):
+        sink = OutputSink(github_output, max_buffer=8)
+        sink.add('key', 'value')
+        with open(github_output) as f:
+            assert f.read() == 'key=value\n'
+
+    def test_no_path_is_noop(self):
+        sink = OutputSink('')
+        sink.add('key', 'value')
+        sink.flush()
+
+    def test_flush_error_keeps_buffer(self, tmp_path):
+        sink = OutputSink(str(tmp_path / 'missing' / 'output'))
+        sink.add('key', 'value')
+        with pytest.raises(IOError):
+            sink.flush()
+        sink.path = str(tmp_path / 'output')
+        sink.flush()
+        assert (tmp_path / 'output').read_text() == 'key=value\n'
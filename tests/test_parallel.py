@@ -0,0 +1,65 @@
+"""Tests for src/parallel.py"""
+
+import pytest
+from src.evaluator import TernaryOperator
+from src.parallel import ParallelBatchRunner, _Worker
+
+CONDITIONS = [
+    'SERVICE IN game,batch && ENV == prod',
+    'VERSION SEMVER_GTE 1.10 || TAG NOT_EMPTY',
+    'NOT (SERVICE IN game,batch && ENV == prod) && BRANCH MATCHES ^release/',
+]
+
+
+def contexts(count):
+    for i in range(count):
+        yield {
+            'SERVICE': ('game', 'web', 'batch')[i % 3],
+            'ENV': ('prod', 'qa')[i % 2],
+            'VERSION': f"1.{i % 13}",
+            'TAG': 'v1' if i % 7 == 0 else '',
+            'BRANCH': 'release/1' if i % 5 == 0 else 'main',
+        }
+
+
+def expected(rows):
+    return [[TernaryOperator(row).evaluate_condition(condition) for condition in CONDITIONS] for row in rows]
+
+
+class TestWorker:
+    @pytest.mark.parametrize('backend', ['tree', 'codegen'])
+    def test_matches_evaluator(self, backend):
+        runner = ParallelBatchRunner(CONDITIONS, backend=backend)
+        worker = _Worker(runner.nodes, True, backend)
+        rows = list(contexts(30))
+        assert [worker.evaluate(row) for row in rows] == expected(rows)
+
+    def test_ignores_debug_environment(self, monkeypatch, capsys):
+        monkeypatch.setenv('INPUT_DEBUG_MODE', 'true')
+        runner = ParallelBatchRunner(CONDITIONS, backend='tree')
+        _Worker(runner.nodes, True, 'tree').evaluate(next(contexts(1)))
+        assert capsys.readouterr().out == ''
+
+
+class TestParallelBatchRunner:
+    def test_results_in_input_order(self):
+        runner = ParallelBatchRunner(CONDITIONS, workers=2, chunk_size=7, max_in_flight=3)
+        assert runner.evaluate_all(contexts(100)) == expected(contexts(100))
+
+    def test_stats_per_worker(self):
+        runner = ParallelBatchRunner(CONDITIONS, workers=2, chunk_size=10)
+        list(runner.run(contexts(95)))
+        assert sum(entry['contexts'] for entry in runner.stats.values()) == 95
+        assert sum(entry['chunks'] for entry in runner.stats.values()) == 10
+        assert len(runner.report()) == len(runner.stats) + 1
+
+    def test_empty_input(self):
+        runner = ParallelBatchRunner(CONDITIONS, workers=1)
+        assert runner.evaluate_all([]) == []
+        assert runner.stats == {}
+
+    def test_invalid_settings(self):
+        with pytest.raises(ValueError, match='chunk_size'):
+            ParallelBatchRunner(CONDITIONS, chunk_size=0)
+        with pytest.raises(ValueError, match='backend'):
+            ParallelBatchRunner(CONDITIONS, backend='jit')
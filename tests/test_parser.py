@@ -69,3 +69,38 @@ class TestConditionParser:
     def test_nested_parentheses(self):
         result = ConditionParser.parse('NOT (A == B && (C == D)), E == F')
         assert result == ['NOT (A == B && (C == D))', 'E == F']
+
+    def test_in_values_end_before_string_operators(self):
+        result = ConditionParser.parse('SERVICE IN game,batch, BRANCH STARTS_WITH release/')
+        assert result == ['SERVICE IN game,batch', 'BRANCH STARTS_WITH release/']
+
+    def test_lowercase_in_operator(self):
+        result = ConditionParser.parse('SERVICE in game,batch, ENV == qa')
+        assert result == ['SERVICE in game,batch', 'ENV == qa']
+
+    def test_split_ranges(self):
+        text = 'A == a, B IN x,y'
+        assert [text[s:e] for s, e in ConditionParser.split_ranges(text)] == ['A == a', ' B IN x,y']
+
+    def test_large_input(self):
+        values = ','.join(f'svc{i}' for i in range(50000))
+        text = f'SERVICE IN {values}, ' + ', '.join(f'C{i} == {i}' for i in range(5000))
+        result = ConditionParser.parse(text)
+        assert len(result) == 5001
+        assert result[0] == f'SERVICE IN {values}'
+
+    def test_in_values_end_before_semver_and_file_operators(self):
+        result = ConditionParser.parse('SERVICE IN game,batch, VERSION SEMVER_GTE 1.2, LOG FILE_CONTAINS ok')
+        assert result == ['SERVICE IN game,batch', 'VERSION SEMVER_GTE 1.2', 'LOG FILE_CONTAINS ok']
+
+    def test_contains_any_keywords(self):
+        result = ConditionParser.parse('MSG CONTAINS_ANY wip,work in progress,do not merge, ENV IN qa,prod')
+        assert result == ['MSG CONTAINS_ANY wip,work in progress,do not merge', 'ENV IN qa,prod']
+
+    def test_starts_and_ends_with_any_values(self):
+        result = ConditionParser.parse('BRANCH STARTS_WITH_ANY release/,hotfix/, FILE ENDS_WITH_ANY .yml,.yaml')
+        assert result == ['BRANCH STARTS_WITH_ANY release/,hotfix/', 'FILE ENDS_WITH_ANY .yml,.yaml']
+
+    def test_matches_any_patterns(self):
+        result = ConditionParser.parse('TAG MATCHES_ANY ^v[0-9]{1,3}$,^(main|dev)$, ENV IN qa,prod')
+        assert result == ['TAG MATCHES_ANY ^v[0-9]{1,3}$,^(main|dev)$', 'ENV IN qa,prod']
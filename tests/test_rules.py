@@ -0,0 +1,59 @@
+"""Tests for src/rules.py"""
+
+import pytest
+from src.rules import Rule, iter_rules
+
+
+def write_rules(tmp_path, text):
+    path = tmp_path / "rules.txt"
+    path.write_text(text)
+    return str(path)
+
+
+class TestIterRules:
+    def test_json_lines(self, tmp_path):
+        path = write_rules(tmp_path, '{"condition": "A == a", "true": "y", "false": "n", "default": "d"}\n')
+        assert list(iter_rules(path)) == [Rule('A == a', 'y', 'n', 'd')]
+
+    def test_tab_separated(self, tmp_path):
+        path = write_rules(tmp_path, 'SERVICE IN game,batch\tdeploy\tskip\n')
+        assert list(iter_rules(path)) == [Rule('SERVICE IN game,batch', 'deploy', 'skip')]
+
+    def test_tab_separated_with_default(self, tmp_path):
+        path = write_rules(tmp_path, 'A == a\ty\tn\tfallback\n')
+        assert list(iter_rules(path)) == [Rule('A == a', 'y', 'n', 'fallback')]
+
+    def test_skips_blank_and_comment_lines(self, tmp_path):
+        path = write_rules(tmp_path, '# rules\n\nA == a\ty\tn\n')
+        assert len(list(iter_rules(path))) == 1
+
+    def test_mixed_formats(self, tmp_path):
+        path = write_rules(tmp_path, 'A == a\ty\tn\n{"condition": "B == b", "true": 1, "false": 0}\n')
+        assert list(iter_rules(path))[1] == Rule('B == b', '1', '0')
+
+    def test_missing_json_keys(self, tmp_path):
+        path = write_rules(tmp_path, '{"condition": "A == a"}\n')
+        with pytest.raises(ValueError, match=r'rules.txt:1: missing keys: true, false'):
+            list(iter_rules(path))
+
+    def test_invalid_json(self, tmp_path):
+        path = write_rules(tmp_path, '{"condition": \n')
+        with pytest.raises(ValueError, match='invalid JSON rule'):
+            list(iter_rules(path))
+
+    def test_wrong_field_count(self, tmp_path):
+        path = write_rules(tmp_path, 'A == a\n')
+        with pytest.raises(ValueError, match='expected 3 or 4 tab-separated fields'):
+            list(iter_rules(path))
+
+    def test_empty_condition(self, tmp_path):
+        path = write_rules(tmp_path, '\ty\tn\n')
+        with pytest.raises(ValueError, match='empty condition'):
+            list(iter_rules(path))
+
+    def test_is_lazy(self, tmp_path):
+        path = write_rules(tmp_path, 'A == a\ty\tn\nbroken line\n')
+        rules = iter_rules(path)
+        assert next(rules) == Rule('A == a', 'y', 'n')
+        with pytest.raises(ValueError):
+            next(rules)
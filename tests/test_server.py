@@ -0,0 +1,160 @@
+"""Tests for src/server.py"""
+
+import asyncio
+import contextlib
+import json
+import os
+import socket
+import threading
+import pytest
+from src.server import EvaluationServer, default_socket_path, send_request
+
+REQUEST = {
+    'conditions': 'SERVICE == game, ENV IN qa,prod && NOT (BRANCH STARTS_WITH feat/)',
+    'true_values': 'deploy, test',
+    'false_values': 'skip, skip',
+    'variables': {'SERVICE': 'game', 'ENV': 'qa', 'BRANCH': 'main'},
+}
+
+
+@contextlib.contextmanager
+def running_server(path):
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+
+    async def run():
+        started = asyncio.Event()
+        task = asyncio.ensure_future(EvaluationServer(path).serve(started))
+        await started.wait()
+        ready.set()
+        await task
+
+    thread = threading.Thread(target=loop.run_until_complete, args=(run(),), daemon=True)
+    thread.start()
+    assert ready.wait(5)
+    try:
+        yield path
+    finally:
+        for task in asyncio.all_tasks(loop):
+            loop.call_soon_threadsafe(task.cancel)
+        thread.join(5)
+
+
+class TestEvaluateRequest:
+    def setup_method(self):
+        self.server = EvaluationServer()
+
+    def test_outputs(self):
+        response = self.server.evaluate_request(REQUEST)
+        assert response == {'outputs': {'output_1': 'deploy', 'output_2': 'test'}}
+
+    def test_list_inputs(self):
+        response = self.server.evaluate_request({
+            'conditions': ['A == a', 'B == b'], 'true_values': ['x', 'y'], 'false_values': ['n', 'n'],
+            'variables': {'A': 'a'},
+        })
+        assert response['outputs'] == {'output_1': 'x', 'output_2': 'n'}
+
+    def test_case_insensitive(self):
+        response = self.server.evaluate_request({
+            'conditions': 'SERVICE == Game', 'true_values': 'yes', 'false_values': 'no',
+            'variables': {'SERVICE': 'game'}, 'case_sensitive': False,
+        })
+        assert response['outputs']['output_1'] == 'yes'
+
+    def test_length_mismatch(self):
+        with pytest.raises(ValueError, match='must match'):
+            self.server.evaluate_request({'conditions': 'A == a', 'true_values': 'x,y', 'false_values': 'n'})
+
+    def test_handle_line_errors(self):
+        assert 'Invalid JSON' in self.server.handle_line(b'{not json')['error']
+        assert self.server.handle_line(b'[]') == {'error': 'Request must be a JSON object'}
+        assert 'CONDITIONS' in self.server.handle_line(b'{}')['error']
+
+    @pytest.mark.parametrize('value', ['false', 0, None])
+    def test_case_sensitive_must_be_boolean(self, value):
+        request = dict(REQUEST, case_sensitive=value)
+        assert self.server.handle_line(json.dumps(request).encode()) == {
+            'error': 'case_sensitive must be true or false'
+        }
+
+
+class TestServer:
+    @pytest.fixture
+    def socket_path(self, tmp_path):
+        with running_server(str(tmp_path / 'ternary.sock')) as path:
+            yield path
+
+    def test_round_trip(self, socket_path):
+        assert send_request(socket_path, REQUEST)['outputs']['output_1'] == 'deploy'
+
+    def test_repeated_requests(self, socket_path):
+        for service, expected in (('game', 'deploy'), ('web', 'skip')):
+            request = dict(REQUEST, variables=dict(REQUEST['variables'], SERVICE=service))
+            assert send_request(socket_path, request)['outputs']['output_1'] == expected
+
+    def test_error_response(self, socket_path):
+        assert 'error' in send_request(socket_path, {'conditions': 'A == a'})
+
+    def test_replaces_stale_socket(self, tmp_path):
+        path = str(tmp_path / 'ternary.sock')
+        # Left behind by a server that did not shut down cleanly
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(path)
+        stale.close()
+        with running_server(path):
+            assert send_request(path, REQUEST)['outputs']['output_1'] == 'deploy'
+        assert not os.path.exists(path)
+
+    def test_keeps_other_files(self, tmp_path):
+        path = tmp_path / 'ternary.sock'
+        path.write_text('not a socket')
+        with pytest.raises(OSError):
+            asyncio.run(EvaluationServer(str(path)).serve())
+        assert path.read_text() == 'not a socket'
+
+    def test_refuses_path_of_running_server(self, socket_path):
+        inode = os.stat(socket_path).st_ino
+        with pytest.raises(OSError, match='Another server is listening'):
+            asyncio.run(EvaluationServer(socket_path).serve())
+        assert os.stat(socket_path).st_ino == inode
+        assert send_request(socket_path, REQUEST)['outputs']['output_1'] == 'deploy'
+
+    def test_only_removes_own_socket(self, tmp_path):
+        path = str(tmp_path / 'ternary.sock')
+        with running_server(path):
+            # Another server's socket now lives at the path
+            os.unlink(path)
+            other = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            other.bind(path)
+        try:
+            assert os.path.exists(path)
+        finally:
+            other.close()
+
+    def test_socket_is_private(self, socket_path):
+        assert os.stat(socket_path).st_mode & 0o777 == 0o600
+
+    def test_creates_private_directory(self, tmp_path):
+        path = str(tmp_path / 'run' / 'ternary.sock')
+        with running_server(path):
+            assert os.stat(tmp_path / 'run').st_mode & 0o777 == 0o700
+            assert send_request(path, REQUEST)['outputs']['output_1'] == 'deploy'
+
+    def test_refuses_shared_directory(self, tmp_path):
+        shared = tmp_path / 'shared'
+        shared.mkdir()
+        shared.chmod(0o777)
+        with pytest.raises(PermissionError):
+            asyncio.run(EvaluationServer(str(shared / 'ternary.sock')).serve())
+        assert not os.listdir(shared)
+
+
+class TestDefaultSocketPath:
+    def test_runtime_directory(self, monkeypatch, tmp_path):
+        monkeypatch.setenv('XDG_RUNTIME_DIR', str(tmp_path))
+        assert default_socket_path() == str(tmp_path / 'ternary-operator.sock')
+
+    def test_per_user_temp_directory(self, monkeypatch):
+        monkeypatch.delenv('XDG_RUNTIME_DIR', raising=False)
+        assert os.path.basename(os.path.dirname(default_socket_path())) == f"ternary-operator-{os.getuid()}"
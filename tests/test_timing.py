@@ -0,0 +1,53 @@
+"""Tests for src/timing.py"""
+
+from src.compiler import ConditionCompiler
+from src.context import EvaluationContext
+from src.timing import TimingRecorder, describe_node
+
+
+class TestDescribeNode:
+    def test_leaf_labels(self):
+        assert describe_node(ConditionCompiler.compile('SERVICE == game')) == 'SERVICE == game'
+        assert describe_node(ConditionCompiler.compile('ENV IN qa, prod')) == 'ENV IN qa,prod'
+        assert describe_node(ConditionCompiler.compile('TAG NOT_EMPTY')) == 'TAG NOT_EMPTY'
+        assert describe_node(ConditionCompiler.compile('MSG MATCHES ^fix')) == 'MSG MATCHES ^fix'
+
+    def test_logical_labels(self):
+        node = ConditionCompiler.compile('NOT (A == 1 || B == 2 || C == 3)')
+        assert describe_node(node) == 'NOT'
+        assert describe_node(node.operand) == '|| (3 operands)'
+
+
+class TestTimingRecorder:
+    def test_records_nodes_per_condition(self):
+        timer = TimingRecorder()
+        handler = timer.wrap(lambda node, context: context.get('A') == '1')
+        node = ConditionCompiler.compile('A == 1')
+        context = EvaluationContext({'A': '1'})
+        assert timer.time_condition('output_1', 'A == 1', handler, node, context) is True
+        timer.time_condition('output_2', 'A == 1 again', lambda: None)
+        data = timer.as_dict()
+        assert data['output_1']['nodes'][0]['node'] == 'A == 1'
+        assert data['output_1']['nodes'][0]['calls'] == 1
+        assert data['output_2']['nodes'] == []
+
+    def test_records_condition_that_raises(self):
+        timer = TimingRecorder()
+
+        def fail():
+            raise ValueError('boom')
+
+        try:
+            timer.time_condition('output_1', 'X', fail)
+        except ValueError:
+            pass
+        assert timer.as_dict()['output_1']['ns'] >= 0
+
+    def test_table_sorted_slowest_first(self):
+        timer = TimingRecorder()
+        timer.conditions = [
+            {'output': 'output_1', 'condition': 'fast', 'ns': 1000, 'nodes': []},
+            {'output': 'output_2', 'condition': 'slow', 'ns': 9000, 'nodes': []},
+        ]
+        rows = timer.table()
+        assert 'slow' in rows[1] and 'fast' in rows[2]
@@ -0,0 +1,41 @@
+"""Tests for src/version.py"""
+
+import operator
+import pytest
+from src.version import compare_versions, parse_version
+
+
+class TestParseVersion:
+    @pytest.mark.parametrize('lower,higher', [
+        ('1.9', '1.10'),
+        ('1.9.9', '1.10'),
+        ('1.0.0-rc.1', '1.0.0'),
+        ('1.0.0-alpha', '1.0.0-alpha.1'),
+        ('1.0.0-alpha.1', '1.0.0-alpha.beta'),
+        ('1.0.0-beta.2', '1.0.0-beta.11'),
+        ('1.0.0-rc.1', '1.0.1-alpha'),
+        ('0.9', '1'),
+    ])
+    def test_ordering(self, lower, higher):
+        assert parse_version(lower) < parse_version(higher)
+
+    @pytest.mark.parametrize('left,right', [
+        ('1.10', '1.10.0'),
+        ('v1.2.3', '1.2.3'),
+        ('1.2.3+build.5', '1.2.3'),
+        ('0', '0.0.0'),
+    ])
+    def test_equal_keys(self, left, right):
+        assert parse_version(left) == parse_version(right)
+
+    @pytest.mark.parametrize('text', ['', 'latest', '1.', '.1', '1..2', '1.2-', 'v', '1.2.x'])
+    def test_not_a_version(self, text):
+        assert parse_version(text) is None
+
+
+class TestCompareVersions:
+    def test_none_is_false(self):
+        key = parse_version('1.0')
+        assert compare_versions(operator.ne, None, key) is False
+        assert compare_versions(operator.eq, key, None) is False
+        assert compare_versions(operator.ge, key, key) is True